@@ -0,0 +1,79 @@
+"""Memory and groupby time of object vs shared categorical string columns.
+
+Loads the ticks and kills of each demo from the parse cache, converts them
+with plain .to_pandas() and with common.categories.to_pandas(), and reports
+the per-demo memory footprint and the time of the groupby(["name", "side"])
+the economy analyzers run on them, per demo and on all demos concatenated.
+
+    python bench_categories.py --demo-root /path/to/demos --limit 5
+"""
+import argparse
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from common.categories import concat, to_pandas
+from common.driver import find_demos
+from common.parse_cache import load_demo
+from weapon_duel.weapon_duel import WeaponDuelAnalyzer
+
+# ===== Configuration =====
+demo_root = Path("/Volumes/TOSHIBA EXT/Demo_2025")  # Change to your root directory
+
+
+def frame_mb(frame: pd.DataFrame) -> float:
+    return frame.memory_usage(deep=True).sum() / 2**20
+
+
+def groupby_seconds(frame: pd.DataFrame, repeat: int) -> float:
+    """Best-of-repeat seconds for the per-player, per-side group sizes"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        frame.groupby(["name", "side"], observed=True).size()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--demo-root", type=Path, default=demo_root)
+    parser.add_argument("--limit", type=int, default=None, help="only load the first N demos")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    demo_files = find_demos(args.demo_root)[:args.limit]
+    profile = WeaponDuelAnalyzer.profile  # every in-play tick, with names, sides and weapons
+
+    plain = {"ticks": [], "kills": []}
+    coded = {"ticks": [], "kills": []}
+    for demo_path in demo_files:
+        demo = load_demo(demo_path, profile=profile)
+        ticks, kills = demo.ticks, demo.kills
+        plain["ticks"].append(ticks.to_pandas())
+        coded["ticks"].append(to_pandas(ticks))
+        plain["kills"].append(kills.to_pandas())
+        coded["kills"].append(to_pandas(kills))
+
+    print(f"{len(demo_files)} demos, groupby best of {args.repeat}")
+    print(f"{'table':<12} {'object MB':>10} {'categ. MB':>10} {'ratio':>6}")
+    for name in ("ticks", "kills"):
+        object_mb = sum(frame_mb(f) for f in plain[name]) / max(len(demo_files), 1)
+        categorical_mb = sum(frame_mb(f) for f in coded[name]) / max(len(demo_files), 1)
+        print(f"{name + '/demo':<12} {object_mb:>10.2f} {categorical_mb:>10.2f} "
+              f"{object_mb / categorical_mb if categorical_mb else 0:>5.1f}x")
+
+    all_plain = pd.concat(plain["ticks"], ignore_index=True)
+    all_coded = concat(coded["ticks"])
+    print(f"{'ticks/all':<12} {frame_mb(all_plain):>10.2f} {frame_mb(all_coded):>10.2f} "
+          f"{frame_mb(all_plain) / frame_mb(all_coded) if len(all_coded) else 0:>5.1f}x")
+
+    print(f"\n{'groupby':<12} {'object s':>10} {'categ. s':>10} {'speedup':>8}")
+    object_s = sum(groupby_seconds(f, args.repeat) for f in plain["ticks"])
+    categorical_s = sum(groupby_seconds(f, args.repeat) for f in coded["ticks"])
+    print(f"{'per demo':<12} {object_s:>10.4f} {categorical_s:>10.4f} {object_s / categorical_s:>7.1f}x")
+    object_s = groupby_seconds(all_plain, args.repeat)
+    categorical_s = groupby_seconds(all_coded, args.repeat)
+    print(f"{'concat':<12} {object_s:>10.4f} {categorical_s:>10.4f} {object_s / categorical_s:>7.1f}x")
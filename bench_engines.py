@@ -0,0 +1,70 @@
+"""Time the pandas and polars engines of each analyzer on the same demos.
+
+Demos are parsed (or loaded from the parse cache) once up front; the timings
+cover reading the cached tables and running process() / process_lazy(),
+best of --repeat runs.
+
+    python bench_engines.py --demo-root /path/to/demos --limit 5
+"""
+import argparse
+import contextlib
+import io
+import time
+from pathlib import Path
+
+from common.driver import Analyzer, find_demos
+from common.parse_cache import load_demo
+from econ_adv.econ_adv import EconAdvAnalyzer
+from economy_perc.economy_perc import EconomyPercAnalyzer
+from exit_frag.exit_frag import ExitFragAnalyzer
+from first_kill.first_kill import FirstKillAnalyzer
+from weapon_duel.weapon_duel import WeaponDuelAnalyzer
+
+# ===== Configuration =====
+demo_root = Path("/Volumes/TOSHIBA EXT/Demo_2025")  # Change to your root directory
+
+
+def time_engine(analyzer, demo_files, method: str, repeat: int) -> float:
+    """Best-of-repeat seconds to run one engine of an analyzer over the demos"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for demo_path in demo_files:
+                demo = load_demo(demo_path, profile=analyzer.profile)
+                getattr(analyzer, method)(demo_path, demo)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--demo-root", type=Path, default=demo_root)
+    parser.add_argument("--limit", type=int, default=None, help="only time the first N demos")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    demo_files = find_demos(args.demo_root)[:args.limit]
+    analyzers = [
+        ExitFragAnalyzer(),
+        FirstKillAnalyzer(),
+        WeaponDuelAnalyzer(),
+        EconAdvAnalyzer(),
+        EconomyPercAnalyzer(demo_root=args.demo_root),
+    ]
+
+    # Warm the parse cache so only the engines are timed
+    for analyzer in analyzers:
+        for demo_path in demo_files:
+            load_demo(demo_path, profile=analyzer.profile)
+
+    print(f"{len(demo_files)} demos, best of {args.repeat}")
+    print(f"{'analyzer':<15} {'pandas s':>10} {'polars s':>10} {'speedup':>8}")
+    for analyzer in analyzers:
+        pandas_s = time_engine(analyzer, demo_files, "process", args.repeat)
+        if type(analyzer).process_lazy is Analyzer.process_lazy:  # no polars version
+            print(f"{analyzer.name:<15} {pandas_s:>10.3f} {'-':>10} {'-':>8}")
+            continue
+        polars_s = time_engine(analyzer, demo_files, "process_lazy", args.repeat)
+        print(f"{analyzer.name:<15} {pandas_s:>10.3f} {polars_s:>10.3f} {pandas_s / polars_s:>7.1f}x")
@@ -0,0 +1 @@
+"""Shared helpers for the CS2 demo analyzers."""
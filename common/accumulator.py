@@ -0,0 +1,112 @@
+"""Dense counters for the analyzers' per-player aggregates.
+
+The aggregates used to be defaultdicts of nested string-keyed dicts, updated
+with += 1 per kill and merged key by key. An Accumulator holds them in one
+int64 numpy array of players x axes (e.g. condition x metric): players get a
+row in order of first appearance, labels index the other axes, add() takes
+whole arrays of keys and counts from a grouped count, merge() adds the rows of
+another accumulator, and it pickles as its keys plus the array. frame() turns
+it into the output DataFrame in one construction.
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+
+
+class Accumulator:
+    def __init__(self, *axes):
+        self.axes = tuple(tuple(labels) for labels in axes)
+        self._codes = [{label: i for i, label in enumerate(labels)} for labels in self.axes]
+        self.keys = []
+        self._rows = {}
+        self.values = np.zeros((0, *(len(labels) for labels in self.axes)), dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __getstate__(self) -> dict:
+        return {"axes": self.axes, "keys": self.keys, "values": self.values}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(*state["axes"])
+        self.keys = list(state["keys"])
+        self._rows = {key: row for row, key in enumerate(self.keys)}
+        self.values = state["values"]
+
+    def rows(self, keys) -> np.ndarray:
+        """Row of each key; unseen keys get new rows in order of first appearance"""
+        codes, uniques = pd.factorize(pd.Series(keys, dtype=object), use_na_sentinel=False)
+        rows = np.empty(len(uniques), dtype=np.int64)
+        new = []
+        for i, key in enumerate(uniques):
+            if key is not None and key != key:
+                key = None  # factorize turns None into a NaN, which only matches itself by identity
+            row = self._rows.get(key)
+            if row is None:
+                row = self._rows[key] = len(self.keys) + len(new)
+                new.append(key)
+            rows[i] = row
+        if new:
+            self.keys += new
+            grown = np.zeros((len(self.keys), *self.values.shape[1:]), dtype=self.values.dtype)
+            grown[:len(self.values)] = self.values
+            self.values = grown
+        return rows[codes]
+
+    def _index(self, axis: int, labels):
+        """Index of one label, or of each label of an array, along an axis"""
+        if isinstance(labels, str):
+            return self._codes[axis][labels]
+        return np.array([self._codes[axis][label] for label in labels], dtype=np.int64)
+
+    def add(self, keys, *labels, counts=1) -> None:
+        """Add counts (a number, or one per key) at (key, label, ...) for every key.
+
+        Each label is a single label of its axis or one label per key; repeated
+        (key, label) pairs add up.
+        """
+        index = (self.rows(keys), *(self._index(axis, label) for axis, label in enumerate(labels)))
+        np.add.at(self.values, index, np.asarray(counts, dtype=self.values.dtype))
+
+    def get(self, key, *labels) -> int:
+        """Count at (key, label, ...); 0 for an unseen key"""
+        row = self._rows.get(key)
+        if row is None:
+            return 0
+        return int(self.values[(row, *(self._codes[axis][label] for axis, label in enumerate(labels)))])
+
+    def merge(self, other: "Accumulator") -> None:
+        """Add another accumulator's counts (same axes) into this one"""
+        if other.axes != self.axes:
+            raise ValueError(f"cannot merge accumulators with different axes: {other.axes} != {self.axes}")
+        if len(other):
+            rows = self.rows(other.keys)  # may grow self.values
+            self.values[rows] += other.values
+
+    def renamed(self, key_of) -> "Accumulator":
+        """Accumulator re-keyed on key_of(key); keys mapping to the same new key are added up"""
+        renamed = Accumulator(*self.axes)
+        if len(self):
+            rows = renamed.rows([key_of(key) for key in self.keys])
+            np.add.at(renamed.values, rows, self.values)
+        return renamed
+
+    def frame(self, key: str = "key", axis: int = None, label: str = "label") -> pd.DataFrame:
+        """One row per key with a column per label combination ("label_label").
+
+        With axis, that axis is moved into the rows instead: one row per
+        (key, label of the axis), the label in the label column.
+        """
+        values, axes, keys = self.values, list(self.axes), pd.Series(self.keys, dtype=object)
+        labels = None
+        if axis is not None:
+            values = np.moveaxis(values, axis + 1, 1)
+            labels = np.tile(np.array(axes.pop(axis), dtype=object), len(keys))
+            keys = keys.repeat(values.shape[1]).reset_index(drop=True)
+        columns = ["_".join(map(str, combination)) for combination in itertools.product(*axes)]
+        frame = pd.DataFrame(values.reshape(len(keys), -1), columns=columns)
+        if labels is not None:
+            frame.insert(0, label, labels)
+        frame.insert(0, key, keys)
+        return frame
@@ -0,0 +1,51 @@
+"""Player name aliases, shared by every script.
+
+The roster file (roster.json, or CS2_ROSTER) maps each canonical name to the
+in-game variants seen for that player. It is compiled once into a flat
+variant -> canonical dict, so norm_name() is a single lookup, and norm_names()
+resolves a whole column by normalizing only its distinct values and mapping
+them back through the factorized codes.
+"""
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# ===== Configuration =====
+ROSTER_FILE = Path(os.environ.get("CS2_ROSTER", Path(__file__).resolve().parent / "roster.json"))
+
+
+def load_roster(path: Path = ROSTER_FILE) -> dict:
+    """canonical name -> set of variants, in file order"""
+    with open(path, encoding="utf-8") as f:
+        return {canon: set(variants) for canon, variants in json.load(f).items()}
+
+
+def alias_lookup(alias_map: dict) -> dict:
+    """variant -> canonical name; the first roster entry that lists a name wins"""
+    lookup = {}
+    for canon, variants in alias_map.items():
+        lookup.setdefault(canon, canon)
+        for variant in variants:
+            lookup.setdefault(variant, canon)
+    return lookup
+
+
+alias_map = load_roster()
+ALIASES = alias_lookup(alias_map)
+
+
+def norm_name(name: str) -> str:
+    if not isinstance(name, str):
+        return name
+    s = name.strip()
+    return ALIASES.get(s, s)
+
+
+def norm_names(names: pd.Series) -> pd.Series:
+    """norm_name() over a column, computed once per distinct value"""
+    codes, uniques = pd.factorize(names, use_na_sentinel=False)
+    resolved = np.array([norm_name(u) for u in uniques], dtype=object)
+    return pd.Series(resolved[codes], index=names.index, name=names.name, dtype=object)
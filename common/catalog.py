@@ -0,0 +1,138 @@
+"""Persistent catalog of the demos under a demo root.
+
+A recursive rglob over the external drive is slow, so every demo is recorded
+once with its event folder, size, mtime, map name and tickrate (read from the
+header, see common.demo_header). refresh() stats each known directory and only
+lists the ones whose mtime changed (a file added, removed or renamed in it);
+unchanged directories reuse their stored listing. Demos can then be selected
+by event, map or tickrate straight from the catalog, so non-matching demos are
+skipped before they are parsed.
+
+Layout:
+    <state_dir>/catalogs/<root digest>.json
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from common.demo_header import is_demo_error, read_header
+from common.manifest import STATE_DIR
+
+
+def event_of(demo_root: Path, demo_path: Path):
+    """Event folder (first directory under demo_root) a demo belongs to, or None"""
+    try:
+        parts = Path(demo_path).relative_to(demo_root).parts
+    except ValueError:
+        return None
+    if len(parts) < 2 or parts[0].startswith("."):
+        return None
+    return parts[0]
+
+
+def is_demo(name: str) -> bool:
+    return name.endswith(".dem") and not name.startswith("._")
+
+
+class Catalog:
+    def __init__(self, demo_root: Path, state_dir: Path = STATE_DIR):
+        self.demo_root = Path(demo_root)
+        digest = hashlib.sha1(str(self.demo_root.resolve()).encode()).hexdigest()[:16]
+        self.path = Path(state_dir) / "catalogs" / f"{digest}.json"
+        data = json.loads(self.path.read_text()) if self.path.exists() else {}
+        self.dirs = data.get("dirs", {})    # relative dir -> {"mtime_ns", "subdirs", "demos"}
+        self.demos = data.get("demos", {})  # relative path -> {"event", "size", "mtime_ns", "map_name", "tickrate"}
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps({"root": str(self.demo_root), "dirs": self.dirs, "demos": self.demos},
+                                  indent=1, sort_keys=True))
+        tmp.replace(self.path)
+
+    def _entry(self, rel: str, st) -> dict:
+        old = self.demos.get(rel)
+        if old is not None and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+            return old
+        try:
+            header = read_header(self.demo_root / rel)
+        except BaseException as e:
+            if not is_demo_error(e):
+                raise
+            # Recorded without map and tickrate; a partly copied demo is read again once it changes
+            print(f"[warn] header read failed on {Path(rel).name}: {type(e).__name__}: {e}")
+            header = {}
+        return {
+            "event": event_of(self.demo_root, self.demo_root / rel),
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "map_name": header.get("map_name"),
+            "tickrate": header.get("tickrate"),
+        }
+
+    def refresh(self, full: bool = False) -> dict:
+        """Bring the catalog up to date; full=True lists every directory again.
+
+        Returns counts of listed/reused directories and added/removed demos.
+        """
+        if not self.demo_root.is_dir():
+            raise FileNotFoundError(f"demo root not found: {self.demo_root}")
+
+        dirs, demos = {}, {}
+        stats = {"listed": 0, "reused": 0}
+        stack = [""]
+        while stack:
+            rel_dir = stack.pop()
+            path = self.demo_root / rel_dir
+            try:
+                mtime_ns = path.stat().st_mtime_ns
+            except OSError:
+                continue
+            known = self.dirs.get(rel_dir)
+            if not full and known is not None and known["mtime_ns"] == mtime_ns:
+                stats["reused"] += 1
+                listing = known
+                for rel in known["demos"]:
+                    if rel in self.demos:
+                        demos[rel] = self.demos[rel]
+            else:
+                stats["listed"] += 1
+                listing = {"mtime_ns": mtime_ns, "subdirs": [], "demos": []}
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        rel = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                        if entry.is_dir():
+                            listing["subdirs"].append(rel)
+                        elif is_demo(entry.name) and entry.is_file():
+                            listing["demos"].append(rel)
+                            demos[rel] = self._entry(rel, entry.stat())
+            dirs[rel_dir] = listing
+            stack.extend(listing["subdirs"])
+
+        stats["added"] = len(demos.keys() - self.demos.keys())
+        stats["removed"] = len(self.demos.keys() - demos.keys())
+        self.dirs, self.demos = dirs, demos
+        return stats
+
+    def select(self, event=None, map_name=None, tickrate=None) -> list:
+        """Demo paths in rglob order, optionally only one event folder, map and/or tickrate"""
+        return sorted(
+            self.demo_root / rel for rel, entry in self.demos.items()
+            if (event is None or entry["event"] == event)
+            and (map_name is None or entry["map_name"] == map_name)
+            and (tickrate is None or entry["tickrate"] == tickrate)
+        )
+
+
+def load_catalog(demo_root: Path, rescan: bool = False) -> Catalog:
+    """Catalog of demo_root, refreshed and saved (kept as stored if the root is not mounted)"""
+    catalog = Catalog(demo_root)
+    if not catalog.demo_root.is_dir():
+        print(f"[warn] demo root not found: {demo_root}; using the stored catalog")
+        return catalog
+    stats = catalog.refresh(full=rescan)
+    catalog.save()
+    print(f"[catalog] {len(catalog.demos)} demos, {stats['listed']} dirs listed, {stats['reused']} reused, "
+          f"+{stats['added']} -{stats['removed']}")
+    return catalog
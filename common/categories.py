@@ -0,0 +1,80 @@
+"""Shared categorical dictionaries for the pandas engine.
+
+Names, sides, teams and weapons are a handful of distinct strings repeated on
+every tick and kill row. to_pandas() converts those columns to pandas
+categoricals whose categories come from one dictionary per kind of value
+(players, sides, teams, weapons), shared by every demo in the process. The
+dictionaries only grow, so a value keeps its code across demos, columns of the
+same kind (attacker_side / victim_side) compare directly, and concat() of
+frames from many demos stays categorical instead of falling back to object.
+
+Group categorical columns with observed=True, or pandas adds a group for
+every dictionary entry.
+"""
+import numpy as np
+import pandas as pd
+import polars as pl
+
+# ===== Configuration =====
+DICTIONARY_COLUMNS = {
+    "player": ("name", "attacker_name", "victim_name"),
+    "side": ("side", "attacker_side", "victim_side"),
+    "team": ("team_name", "attacker_team_name", "victim_team_name"),
+    "weapon": ("weapon", "active_weapon_name", "attacker_active_weapon_name", "victim_active_weapon_name"),
+}
+
+
+class Dictionary:
+    """Append-only list of values; a value's code is its position"""
+
+    def __init__(self):
+        self.values = []
+        self.index = {}
+        self._dtype = None
+
+    def codes(self, series: pl.Series) -> np.ndarray:
+        """Codes of a string column (-1 for nulls), adding values not seen before"""
+        lookup = {}
+        for value in series.drop_nulls().unique(maintain_order=True):
+            code = self.index.get(value)
+            if code is None:
+                code = self.index[value] = len(self.values)
+                self.values.append(value)
+                self._dtype = None
+            lookup[value] = code
+        return series.replace_strict(lookup, default=-1, return_dtype=pl.Int32).to_numpy()
+
+    @property
+    def dtype(self) -> pd.CategoricalDtype:
+        if self._dtype is None:
+            self._dtype = pd.CategoricalDtype(self.values)
+        return self._dtype
+
+
+DICTIONARIES = {kind: Dictionary() for kind in DICTIONARY_COLUMNS}
+COLUMN_DICTIONARY = {column: DICTIONARIES[kind] for kind, columns in DICTIONARY_COLUMNS.items() for column in columns}
+
+
+def to_pandas(frame: pl.DataFrame) -> pd.DataFrame:
+    """frame.to_pandas() with the name/side/team/weapon columns as shared categoricals"""
+    columns = [c for c in frame.columns
+               if c in COLUMN_DICTIONARY and frame.schema[c] in (pl.String, pl.Categorical)]
+    df = frame.drop(columns).to_pandas()
+    # Encode every column before building any categorical, so columns of one kind
+    # get the dictionary's final categories and compare directly
+    codes = {column: COLUMN_DICTIONARY[column].codes(frame[column].cast(pl.String)) for column in columns}
+    for column in columns:
+        df[column] = pd.Categorical.from_codes(codes[column], dtype=COLUMN_DICTIONARY[column].dtype)
+    return df[frame.columns]
+
+
+def concat(frames) -> pd.DataFrame:
+    """pd.concat() keeping the shared categoricals; frames converted earlier are
+    brought up to the current dictionaries first (their codes do not change)
+    """
+    frames = [
+        frame.astype({c: COLUMN_DICTIONARY[c].dtype for c in frame.columns
+                      if c in COLUMN_DICTIONARY and isinstance(frame[c].dtype, pd.CategoricalDtype)})
+        for frame in frames
+    ]
+    return pd.concat(frames, ignore_index=True)
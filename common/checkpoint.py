@@ -0,0 +1,107 @@
+"""Crash-resume support for long corpus runs.
+
+Checkpoint: every CHECKPOINT_SECONDS (and whenever a run stops early) the
+analyzers' aggregates are pickled together with the demos merged so far;
+--resume restores them and only processes the rest.
+
+Quarantine: demos whose parse or analysis raised, with the exception text.
+--resume skips them until the file changes.
+
+Layout:
+    <state_dir>/checkpoints/<analyzers digest>.pkl
+    <state_dir>/quarantine.json
+"""
+import hashlib
+import json
+import os
+import pickle
+import time
+from pathlib import Path
+
+from common.manifest import STATE_DIR
+
+# ===== Configuration =====
+CHECKPOINT_SECONDS = int(os.environ.get("CS2_CHECKPOINT_SECONDS", 300))
+
+
+class Quarantine:
+    def __init__(self, state_dir: Path = STATE_DIR):
+        self.path = Path(state_dir) / "quarantine.json"
+        self.entries = json.loads(self.path.read_text()) if self.path.exists() else {}
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(self.entries, indent=1, sort_keys=True))
+        tmp.replace(self.path)
+
+    def add(self, demo_path: Path, error: str) -> None:
+        try:
+            st = demo_path.stat()
+            size, mtime_ns = st.st_size, st.st_mtime_ns
+        except OSError:
+            size = mtime_ns = None
+        self.entries[str(demo_path)] = {
+            "error": error.strip().splitlines()[-1] if error.strip() else "",
+            "traceback": error,
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "when": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+    def discard(self, demo_path: Path) -> bool:
+        return self.entries.pop(str(demo_path), None) is not None
+
+    def is_bad(self, demo_path: Path) -> bool:
+        """True if the demo failed before and has not changed since"""
+        entry = self.entries.get(str(demo_path))
+        if entry is None:
+            return False
+        try:
+            st = demo_path.stat()
+        except OSError:
+            return True
+        return entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns
+
+
+class Checkpoint:
+    """Aggregates of a set of analyzers after merging a prefix of the run's demos"""
+
+    def __init__(self, analyzers, state_dir: Path = STATE_DIR):
+        key = ",".join(f"{a.name}:{a.version}" for a in analyzers)
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        self.path = Path(state_dir) / "checkpoints" / f"{digest}.pkl"
+        self.saved_at = time.monotonic()
+
+    def due(self) -> bool:
+        return time.monotonic() - self.saved_at >= CHECKPOINT_SECONDS
+
+    def save(self, analyzers, merged: list) -> None:
+        """merged: demo paths (str) whose partials are in the aggregates, in merge order"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".pkl.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump({"merged": merged, "state": [vars(a) for a in analyzers]}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(self.path)
+        self.saved_at = time.monotonic()
+
+    def restore(self, analyzers, demo_files) -> list:
+        """Load the aggregates into the analyzers; returns the merged demo paths ([] if none)"""
+        if not self.path.exists():
+            return []
+        try:
+            with open(self.path, "rb") as f:
+                data = pickle.load(f)
+        except Exception as e:
+            print(f"[warn] unreadable checkpoint {self.path.name}: {e}")
+            return []
+        if not set(data["merged"]) <= {str(p) for p in demo_files}:
+            print("[warn] checkpoint is for a different set of demos, starting over")
+            return []
+        for analyzer, state in zip(analyzers, data["state"]):
+            analyzer.__dict__.update(state)
+        return data["merged"]
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,179 @@
+"""Header-only reads of CS2 demos: map name and tickrate without a parse.
+
+demoparser2's parse_header() returns the server/map metadata from the start of
+the file but no tickrate. The tickrate comes from the CDemoFileInfo message at
+the end of the file, whose offset is stored in the first 16 bytes:
+
+    "PBDEMS2\\0" | int32 file info offset | int32 spawn groups offset
+
+CDemoFileInfo holds playback_time (seconds) and playback_ticks, so
+tickrate = playback_ticks / playback_time. Only a few KB are read either way:
+
+    python -m common.demo_header match.dem
+"""
+import struct
+from pathlib import Path
+
+# ===== Configuration =====
+DEMO_MAGIC = b"PBDEMS2\x00"
+DEM_FILE_INFO = 2
+DEM_IS_COMPRESSED = 64
+FILE_INFO_MAX_BYTES = 64 * 1024
+
+
+def _varint(buf: bytes, pos: int):
+    result = shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _snappy_decompress(buf: bytes) -> bytes:
+    """Raw snappy block decoder (demo frames are snappy-compressed when flagged)"""
+    length, pos = _varint(buf, 0)
+    out = bytearray()
+    while pos < len(buf):
+        tag = buf[pos]
+        pos += 1
+        kind = tag & 3
+        if kind == 0:  # literal
+            n = tag >> 2
+            if n >= 60:
+                extra = n - 59
+                n = int.from_bytes(buf[pos:pos + extra], "little")
+                pos += extra
+            n += 1
+            out += buf[pos:pos + n]
+            pos += n
+            continue
+        if kind == 1:
+            n = 4 + ((tag >> 2) & 7)
+            offset = ((tag >> 5) << 8) | buf[pos]
+            pos += 1
+        elif kind == 2:
+            n = 1 + (tag >> 2)
+            offset = int.from_bytes(buf[pos:pos + 2], "little")
+            pos += 2
+        else:
+            n = 1 + (tag >> 2)
+            offset = int.from_bytes(buf[pos:pos + 4], "little")
+            pos += 4
+        for _ in range(n):  # copies may overlap their own output
+            out.append(out[-offset])
+    if len(out) != length:
+        raise ValueError("corrupt snappy block")
+    return bytes(out)
+
+
+def _proto_fields(buf: bytes) -> dict:
+    """Top-level scalar fields of a protobuf message: field number -> raw value"""
+    fields = {}
+    pos = 0
+    while pos < len(buf):
+        key, pos = _varint(buf, pos)
+        number, wire = key >> 3, key & 7
+        if wire == 0:
+            fields[number], pos = _varint(buf, pos)
+        elif wire == 1:
+            fields[number] = buf[pos:pos + 8]
+            pos += 8
+        elif wire == 2:
+            n, pos = _varint(buf, pos)
+            fields[number] = buf[pos:pos + n]
+            pos += n
+        elif wire == 5:
+            fields[number] = buf[pos:pos + 4]
+            pos += 4
+        else:
+            raise ValueError(f"unsupported wire type {wire}")
+    return fields
+
+
+def read_file_info(demo_path: Path) -> dict:
+    """playback_time / playback_ticks / playback_frames from the demo's CDemoFileInfo"""
+    with open(demo_path, "rb") as f:
+        start = f.read(16)
+        if len(start) < 16 or start[:8] != DEMO_MAGIC:
+            raise ValueError("not a CS2 demo (bad magic)")
+        offset = struct.unpack_from("<i", start, 8)[0]
+        f.seek(offset)
+        frame = f.read(FILE_INFO_MAX_BYTES)
+
+    cmd, pos = _varint(frame, 0)
+    _, pos = _varint(frame, pos)  # tick
+    size, pos = _varint(frame, pos)
+    if cmd & ~DEM_IS_COMPRESSED != DEM_FILE_INFO:
+        raise ValueError(f"expected a file info frame at offset {offset}, got command {cmd}")
+    payload = frame[pos:pos + size]
+    if cmd & DEM_IS_COMPRESSED:
+        payload = _snappy_decompress(payload)
+
+    fields = _proto_fields(payload)
+    return {
+        "playback_time": struct.unpack("<f", fields[1])[0] if 1 in fields else None,
+        "playback_ticks": fields.get(2),
+        "playback_frames": fields.get(3),
+    }
+
+
+def _file_info(demo_path: Path) -> dict:
+    try:
+        return read_file_info(demo_path)
+    except (OSError, ValueError, IndexError, struct.error) as e:
+        print(f"[warn] no file info in {Path(demo_path).name}: {e}")
+        return {}
+
+
+def _tickrate(info: dict):
+    if info.get("playback_time") and info.get("playback_ticks"):
+        return round(info["playback_ticks"] / info["playback_time"])
+    return None
+
+
+def read_tickrate(demo_path: Path):
+    """Tickrate from the demo's file info, or None if it is missing or unreadable
+    (e.g. a demo that is still being recorded)
+    """
+    return _tickrate(_file_info(demo_path))
+
+
+def is_demo_error(e: BaseException) -> bool:
+    """True for what a bad demo raises: any Exception, or the pyo3 PanicException that
+    demoparser2 raises on truncated or corrupt files (a BaseException, so
+    `except Exception` misses it)
+    """
+    return isinstance(e, Exception) or type(e).__name__ == "PanicException"
+
+
+def read_header(demo_path: Path) -> dict:
+    """Header fields (map_name, server_name, demo_version_name, ...), playback length and
+    tickrate, without parsing the demo
+    """
+    from demoparser2 import DemoParser
+
+    # demoparser2 panics on files too short to hold the 16-byte start (e.g. still being copied)
+    with open(demo_path, "rb") as f:
+        start = f.read(16)
+    if len(start) < 16 or start[:8] != DEMO_MAGIC:
+        raise ValueError("not a CS2 demo (bad magic or truncated)")
+    header = dict(DemoParser(str(demo_path)).parse_header())
+    info = _file_info(demo_path)
+    header.update(info)
+    header["tickrate"] = _tickrate(info)
+    return header
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+    import time
+
+    for arg in sys.argv[1:]:
+        start = time.perf_counter()
+        header = read_header(arg)
+        print(f"{arg} ({(time.perf_counter() - start) * 1000:.1f} ms)")
+        print(json.dumps(header, indent=1, default=str))
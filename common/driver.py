@@ -0,0 +1,323 @@
+"""Single-pass driver: parse each demo once and feed it to every analyzer.
+
+An analyzer declares a ParseProfile of what it reads, turns one parsed demo into a
+small picklable partial in process(), and folds partials into its aggregates
+in merge(). Serial and parallel runs both merge partials in demo order, so
+--workers N writes exactly the same CSVs as a serial run. --engine polars uses
+each analyzer's process_lazy() (see common.lazy_engine) where it has one and
+warns about the analyzers that fall back to process().
+Demos are streamed one at a time through iter_demos() under a memory limit.
+Failing demos are quarantined and full runs are checkpointed, so --resume
+continues an interrupted run (see common.checkpoint).
+"""
+import argparse
+import gc
+import multiprocessing
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from common.catalog import load_catalog
+from common.checkpoint import Checkpoint, Quarantine
+from common.demo_header import is_demo_error
+from common.manifest import Manifest, STATE_DIR
+from common.parse_cache import load_demo
+from common.parse_profile import ParseProfile
+
+# ===== Configuration =====
+MEMORY_LIMIT_MB = int(os.environ.get("CS2_MEMORY_LIMIT_MB", 2048))  # per demo and worker
+
+
+class Analyzer:
+    """Base class for analyzers run by run_analyzers()"""
+
+    name = "analyzer"
+    version = 1  # bump when process() changes so stored partials are recomputed
+    profile = ParseProfile()
+
+    def process(self, demo_path: Path, demo):
+        """Return this demo's partial aggregates; must not touch self's aggregates"""
+        raise NotImplementedError
+
+    def process_lazy(self, demo_path: Path, demo):
+        """polars-lazy version of process() returning the same partial; defaults to process()"""
+        return self.process(demo_path, demo)
+
+    def merge(self, partial) -> None:
+        """Fold a partial returned by process() into the aggregates"""
+        raise NotImplementedError
+
+    def write_output(self) -> None:
+        raise NotImplementedError
+
+
+def merge_counts(total, partial) -> None:
+    """Add nested dicts of counters (numbers, or sets to union) from partial into total"""
+    for key, value in partial.items():
+        if isinstance(value, dict):
+            merge_counts(total[key], value)
+        elif isinstance(value, set):
+            total[key] |= value
+        else:
+            total[key] += value
+
+
+def find_demos(demo_root: Path) -> list:
+    """Every demo under demo_root, in rglob order, from the demo catalog (see common.catalog)"""
+    return load_catalog(demo_root).select()
+
+
+def union_profile(analyzers) -> ParseProfile:
+    """One profile covering everything the analyzers read"""
+    return ParseProfile.union(analyzer.profile for analyzer in analyzers)
+
+
+def iter_demos(demo_files, profile, memory_limit_mb: int = MEMORY_LIMIT_MB):
+    """Yield (demo_path, tables, error) one demo at a time; tables is None and error
+    holds the traceback if the demo failed to load.
+
+    The tables get a memory limit, so tick tables above it are only read in
+    per-round chunks (DemoTables.round_chunks), and they are released as soon
+    as the consumer asks for the next demo, before that demo is loaded.
+    """
+    memory_limit = None if not memory_limit_mb else memory_limit_mb * 2**20
+    for demo_path in demo_files:
+        print(f"\nParsing {demo_path.name}")
+        try:
+            demo = load_demo(demo_path, profile=profile)
+        except BaseException as e:
+            if not is_demo_error(e):
+                raise
+            print(f"[warn] failed on {demo_path.name}: {type(e).__name__}: {e}")
+            yield demo_path, None, traceback.format_exc()
+            continue
+        demo.memory_limit = memory_limit
+        try:
+            yield demo_path, demo, None
+        finally:
+            demo.release()
+            del demo
+            gc.collect()  # free the analyzers' pandas copies before the next demo
+
+
+def analyze_demo(analyzers, profile, demo_path, engine: str = "pandas", memory_limit_mb: int = MEMORY_LIMIT_MB):
+    """Parse (or load) one demo and return (one partial per analyzer, None),
+    or (None, traceback text) if loading or any analyzer failed
+    """
+    for _, demo, error in iter_demos([demo_path], profile, memory_limit_mb):
+        if error is not None:
+            return None, error
+        try:
+            if engine == "polars":
+                return [analyzer.process_lazy(demo_path, demo) for analyzer in analyzers], None
+            return [analyzer.process(demo_path, demo) for analyzer in analyzers], None
+        except BaseException as e:
+            if not is_demo_error(e):
+                raise
+            print(f"[warn] failed on {demo_path.name}: {type(e).__name__}: {e}")
+            return None, traceback.format_exc()
+
+
+# ===== Process pool workers =====
+_worker_analyzers = None
+_worker_profile = None
+_worker_engine = None
+_worker_memory_limit_mb = None
+
+
+def _init_worker(analyzers, profile, engine, memory_limit_mb):
+    global _worker_analyzers, _worker_profile, _worker_engine, _worker_memory_limit_mb
+    _worker_analyzers = analyzers
+    _worker_profile = profile
+    _worker_engine = engine
+    _worker_memory_limit_mb = memory_limit_mb
+
+
+def _analyze_in_worker(demo_path):
+    return analyze_demo(_worker_analyzers, _worker_profile, demo_path, _worker_engine, _worker_memory_limit_mb)
+
+
+def lazy_fallbacks(analyzers):
+    """The analyzers that do not override process_lazy() and so run process() under --engine polars"""
+    return [analyzer for analyzer in analyzers if type(analyzer).process_lazy is Analyzer.process_lazy]
+
+
+def iter_partials(analyzers, demo_files, workers: int = 1, engine: str = "pandas",
+                  memory_limit_mb: int = MEMORY_LIMIT_MB):
+    """Yield (demo_path, partials, error) in demo_files order; partials is None if the demo failed"""
+    profile = union_profile(analyzers)
+    if engine == "polars":
+        for analyzer in lazy_fallbacks(analyzers):
+            print(f"[warn] {analyzer.name} has no process_lazy(); --engine polars runs its pandas process()")
+
+    if workers <= 1:
+        for demo_path in demo_files:
+            yield (demo_path, *analyze_demo(analyzers, profile, demo_path, engine, memory_limit_mb))
+        return
+
+    def pool(max_workers):
+        # spawn, not fork: polars' thread pool is not fork-safe, and a pool can be rebuilt
+        # after the parent has used polars (merging, restoring a checkpoint)
+        return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker, initargs=(analyzers, profile, engine, memory_limit_mb))
+
+    todo = list(demo_files)
+    while todo:
+        executor = pool(workers)
+        done = 0
+        try:
+            # map() yields in submission order, so merging matches the serial run exactly
+            for demo_path, (partials, error) in zip(todo, executor.map(_analyze_in_worker, todo, chunksize=1)):
+                done += 1
+                yield demo_path, partials, error
+            todo = []
+        except BrokenProcessPool:
+            # A worker died (OOM kill, segfault). The demo being waited for may only have
+            # shared the pool with it, so it is retried alone before it is quarantined
+            demo_path, todo = todo[done], todo[done + 1:]
+            print(f"[warn] a worker process died while {demo_path.name} was in flight; retrying it alone")
+            retry = pool(1)
+            try:
+                partials, error = retry.submit(_analyze_in_worker, demo_path).result()
+            except BrokenProcessPool as e:
+                partials, error = None, f"worker process died on {demo_path.name}: {e}\n"
+            finally:
+                retry.shutdown(cancel_futures=True)
+            yield demo_path, partials, error
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+
+def merge_partials(analyzers, partials) -> None:
+    """Merge one demo's partials; analyzers whose partial is None are skipped"""
+    if partials is None:
+        return
+    for analyzer, partial in zip(analyzers, partials):
+        if partial is not None:
+            analyzer.merge(partial)
+
+
+def write_outputs(analyzers) -> None:
+    for analyzer in analyzers:
+        print(f"\n{'='*70}")
+        print(f"OUTPUT: {analyzer.name}")
+        print(f"{'='*70}")
+        analyzer.write_output()
+
+
+def record_failure(quarantine, demo_path, partials, error) -> None:
+    """Quarantine a failed demo, or release a demo that now succeeds"""
+    if error is not None:
+        quarantine.add(demo_path, error)
+        quarantine.save()
+    elif quarantine.discard(demo_path):
+        quarantine.save()
+
+
+def run_analyzers(analyzers, demo_files, workers: int = 1, engine: str = "pandas",
+                  memory_limit_mb: int = MEMORY_LIMIT_MB, resume: bool = False, state_dir: Path = STATE_DIR) -> None:
+    """Parse every demo once with the union profile and merge each analyzer's partials.
+
+    The aggregates are checkpointed as demos are merged; with resume=True the run
+    continues from the last checkpoint and skips quarantined demos.
+    """
+    quarantine = Quarantine(state_dir)
+    checkpoint = Checkpoint(analyzers, state_dir)
+    merged = checkpoint.restore(analyzers, demo_files) if resume else []
+    done = set(merged)
+    todo = [p for p in demo_files if str(p) not in done and not (resume and quarantine.is_bad(p))]
+    if resume:
+        print(f"[resume] {len(merged)} demos from the checkpoint, "
+              f"{len(demo_files) - len(merged) - len(todo)} quarantined skipped, {len(todo)} to go")
+
+    try:
+        for demo_path, partials, error in iter_partials(analyzers, todo, workers, engine, memory_limit_mb):
+            record_failure(quarantine, demo_path, partials, error)
+            if partials is None:
+                continue
+            merge_partials(analyzers, partials)
+            merged.append(str(demo_path))
+            if checkpoint.due():
+                checkpoint.save(analyzers, merged)
+    except BaseException as e:
+        checkpoint.save(analyzers, merged)
+        print(f"\n[checkpoint] {type(e).__name__} after {len(merged)} demos; rerun with --resume to continue")
+        raise
+    write_outputs(analyzers)
+    checkpoint.clear()
+    if quarantine.entries:
+        print(f"[quarantine] {len(quarantine.entries)} failing demos listed in {quarantine.path}")
+
+
+def run_incremental(analyzers, demo_root: Path, demo_files, workers: int = 1, engine: str = "pandas",
+                    memory_limit_mb: int = MEMORY_LIMIT_MB, corpus_files=None, resume: bool = False,
+                    state_dir: Path = STATE_DIR) -> None:
+    """Process only new/changed demos and rebuild the outputs from the stored partials.
+
+    corpus_files is every demo under demo_root when demo_files is only a selection
+    of them, so demos outside the selection are not dropped from the manifest.
+    Stored partials make every run resumable; resume=True also skips quarantined demos.
+    """
+    if not Path(demo_root).is_dir():
+        raise FileNotFoundError(f"demo root not found: {demo_root}")
+
+    manifest = Manifest(state_dir)
+    quarantine = Quarantine(state_dir)
+    removed = manifest.drop_missing(demo_root, demo_files if corpus_files is None else corpus_files)
+    todo = [p for p in demo_files if not manifest.is_current(p, analyzers)]
+    print(f"[incremental] {len(todo)} new/changed, {len(demo_files) - len(todo)} unchanged, {len(removed)} removed")
+    if resume:
+        todo = [p for p in todo if not quarantine.is_bad(p)]
+    manifest.save()
+
+    for demo_path, partials, error in iter_partials(analyzers, todo, workers, engine, memory_limit_mb):
+        record_failure(quarantine, demo_path, partials, error)
+        if partials is not None:
+            manifest.store(demo_path, analyzers, partials)
+            manifest.save()
+
+    # Merge in corpus order so the CSVs match a full rerun. A demo that failed to
+    # reprocess keeps the partials of older analyzer versions; those are left out
+    for demo_path in demo_files:
+        if str(demo_path) not in manifest.entries:
+            continue
+        partials = manifest.load(demo_path, analyzers)
+        stale = [a.name for a, partial in zip(analyzers, partials) if partial is None]
+        if stale:
+            print(f"[incremental] skipping {demo_path.name} for {', '.join(stale)}: no current stored partial")
+        merge_partials(analyzers, partials)
+    write_outputs(analyzers)
+
+
+def run_from_args(analyzers, args) -> None:
+    catalog = load_catalog(args.demo_root, rescan=args.rescan)
+    demo_files = catalog.select(event=args.event, map_name=args.map, tickrate=args.tickrate)
+    print(f"Found {len(demo_files)} demos under {args.demo_root}")
+    if args.incremental:
+        run_incremental(analyzers, args.demo_root, demo_files, workers=args.workers, engine=args.engine,
+                        memory_limit_mb=args.memory_limit_mb, corpus_files=catalog.select(), resume=args.resume)
+    else:
+        run_analyzers(analyzers, demo_files, workers=args.workers, engine=args.engine,
+                      memory_limit_mb=args.memory_limit_mb, resume=args.resume)
+
+
+def parse_args(demo_root: Path):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--demo-root", type=Path, default=demo_root)
+    parser.add_argument("--workers", type=int, default=1, help="parallel parse/analyze processes")
+    parser.add_argument("--engine", choices=["pandas", "polars"], default="pandas",
+                        help="pandas row loops, or polars lazy queries (same output)")
+    parser.add_argument("--memory-limit-mb", type=int, default=MEMORY_LIMIT_MB,
+                        help="largest table loaded whole per demo; bigger tick tables are read per round (0 = no limit)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only process new/changed demos, reuse stored partials for the rest")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue from the last checkpoint and skip quarantined (failing) demos")
+    parser.add_argument("--event", default=None, help="only demos in this event folder (from the demo catalog)")
+    parser.add_argument("--map", default=None, help="only demos on this map, e.g. de_nuke (from the demo catalog)")
+    parser.add_argument("--tickrate", type=int, default=None, help="only demos with this tickrate (from the demo catalog)")
+    parser.add_argument("--rescan", action="store_true",
+                        help="list every folder of the demo root again instead of only changed ones")
+    return parser.parse_args()
@@ -0,0 +1,93 @@
+"""Player identity keyed on steamid.
+
+Analyzers key their aggregates on the player's steamid (as an int64), so a
+player who renames, or whose name needs an alias (sh1ro/SH1R0), is one key
+without any entry in the roster. Each partial also carries the names seen for
+its steamids; merging collects them, and write_output() resolves the ids
+through the persistent steamid -> canonical name table, which is updated with
+every new steamid. A new steamid is named after the roster-normalized name it
+was first seen with; edit players.json to rename a player for good.
+
+Layout:
+    <state_dir>/players.json   {steamid: {"name": canonical name, "seen": [names]}}
+"""
+import json
+from pathlib import Path
+
+import polars as pl
+
+from common.aliases import norm_name
+from common.manifest import STATE_DIR
+
+# ===== Configuration =====
+NO_ID = 0  # steamid of bots; the world has none
+
+
+def with_ids(frame, columns):
+    """Cast steamid columns to Int64 keys and drop rows without a player id (world, bots).
+
+    Works on DataFrames and LazyFrames; cast before .to_pandas(), where a
+    UInt64 column with nulls would become float64 and lose digits.
+    """
+    frame = frame.with_columns(pl.col(c).cast(pl.Int64) for c in columns)
+    return frame.filter(pl.all_horizontal((pl.col(c).is_not_null() & (pl.col(c) != NO_ID)) for c in columns))
+
+
+def add_names(names: dict, pairs) -> None:
+    """Record (steamid, name) pairs into names: steamid -> names in order of first appearance"""
+    for steamid, name in pairs:
+        if not isinstance(name, str):
+            continue
+        seen = names.setdefault(int(steamid), [])
+        name = name.strip()
+        if name not in seen:
+            seen.append(name)
+
+
+def merge_names(total: dict, partial: dict) -> None:
+    """Fold a partial's names into total, keeping first-appearance order"""
+    for steamid, seen in partial.items():
+        add_names(total, ((steamid, name) for name in seen))
+
+
+class PlayerTable:
+    """Persistent steamid -> canonical name table"""
+
+    def __init__(self, state_dir: Path = STATE_DIR):
+        self.path = Path(state_dir) / "players.json"
+        self.entries = json.loads(self.path.read_text()) if self.path.exists() else {}
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(self.entries, indent=1, sort_keys=True, ensure_ascii=False))
+        tmp.replace(self.path)
+
+    def observe(self, names: dict) -> None:
+        """Add steamids seen in merged partials; known steamids keep their canonical name"""
+        for steamid, seen in names.items():
+            if not seen:
+                continue
+            entry = self.entries.setdefault(str(steamid), {"name": norm_name(seen[0]), "seen": []})
+            entry["seen"] += [name for name in seen if name not in entry["seen"]]
+
+    def name(self, steamid) -> str:
+        entry = self.entries.get(str(steamid))
+        return entry["name"] if entry is not None else str(steamid)
+
+    def by_name(self, stats):
+        """Accumulator keyed on steamid re-keyed on canonical name (ids sharing a name are added up)"""
+        return stats.renamed(self.name)
+
+
+def player_table(names: dict, state_dir: Path = STATE_DIR) -> PlayerTable:
+    """The player table, updated with names and saved"""
+    players = PlayerTable(state_dir)
+    players.observe(names)
+    players.save()
+    return players
+
+
+def resolve_names(stats, names: dict, state_dir: Path = STATE_DIR):
+    """Update the player table with names and return stats keyed on canonical name"""
+    return player_table(names, state_dir).by_name(stats)
@@ -0,0 +1,79 @@
+"""Shared knife/warmup round detection.
+
+The first round of a demo is a knife round if it has damage events and none
+of their weapons is a gun. The verdict only needs the first round's damage
+weapons, so it is computed from a filtered scan of the cached damages table
+and stored next to the cached tables (knife_round.json). Callers drop the
+round with round_mask() / drop_knife_round(), or simply skip it when reading
+ticks per round.
+"""
+import hashlib
+import json
+
+import polars as pl
+
+# ===== Valid weapons for knife round detection =====
+# Union of the per-script sets this replaces
+VALID_GUNS = frozenset({
+    "hkp2000", "elite", "glock", "p250", "fiveseven", "tec9", "cz75a", "deagle", "revolver", "usp_silencer", "usp_silencer_off",
+    "mac10", "mp9", "mp7", "mp5sd", "ump45", "p90", "bizon",
+    "galilar", "famas", "ak47", "m4a1", "m4a1_silencer", "sg556", "aug",
+    "ssg08", "awp", "g3sg1", "scar20",
+    "nova", "xm1014", "mag7", "sawedoff",
+    "negev", "m249", "taser",
+})
+GUNS_KEY = hashlib.sha1(",".join(sorted(VALID_GUNS)).encode()).hexdigest()[:12]
+
+
+def _detect(demo) -> dict:
+    rounds = demo.scan("rounds")
+    damages = demo.scan("damages")
+    first_round = rounds.select(pl.col("round_num").min()).collect().item()
+    if first_round is None:
+        return {"first_round": None, "is_knife": False, "weapons": []}
+
+    if "weapon" not in damages.collect_schema().names():
+        return {"first_round": int(first_round), "is_knife": False, "weapons": []}
+    used = damages.filter(pl.col("round_num") == first_round).select(
+        pl.len().alias("n_damages"),
+        pl.col("weapon").drop_nulls().cast(pl.String).str.to_lowercase().unique().sort().implode().alias("weapons"),
+    ).collect()
+    weapons = used["weapons"][0].to_list()
+    is_knife = used["n_damages"][0] > 0 and VALID_GUNS.isdisjoint(weapons)
+    return {"first_round": int(first_round), "is_knife": bool(is_knife), "weapons": weapons}
+
+
+def knife_round(demo) -> dict:
+    """{"first_round", "is_knife", "weapons"} for a demo's first round (first_round is None
+    without rounds), cached with the demo's parsed tables
+    """
+    cache_file = demo.cache_dir / "knife_round.json"
+    try:
+        cached = json.loads(cache_file.read_text())
+        if cached.get("guns") == GUNS_KEY:
+            return cached["verdict"]
+    except (OSError, ValueError):
+        pass
+
+    verdict = _detect(demo)
+    try:
+        cache_file.write_text(json.dumps({"guns": GUNS_KEY, "verdict": verdict}))
+    except OSError as e:
+        print(f"[warn] could not cache the knife round verdict: {e}")
+    return verdict
+
+
+def round_mask(knife: dict) -> pl.Expr:
+    """True for rows outside the knife round (rows without a round_num are kept)"""
+    if not knife["is_knife"]:
+        return pl.lit(True)
+    return pl.col("round_num").ne_missing(knife["first_round"])
+
+
+def drop_knife_round(frame, knife: dict):
+    """pandas or polars (lazy) frame without the rows of the knife round, if there is one"""
+    if isinstance(frame, (pl.DataFrame, pl.LazyFrame)):
+        return frame.filter(round_mask(knife))
+    if not knife["is_knife"] or frame is None or frame.empty:
+        return frame
+    return frame[frame["round_num"] != knife["first_round"]]
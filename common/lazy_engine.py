@@ -0,0 +1,65 @@
+"""Building blocks for the polars-lazy engine (--engine polars).
+
+The pandas path converts the tables with .to_pandas() and then filters them
+once per round. The lazy engine scans the cached parquet files instead,
+expresses the knife-round filter, the per-round windows and joins as
+LazyFrames, and collects them together, so polars can push the filters into
+the scans and only materialize the small per-round results. Analyzers fold
+those results into the same partials their pandas process() builds.
+"""
+import polars as pl
+
+from common.aliases import ALIASES
+from common.identity import with_ids
+
+
+def norm_expr(column: str) -> pl.Expr:
+    """Vectorized norm_name(): strip, then map aliases to their canonical name"""
+    return pl.col(column).str.strip_chars().replace(ALIASES)
+
+
+def round_window(ticks: pl.LazyFrame, rounds: pl.LazyFrame, first: int, last: int,
+                 anchor: str = "freeze_end") -> pl.LazyFrame:
+    """Ticks of each round between anchor+first and anchor+last, in tick order.
+
+    round_order is the round's position in the rounds table, for folding the
+    results in the same order as a loop over rounds.
+    """
+    anchors = (
+        rounds.with_row_index("round_order")
+        .filter(pl.col(anchor).is_not_null())
+        .select("round_order", "round_num", anchor)
+    )
+    return ticks.join(anchors, on="round_num", maintain_order="left").filter(
+        (pl.col("tick") >= pl.col(anchor) + first) & (pl.col("tick") <= pl.col(anchor) + last)
+    )
+
+
+def most_common(frame: pl.LazyFrame, keys: list, value: str) -> pl.LazyFrame:
+    """Most common value per group; ties go to the value seen first (value_counts().idxmax())"""
+    return (
+        frame.with_row_index("_row")
+        .group_by([*keys, value])
+        .agg(pl.len().alias("_count"), pl.col("_row").min().alias("_first"))
+        .sort([*keys, "_count", "_first"], descending=[False] * len(keys) + [True, False])
+        .group_by(keys, maintain_order=True)
+        .agg(pl.col(value).first())
+    )
+
+
+def round_participants(ticks: pl.LazyFrame, rounds: pl.LazyFrame) -> pl.LazyFrame:
+    """(round_order, steamid, name) of every player seen in a round, in order of first
+    appearance; name is the first one the steamid had in that round
+    """
+    orders = rounds.with_row_index("round_order").select("round_order", "round_num").unique("round_num", keep="first")
+    return (
+        with_ids(ticks.select("round_num", "steamid", "name"), ["steamid"])
+        .drop_nulls(["name", "round_num"])
+        .with_row_index("_row")
+        .with_columns(pl.col("name").str.strip_chars())
+        .join(orders, on="round_num")
+        .group_by("round_order", "steamid")
+        .agg(pl.col("_row").min(), pl.col("name").sort_by("_row").first())
+        .sort("round_order", "_row")
+        .select("round_order", "steamid", "name")
+    )
@@ -0,0 +1,110 @@
+"""Processed-demo manifest for incremental corpus runs.
+
+Every processed demo is recorded with its size, mtime and content hash, and
+each analyzer's partial for it is pickled next to the manifest. A rerun only
+processes demos that are new or whose content changed, drops demos that
+disappeared from the corpus, and rebuilds the CSVs by merging the stored
+partials.
+
+Layout:
+    <state_dir>/manifest.json
+    <state_dir>/partials/<path digest>/<analyzer name>.pkl
+"""
+import hashlib
+import json
+import os
+import pickle
+import shutil
+from pathlib import Path
+
+from common.parse_cache import content_hash
+
+# ===== Configuration =====
+STATE_DIR = Path(os.environ.get("CS2_STATE_DIR", Path(__file__).resolve().parents[1] / ".corpus_state"))
+
+
+def plain(obj):
+    """Copy of a partial with defaultdicts turned into dicts, so it unpickles anywhere"""
+    if isinstance(obj, dict):
+        return {key: plain(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [plain(value) for value in obj]
+    return obj
+
+
+class Manifest:
+    def __init__(self, state_dir: Path = STATE_DIR):
+        self.state_dir = Path(state_dir)
+        self.path = self.state_dir / "manifest.json"
+        self.entries = json.loads(self.path.read_text()) if self.path.exists() else {}
+
+    def save(self) -> None:
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(self.entries, indent=1, sort_keys=True))
+        tmp.replace(self.path)
+
+    def partial_dir(self, demo_path: Path) -> Path:
+        return self.state_dir / "partials" / hashlib.sha1(str(demo_path).encode()).hexdigest()[:16]
+
+    def is_current(self, demo_path: Path, analyzers) -> bool:
+        """True if every analyzer has a stored partial for the demo's current content"""
+        entry = self.entries.get(str(demo_path))
+        if entry is None:
+            return False
+        if any(entry["partials"].get(a.name) != a.version for a in analyzers):
+            return False
+        if not all((self.partial_dir(demo_path) / f"{a.name}.pkl").exists() for a in analyzers):
+            return False
+
+        st = demo_path.stat()
+        if entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            return True
+        # Touched but maybe not changed (copied back from a backup, etc.)
+        if content_hash(demo_path) == entry["sha256"]:
+            entry["size"], entry["mtime_ns"] = st.st_size, st.st_mtime_ns
+            return True
+        return False
+
+    def store(self, demo_path: Path, analyzers, partials) -> None:
+        st = demo_path.stat()
+        digest = content_hash(demo_path)
+        entry = self.entries.get(str(demo_path))
+        if entry is None or entry["sha256"] != digest:
+            # New content: partials of analyzers not in this run are stale too
+            shutil.rmtree(self.partial_dir(demo_path), ignore_errors=True)
+            entry = {"partials": {}}
+
+        out_dir = self.partial_dir(demo_path)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for analyzer, partial in zip(analyzers, partials):
+            with open(out_dir / f"{analyzer.name}.pkl", "wb") as f:
+                pickle.dump(plain(partial), f, protocol=pickle.HIGHEST_PROTOCOL)
+            entry["partials"][analyzer.name] = analyzer.version
+
+        entry.update(size=st.st_size, mtime_ns=st.st_mtime_ns, sha256=digest)
+        self.entries[str(demo_path)] = entry
+
+    def load(self, demo_path: Path, analyzers) -> list:
+        """Stored partial of each analyzer; None where it is missing or from another version"""
+        entry = self.entries.get(str(demo_path), {"partials": {}})
+        out_dir = self.partial_dir(demo_path)
+        partials = []
+        for analyzer in analyzers:
+            path = out_dir / f"{analyzer.name}.pkl"
+            if entry["partials"].get(analyzer.name) != analyzer.version or not path.exists():
+                partials.append(None)
+                continue
+            with open(path, "rb") as f:
+                partials.append(pickle.load(f))
+        return partials
+
+    def drop_missing(self, demo_root: Path, demo_files) -> list:
+        """Forget demos under demo_root that are no longer in the corpus"""
+        demo_root = str(Path(demo_root)) + os.sep
+        current = {str(p) for p in demo_files}
+        removed = [p for p in self.entries if p.startswith(demo_root) and p not in current]
+        for p in removed:
+            shutil.rmtree(self.partial_dir(Path(p)), ignore_errors=True)
+            del self.entries[p]
+        return removed
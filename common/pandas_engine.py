@@ -0,0 +1,71 @@
+"""Building blocks for the vectorized pandas engine (--engine pandas).
+
+The pandas process() methods used to filter each round's rows, group them
+with a Python lambda and walk the groups with iterrows(). These helpers do
+the same per-(round, player) work for all rounds of a demo in single grouped
+operations, in the row order the per-round loops produced, so the partials
+come out the same.
+"""
+import numpy as np
+import pandas as pd
+
+from common.aliases import norm_names
+
+
+def modal_values(frame: pd.DataFrame, keys: list, value: str, order: list = None) -> pd.DataFrame:
+    """keys + [value]: the most common value per group, ties to the value seen first
+    (value_counts().idxmax()). Rows are sorted on the order columns (default: keys),
+    compared as strings like the object columns groupby() used to sort.
+    """
+    order = keys if order is None else order
+    counts = (
+        frame.assign(_row=np.arange(len(frame)))
+        .groupby([*keys, value], observed=True, sort=False)["_row"]
+        .agg(["size", "min"])
+        .reset_index()
+    )
+    counts = counts.astype({c: str for c in order if isinstance(counts[c].dtype, pd.CategoricalDtype)})
+    counts = counts.sort_values([*order, "size", "min"],
+                                ascending=[True] * len(order) + [False, True], kind="stable")
+    return counts.drop_duplicates(order)[[*keys, value]].reset_index(drop=True)
+
+
+def side_totals(grouped: pd.DataFrame, value: str, side: str, by: str = "round_order") -> pd.Series:
+    """Sum of value over the rows of each round that are on the given side, on every row"""
+    return grouped[value].where(grouped["side"] == side, 0).groupby(grouped[by]).transform("sum")
+
+
+def map_distinct(values: pd.Series, func, missing) -> np.ndarray:
+    """func() of every row of a column, called once per distinct value; missing for null rows"""
+    codes, uniques = pd.factorize(values)
+    return np.array([func(value) for value in uniques] + [missing])[codes]
+
+
+# Kills that are not a player killing another player: suicides and world damage
+INVALID_WEAPONS = {"", " ", "world", "worldspawn", "inferno", "trigger_hurt", "unknown"}
+FIRST_KILL_COLUMNS = ["attacker_steamid", "attacker_name", "attacker_side", "attacker_X", "attacker_Y", "attacker_Z",
+                      "victim_steamid", "victim_name", "victim_side", "victim_X", "victim_Y", "victim_Z", "weapon", "tick"]
+
+
+def valid_kills(kills: pd.DataFrame) -> pd.Series:
+    """True for kills that are not self-kills (same attacker and victim name) or world damage"""
+    self_kill = kills["attacker_name"].astype(str) == kills["victim_name"].astype(str)
+    weapon = map_distinct(kills["weapon"], lambda w: str(w).lower(), "nan")
+    return pd.Series(~self_kill.to_numpy() & ~np.isin(weapon, list(INVALID_WEAPONS)), index=kills.index)
+
+
+def first_kills(kills: pd.DataFrame) -> pd.DataFrame:
+    """The earliest valid kill of every round, indexed by round_num (ties to the first row).
+    Names are normalized, sides and weapons lowercased; missing sides stay null.
+    """
+    kills = kills.reset_index(drop=True)
+    kills = kills[valid_kills(kills) & kills["round_num"].notna() & kills["tick"].notna()]
+    first = kills.loc[kills.groupby("round_num", observed=True)["tick"].idxmin().to_numpy()]
+    first = first[["round_num", *[c for c in FIRST_KILL_COLUMNS if c in first.columns]]]
+    for column in ("attacker_name", "victim_name"):
+        first[column] = norm_names(first[column].astype(str))
+    for column in ("attacker_side", "victim_side", "weapon"):
+        if column in first.columns:
+            lowered = first[column].astype(str).str.lower()
+            first[column] = lowered.where(first[column].notna()) if column.endswith("_side") else lowered
+    return first.astype({"round_num": int}).set_index("round_num")
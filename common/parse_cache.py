@@ -0,0 +1,235 @@
+"""On-disk parse cache for awpy demos.
+
+Parsing a demo is by far the slowest step of every analyzer, so the tables we
+use (rounds, kills, damages, ticks, bomb) are written to parquet after the first
+parse and read back on later runs. With a ParseProfile only the profile's
+tables are parsed and cached (see common.parse_profile). Tables are written in
+row groups of ROW_GROUP_ROWS so one round of ticks can be read without the rest.
+
+Cache layout:
+    <cache_dir>/<content hash>/awpy-<version>-<profile digest>/<table>.parquet
+    <cache_dir>/<content hash>/awpy-<version>-<profile digest>/meta.json
+"""
+import hashlib
+import json
+import os
+import shutil
+from importlib.metadata import version, PackageNotFoundError
+from pathlib import Path
+
+import polars as pl
+import pyarrow.parquet as pq
+
+from common.parse_profile import TABLES, ParseProfile, parse_demo
+from common.round_index import RoundIndex
+
+# ===== Configuration =====
+CACHE_DIR = Path(os.environ.get("CS2_PARSE_CACHE", Path(__file__).resolve().parents[1] / ".parse_cache"))
+HASH_CHUNK_SIZE = 8 * 1024 * 1024
+ROW_GROUP_ROWS = 64 * 1024  # roughly one round of ticks at 64 tick
+
+
+def awpy_version() -> str:
+    try:
+        return version("awpy")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def content_hash(demo_path: Path, cache_dir: Path = CACHE_DIR) -> str:
+    """sha256 of the demo file, memoized per (size, mtime) so reruns skip the read"""
+    demo_path = Path(demo_path)
+    st = demo_path.stat()
+    memo_file = cache_dir / "hashes" / (hashlib.sha1(str(demo_path.resolve()).encode()).hexdigest() + ".json")
+    if memo_file.exists():
+        try:
+            memo = json.loads(memo_file.read_text())
+            if memo["size"] == st.st_size and memo["mtime_ns"] == st.st_mtime_ns:
+                return memo["sha256"]
+        except (ValueError, KeyError):
+            pass
+
+    h = hashlib.sha256()
+    with open(demo_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+
+    memo_file.parent.mkdir(parents=True, exist_ok=True)
+    memo_file.write_text(json.dumps({"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}))
+    return digest
+
+
+def profile_key(profile) -> str:
+    return "default" if profile is None else profile.key()
+
+
+def cache_path(demo_path: Path, profile: ParseProfile = None, cache_dir: Path = CACHE_DIR) -> Path:
+    """Directory holding the cached tables for this demo / awpy version / profile"""
+    return cache_dir / content_hash(demo_path, cache_dir) / f"awpy-{awpy_version()}-{profile_key(profile)}"
+
+
+class DemoTables:
+    """Parsed tables of one demo, read from the cache on first access.
+
+    Exposes the same attributes the scripts used on awpy's Demo
+    (header, rounds, kills, damages, ticks, bomb) as polars DataFrames.
+    With a memory_limit (bytes) no table larger than the limit is loaded whole,
+    loaded tables are dropped to make room for the next one, and round_chunks()
+    reads such tables one round at a time instead. Loaded tables are sliced per
+    round through a RoundIndex built on first use.
+    """
+
+    def __init__(self, path: Path, cache_dir: Path, header: dict, errors: dict, memory_limit: int = None):
+        self.path = Path(path)
+        self.cache_dir = cache_dir
+        self.header = header
+        self.errors = errors
+        self.memory_limit = memory_limit
+        self._frames = {}
+        self._indexes = {}
+
+    def _check(self, name: str) -> Path:
+        if name in self.errors:
+            raise RuntimeError(f"{name} table unavailable: {self.errors[name]}")
+        return self.cache_dir / f"{name}.parquet"
+
+    def table_bytes(self, name: str) -> int:
+        """Uncompressed size of a table, from the parquet footer (no data is read)"""
+        meta = pq.read_metadata(self._check(name))
+        return sum(meta.row_group(i).total_byte_size for i in range(meta.num_row_groups))
+
+    def fits(self, name: str) -> bool:
+        """Whether the whole table may be loaded under the memory limit"""
+        return self.memory_limit is None or name in self._frames or self.table_bytes(name) <= self.memory_limit
+
+    def table(self, name: str) -> pl.DataFrame:
+        if name not in self._frames:
+            path = self._check(name)
+            if self.memory_limit is not None:
+                size = self.table_bytes(name)
+                if size > self.memory_limit:
+                    raise RuntimeError(f"{name} table ({size / 2**20:.0f} MB) exceeds the memory limit "
+                                       f"({self.memory_limit / 2**20:.0f} MB); read it with round_chunks()")
+                if size + sum(f.estimated_size() for f in self._frames.values()) > self.memory_limit:
+                    self.release()  # re-read on demand
+            self._frames[name] = pl.read_parquet(path)
+        return self._frames[name]
+
+    def round_index(self, name: str) -> RoundIndex:
+        """RoundIndex of a loaded table, built once per table"""
+        frame = self.table(name)  # may release the other tables and their indexes
+        if name not in self._indexes:
+            self._indexes[name] = RoundIndex(frame)
+        return self._indexes[name]
+
+    def round_frame(self, name: str, round_num, columns=None) -> pl.DataFrame:
+        """Rows of one round. Tables under the memory limit are sliced in memory
+        through their round index; larger ones are read from the cache, skipping
+        the row groups of other rounds.
+        """
+        if self.fits(name):
+            rows = self.round_index(name).rows(int(round_num))
+            return rows if columns is None else rows.select(columns)
+        source = self.scan(name).filter(pl.col("round_num") == int(round_num))
+        if columns is not None:
+            source = source.select(columns)
+        return source.collect()
+
+    def round_chunks(self, name: str, round_nums, columns=None):
+        """Yield (round_num, rows of that round) in the order of round_nums"""
+        for round_num in round_nums:
+            yield round_num, self.round_frame(name, round_num, columns)
+
+    def collect_engine(self) -> str:
+        """polars engine for process_lazy(): streaming when the ticks do not fit in memory"""
+        return "auto" if "ticks" in self.errors or self.fits("ticks") else "streaming"
+
+    def release(self) -> None:
+        """Drop the loaded tables; they are re-read from the cache if used again"""
+        self._frames.clear()
+        self._indexes.clear()
+
+    def scan(self, name: str) -> pl.LazyFrame:
+        """Lazy scan of a table, for the polars engine"""
+        return pl.scan_parquet(self._check(name))
+
+    @property
+    def rounds(self) -> pl.DataFrame:
+        return self.table("rounds")
+
+    @property
+    def kills(self) -> pl.DataFrame:
+        return self.table("kills")
+
+    @property
+    def damages(self) -> pl.DataFrame:
+        return self.table("damages")
+
+    @property
+    def ticks(self) -> pl.DataFrame:
+        return self.table("ticks")
+
+    @property
+    def bomb(self) -> pl.DataFrame:
+        return self.table("bomb")
+
+    def __repr__(self) -> str:
+        return f"DemoTables(path={self.path}, map={self.header.get('map_name')})"
+
+
+def _write_cache(demo, out_dir: Path, profile) -> None:
+    """Write the parsed tables of an awpy Demo to out_dir atomically"""
+    tmp_dir = out_dir.with_name(out_dir.name + f".tmp{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    errors = {}
+    tables = TABLES if profile is None else profile.tables
+    for name in TABLES:
+        if name not in tables:
+            errors[name] = "not in the parse profile"
+            continue
+        try:
+            getattr(demo, name).write_parquet(tmp_dir / f"{name}.parquet", row_group_size=ROW_GROUP_ROWS)
+        except Exception as e:
+            # Keep the other tables; the error is raised again only if this table is used
+            errors[name] = f"{type(e).__name__}: {e}"
+
+    meta = {
+        "source": str(demo.path),
+        "awpy_version": awpy_version(),
+        "profile": profile.to_dict() if profile is not None else None,
+        "header": demo.header,
+        "errors": errors,
+    }
+    (tmp_dir / "meta.json").write_text(json.dumps(meta, default=str))
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    tmp_dir.rename(out_dir)
+
+
+def load_demo(demo_path: Path, profile: ParseProfile = None, cache_dir: Path = CACHE_DIR,
+              refresh: bool = False) -> DemoTables:
+    """Return the parsed tables of a demo, parsing it only on a cache miss.
+
+    Without a profile this is a drop-in for:
+        demo = Demo(str(demo_path), verbose=False)
+        demo.parse()
+    """
+    demo_path = Path(demo_path)
+    out_dir = cache_path(demo_path, profile, cache_dir)
+    meta_file = out_dir / "meta.json"
+
+    if refresh or not meta_file.exists():
+        from awpy import Demo
+
+        demo = Demo(demo_path, verbose=False)
+        if profile is None:
+            demo.parse()
+        else:
+            parse_demo(demo, profile)
+        _write_cache(demo, out_dir, profile)
+
+    meta = json.loads(meta_file.read_text())
+    return DemoTables(demo_path, out_dir, meta["header"], meta["errors"])
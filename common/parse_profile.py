@@ -0,0 +1,153 @@
+"""Declarative parse profiles: parse only what the analyzers actually read.
+
+awpy's Demo.parse() always parses ~20 event types, every tick with every
+player prop, a second full tick pass for the in-play flags, and grenades.
+A ParseProfile names the tables an analyzer reads, the player props it needs
+on ticks, and optionally the tick windows (relative to a round column) it
+looks at, e.g. econ_adv only reads freeze_end..freeze_end+16 of each round.
+
+parse_demo() then parses just those events, skips ticks entirely for
+kills-only profiles, and asks demoparser2 for the windowed ticks only. The
+tables it builds are the same awpy tables restricted to what was asked for.
+"""
+import hashlib
+import json
+
+import polars as pl
+
+# ===== Configuration =====
+TABLES = ("rounds", "kills", "damages", "ticks", "bomb")
+
+ROUND_EVENTS = ["round_freeze_end", "round_officially_ended", "bomb_planted"]
+BOMB_EVENTS = ["bomb_dropped", "bomb_pickup", "bomb_planted", "bomb_exploded", "bomb_defused"]
+TABLE_EVENTS = {
+    "rounds": ROUND_EVENTS,
+    "kills": ["player_death"],
+    "damages": ["player_hurt"],
+    "bomb": BOMB_EVENTS,
+    "ticks": [],
+}
+
+# Player props awpy always adds to events (bomb needs user_X/Y/Z/place, kills need *_side)
+EVENT_PROPS = ["last_place_name", "X", "Y", "Z", "health", "team_name"]
+# World props behind awpy's in-play filter (awpy.parsers.ticks.get_valid_ticks)
+VALIDITY_PROPS = ["is_match_started", "is_warmup_period", "is_terrorist_timeout", "is_ct_timeout",
+                  "is_technical_timeout", "is_waiting_for_resume"]
+
+
+class ParseProfile:
+    """What an analyzer reads from a demo.
+
+    tables:       subset of TABLES; rounds is always parsed
+    player_props: props needed on ticks (and on kill/damage events)
+    tick_windows: None for every in-play tick, else (round column, first, last)
+                  offsets, e.g. ("freeze_end", 0, 16) = freeze_end..freeze_end+16
+    """
+
+    def __init__(self, tables=TABLES, player_props=(), tick_windows=None):
+        unknown = set(tables) - set(TABLES)
+        if unknown:
+            raise ValueError(f"unknown tables: {sorted(unknown)}")
+        self.tables = tuple(t for t in TABLES if t in tables or t == "rounds")
+        self.player_props = tuple(dict.fromkeys(player_props))
+        self.tick_windows = None if tick_windows is None else tuple(sorted(set(map(tuple, tick_windows))))
+
+    @classmethod
+    def union(cls, profiles):
+        """Smallest profile covering all of the given ones"""
+        profiles = list(profiles)
+        tables = [t for p in profiles for t in p.tables]
+        props = [prop for p in profiles for prop in p.player_props]
+        tick_users = [p for p in profiles if "ticks" in p.tables]
+        if not tick_users or any(p.tick_windows is None for p in tick_users):
+            windows = None
+        else:
+            windows = [w for p in tick_users for w in p.tick_windows]
+        return cls(tables, props, windows)
+
+    def to_dict(self) -> dict:
+        return {
+            "tables": list(self.tables),
+            "player_props": sorted(self.player_props),
+            "tick_windows": None if self.tick_windows is None else [list(w) for w in self.tick_windows],
+        }
+
+    def key(self) -> str:
+        return hashlib.sha1(json.dumps(self.to_dict(), sort_keys=True).encode()).hexdigest()[:12]
+
+    def __eq__(self, other):
+        return isinstance(other, ParseProfile) and self.to_dict() == other.to_dict()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self) -> str:
+        return f"ParseProfile(tables={self.tables}, player_props={self.player_props}, tick_windows={self.tick_windows})"
+
+
+def window_ticks(rounds: pl.DataFrame, tick_windows) -> list:
+    """Sorted ticks covered by the windows over all rounds"""
+    ticks = set()
+    for column, first, last in tick_windows:
+        for anchor in rounds[column].drop_nulls().to_list():
+            ticks.update(range(int(anchor) + first, int(anchor) + last + 1))
+    return sorted(ticks)
+
+
+def _valid_rows(df: pl.DataFrame) -> pl.DataFrame:
+    """Row-wise form of get_valid_ticks(): the flags are world props, equal on every row of a tick"""
+    return df.filter(
+        pl.col("is_match_started")
+        & (~pl.col("is_warmup_period"))
+        & (~pl.col("is_terrorist_timeout"))
+        & (~pl.col("is_ct_timeout"))
+        & (~pl.col("is_technical_timeout"))
+        & (~pl.col("is_waiting_for_resume"))
+    )
+
+
+def _valid_ticks_at(demo, ticks) -> pl.Series:
+    """In-play ticks among the given ones (only the bomb events need these)"""
+    if not ticks:
+        return pl.Series("tick", [], dtype=pl.Int64)
+    flags = pl.from_pandas(demo.parser.parse_ticks(VALIDITY_PROPS, ticks=sorted(set(ticks))))
+    return _valid_rows(flags)["tick"].unique().sort()
+
+
+def parse_demo(demo, profile: ParseProfile):
+    """Minimal counterpart of Demo.parse() for an awpy Demo; sets the same attributes"""
+    import awpy.parsers.rounds
+    import awpy.parsers.utils
+
+    events = list(dict.fromkeys(e for t in profile.tables for e in TABLE_EVENTS[t]))
+    event_props = list(dict.fromkeys(EVENT_PROPS + list(profile.player_props)))
+    demo.events = demo.parse_events(events, player_props=event_props)
+    demo.rounds = awpy.parsers.rounds.create_round_df(demo.events)
+
+    in_play_ticks = None
+    if "ticks" in profile.tables:
+        # One tick pass with the in-play flags alongside, instead of awpy's two full passes
+        tick_props = list(dict.fromkeys(list(profile.player_props) + ["team_name"]))
+        wanted = tick_props + [p for p in VALIDITY_PROPS if p not in tick_props]
+        ticks = None if profile.tick_windows is None else window_ticks(demo.rounds, profile.tick_windows)
+        if ticks == []:
+            # No round has the anchor column; an empty ticks list would mean "every tick" to demoparser2
+            ticks_df = pl.DataFrame(schema={"tick": pl.Int64, "steamid": pl.UInt64, "name": pl.String,
+                                            **{p: pl.Boolean if p in VALIDITY_PROPS else pl.Null
+                                               for p in wanted if p not in ("steamid", "name")}})
+        else:
+            ticks_df = pl.from_pandas(demo.parser.parse_ticks(wanted, ticks=ticks))
+        ticks_df = _valid_rows(ticks_df)
+        if profile.tick_windows is None:
+            in_play_ticks = ticks_df["tick"].unique().sort()
+        ticks_df = ticks_df.drop([p for p in VALIDITY_PROPS if p not in tick_props])
+        ticks_df = awpy.parsers.rounds.apply_round_num(df=ticks_df, rounds_df=demo.rounds, tick_col="tick").filter(
+            pl.col("round_num").is_not_null()
+        )
+        demo.ticks = awpy.parsers.utils.fix_common_names(ticks_df)
+
+    if "bomb" in profile.tables and in_play_ticks is None:
+        bomb_ticks = [t for e in BOMB_EVENTS if e in demo.events for t in demo.events[e]["tick"].to_list()]
+        in_play_ticks = _valid_ticks_at(demo, bomb_ticks)
+    demo.in_play_ticks = in_play_ticks
+    return demo
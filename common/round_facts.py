@@ -0,0 +1,104 @@
+"""Per-demo round facts, computed once and cached with the parsed tables.
+
+The analyzers used to derive the same per-round facts from the rounds table
+(and exit_frag from the bomb events) with their own loops. round_facts()
+builds them once per demo with one polars query and stores them next to the
+cached tables (round_facts.parquet), so analyzers join against the same typed
+table and nothing recomputes it.
+
+Columns, one row per round with a round_num, in rounds-table order:
+    round_num                              Int64
+    winner, reason                         String, lowercased
+    start, freeze_end, end, official_end   Int64 (official_end falls back to end)
+    is_knife                               Boolean, the knife round (common.knife)
+    defuse_tick, detonate_tick             Int64, last defuse / detonation of the round
+Missing values are null; the bomb ticks are null when the bomb table was not parsed.
+"""
+import hashlib
+import json
+import os
+
+import polars as pl
+
+from common.knife import GUNS_KEY, knife_round
+
+# ===== Configuration =====
+FACTS_VERSION = 1  # bump when the columns or their derivation change
+FACTS_KEY = hashlib.sha1(f"{FACTS_VERSION}:{GUNS_KEY}".encode()).hexdigest()[:12]
+TICK_COLUMNS = ("start", "freeze_end", "end", "official_end")
+
+
+def _column(name: str, columns: list, dtype) -> pl.Expr:
+    """Column cast to dtype, or a null column if the table does not have it"""
+    return pl.col(name).cast(dtype) if name in columns else pl.lit(None, dtype=dtype)
+
+
+def _build(demo) -> pl.DataFrame:
+    rounds = demo.scan("rounds")
+    columns = rounds.collect_schema().names()
+    ticks = {c: _column(c, columns, pl.Int64) for c in TICK_COLUMNS}
+    ticks["official_end"] = pl.coalesce(ticks["official_end"], ticks["end"])
+
+    knife = knife_round(demo)
+    is_knife = pl.lit(False)
+    if knife["is_knife"]:
+        is_knife = pl.col("round_num") == knife["first_round"]
+
+    facts = (
+        rounds.filter(pl.col("round_num").is_not_null())
+        .select(
+            pl.col("round_num").cast(pl.Int64),
+            _column("winner", columns, pl.String).str.to_lowercase().alias("winner"),
+            _column("reason", columns, pl.String).str.to_lowercase().alias("reason"),
+            *(expr.alias(c) for c, expr in ticks.items()),
+            is_knife.alias("is_knife"),
+        )
+    )
+
+    try:
+        bombs = demo.scan("bomb")
+        has_events = {"round_num", "tick", "event"} <= set(bombs.collect_schema().names())
+    except RuntimeError:
+        has_events = False  # bomb table not in the parse profile
+    if has_events:
+        # The last event of each kind in a round wins
+        event = pl.col("event").cast(pl.String).str.to_lowercase()
+        bomb_ticks = (
+            bombs.drop_nulls(["round_num", "tick"])
+            .group_by(pl.col("round_num").cast(pl.Int64))
+            .agg(
+                pl.col("tick").filter(event == "defuse").last().cast(pl.Int64).alias("defuse_tick"),
+                pl.col("tick").filter(event == "detonate").last().cast(pl.Int64).alias("detonate_tick"),
+            )
+        )
+        facts = facts.join(bomb_ticks, on="round_num", how="left", maintain_order="left")
+    else:
+        facts = facts.with_columns(pl.lit(None, dtype=pl.Int64).alias("defuse_tick"),
+                                   pl.lit(None, dtype=pl.Int64).alias("detonate_tick"))
+    return facts.collect()
+
+
+def round_facts(demo) -> pl.DataFrame:
+    """The demo's round facts table (see the module docstring), cached with its parsed tables"""
+    cache_file = demo.cache_dir / "round_facts.parquet"
+    key_file = demo.cache_dir / "round_facts.json"
+    try:
+        if json.loads(key_file.read_text()).get("key") == FACTS_KEY:
+            return pl.read_parquet(cache_file)
+    except (OSError, ValueError):
+        pass
+
+    facts = _build(demo)
+    try:
+        tmp = cache_file.with_name(f"round_facts.tmp{os.getpid()}.parquet")
+        facts.write_parquet(tmp)
+        tmp.replace(cache_file)
+        key_file.write_text(json.dumps({"key": FACTS_KEY}))
+    except OSError as e:
+        print(f"[warn] could not cache the round facts: {e}")
+    return facts
+
+
+def played_rounds(demo) -> pl.DataFrame:
+    """Round facts without the knife round"""
+    return round_facts(demo).filter(~pl.col("is_knife"))
@@ -0,0 +1,42 @@
+"""Per-demo round index: the rows of each round as a slice of one sorted table.
+
+Filtering a table with round_num == r inside a loop over rounds scans every
+row once per round. RoundIndex sorts the table on round_num once (stable, so
+rows keep their order within a round; tables already in round order are not
+copied) and finds each round's offsets with a binary search, so rows(r) is a
+zero-copy slice. Works on pandas and polars DataFrames; rows without a
+round_num are left out.
+"""
+import numpy as np
+import polars as pl
+
+
+class RoundIndex:
+    def __init__(self, frame, column: str = "round_num"):
+        if isinstance(frame, pl.DataFrame):
+            if frame[column].null_count():
+                frame = frame.filter(pl.col(column).is_not_null())
+            if not frame[column].is_sorted():
+                frame = frame.sort(column, maintain_order=True)
+        else:
+            if frame[column].isna().any():
+                frame = frame[frame[column].notna()]
+            if not frame[column].is_monotonic_increasing:
+                frame = frame.sort_values(column, kind="stable")
+        self.frame = frame
+        self.column = column
+        self._keys = frame[column].to_numpy()
+
+    def bounds(self, round_num) -> tuple:
+        """(start, stop) offsets of the round's rows in self.frame"""
+        start = int(np.searchsorted(self._keys, round_num, side="left"))
+        stop = int(np.searchsorted(self._keys, round_num, side="right"))
+        return start, stop
+
+    def rows(self, round_num):
+        """Rows of one round, in table order (empty if the round has none)"""
+        start, stop = self.bounds(round_num)
+        if isinstance(self.frame, pl.DataFrame):
+            return self.frame.slice(start, stop - start)
+        return self.frame.iloc[start:stop]
+
@@ -0,0 +1,111 @@
+"""Player -> team per event, inferred from the team_clan_name of the ticks.
+
+The ticks need the team_clan_name player prop: awpy renames the team_name
+prop to side (ct/t), and it only ever held CT/TERRORIST anyway. Each demo
+contributes its (player, team_clan_name) tick counts in one grouped count
+over the ticks; the counts of an event's demos are added up and the player's
+team at that event is the clan name with the most ticks (ties go to the
+first in sorted order, like mode()). The counts are stored per event and
+demo, so the visualization scripts can look teams up without parsing
+anything. A run replaces the demos it saw and keeps the others, so a
+--map or --tickrate selection does not cut an event down to its demos.
+
+Layout:
+    <state_dir>/teams.json   {event: {demo: {player: {team: ticks}}}}
+"""
+import json
+from collections import defaultdict
+from pathlib import Path
+
+import polars as pl
+
+from common.lazy_engine import norm_expr
+from common.manifest import STATE_DIR
+
+# ===== Configuration =====
+NO_EVENT = "(no event)"  # demos directly under the demo root
+TEAM_COLUMN = "team_clan_name"  # player prop holding the team's name
+
+
+def new_team_counts():
+    return defaultdict(int)
+
+
+def new_event_teams():
+    return defaultdict(new_team_counts)
+
+
+def new_event_demos():
+    return defaultdict(new_event_teams)
+
+
+def tick_teams(ticks: pl.LazyFrame, round_nums: list = None) -> pl.LazyFrame:
+    """(name, team, len): ticks per canonical player name and team clan name"""
+    if round_nums is not None:
+        ticks = ticks.filter(pl.col("round_num").is_in(round_nums))
+    team = pl.col(TEAM_COLUMN).cast(pl.String).str.strip_chars()
+    return (
+        ticks.select("name", TEAM_COLUMN)
+        .filter(pl.col("name").is_not_null() & (team != ""))
+        .group_by(norm_expr("name").alias("name"), team.alias("team"))
+        .agg(pl.len())
+    )
+
+
+def demo_team_counts(ticks: pl.LazyFrame, round_nums: list = None, engine: str = "auto") -> dict:
+    """player -> team -> ticks of one demo; empty if the ticks lack the team prop"""
+    team_counts = new_event_teams()
+    if TEAM_COLUMN not in ticks.collect_schema().names():
+        return team_counts
+    for player, team, count in tick_teams(ticks, round_nums).collect(engine=engine).iter_rows():
+        team_counts[player][team] += count
+    return team_counts
+
+
+def modal_team(teams: dict) -> str:
+    """Team with the most ticks; ties go to the first in sorted order"""
+    return min(teams.items(), key=lambda item: (-item[1], item[0]))[0]
+
+
+class TeamTable:
+    """Persistent event -> demo -> player -> team tick counts"""
+
+    def __init__(self, state_dir: Path = STATE_DIR):
+        self.path = Path(state_dir) / "teams.json"
+        events = json.loads(self.path.read_text()) if self.path.exists() else {}
+        # Events stored before the counts were kept per demo are left for the next run to fill
+        self.events = {event: demos for event, demos in events.items()
+                       if all(demo.endswith(".dem") for demo in demos)}
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(self.events, indent=1, sort_keys=True, ensure_ascii=False))
+        tmp.replace(self.path)
+
+    def update(self, event_demos: dict) -> None:
+        """Replace the counts of the demos in event_demos (event -> demo -> player -> team -> ticks)"""
+        for event, demos in event_demos.items():
+            stored = self.events.setdefault(event, {})
+            for demo, players in demos.items():
+                stored[demo] = {player: dict(teams) for player, teams in players.items()}
+
+    def teams(self, event: str = None) -> dict:
+        """player -> team at one event, or over all events (most ticks overall)"""
+        totals = new_event_teams()
+        for name in ([event] if event is not None else self.events):
+            for players in self.events.get(name, {}).values():
+                for player, teams in players.items():
+                    for team, count in teams.items():
+                        totals[player][team] += count
+        return {player: modal_team(teams) for player, teams in totals.items()}
+
+
+def load_player_teams(event: str = None, state_dir: Path = STATE_DIR) -> dict:
+    """player -> team from the stored table (empty before the first analyzer run)"""
+    return TeamTable(state_dir).teams(event)
+
+
+def player_teams(overrides: dict, event: str = None, state_dir: Path = STATE_DIR) -> dict:
+    """player -> team from the stored table, with the hand-written overrides on top"""
+    return {**load_player_teams(event, state_dir), **overrides}
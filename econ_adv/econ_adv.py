@@ -1,8 +1,19 @@
-from awpy import Demo
 from pathlib import Path
+import sys
 import pandas as pd
 import numpy as np
-from collections import defaultdict
+import polars as pl
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.accumulator import Accumulator
+from common.categories import to_pandas
+from common.driver import Analyzer, parse_args, run_from_args
+from common.identity import add_names, merge_names, resolve_names, with_ids
+from common.knife import drop_knife_round, knife_round
+from common.lazy_engine import most_common, round_window
+from common.pandas_engine import modal_values, side_totals
+from common.parse_profile import ParseProfile
+from common.round_facts import round_facts
 
 # ===== Configuration =====
 demo_root = Path("/Volumes/TOSHIBA EXT/Demo_2025")  # Change to your root directory
@@ -11,288 +22,270 @@ output_csv = "weapon_advantage_analysis.csv"
 ECONOMY_THRESHOLD = 2000  # Configurable threshold for "equal" economy
 DEFAULT_TICKRATE = 64
 
-# ===== Valid weapons for knife round detection =====
-valid_guns = {
-    "hkp2000", "elite", "glock", "p250", "fiveseven", "tec9", "cz75a", "deagle", "revolver", "usp_silencer", "usp_silencer_off",
-    "mac10", "mp9", "mp7", "mp5sd", "ump45", "p90", "bizon",
-    "galilar", "famas", "ak47", "m4a1", "m4a1_silencer", "sg556", "aug",
-    "ssg08", "awp", "g3sg1", "scar20",
-    "nova", "xm1014", "mag7", "sawedoff",
-    "negev", "m249", "taser"
-}
-
-# ===== Name normalization =====
-alias_map = {
-    "sh1ro": {"SH1R0", "sh1r0"},
-    "910": {"910-", "-910"},
-    "mzinho": {"Mzinho"},
-    "Techno": {"Techno4K"},
-    "Ag1l": {"ag1l", "ag1L"},
-    "dav1deuS": {"dav1deu$", "davideuS"},
-    "device": {"dev1ce"},
-    "electroNic": {"electronic"},
-    "HeavyGod": {"HeavyGoD"},
-    "hfah": {"Hfah"},
-    "huNter-": {"huNter"},
-    "hypex": {"Hypex"},
-    "jcobbb": {"Jcobbb"},
-    "kauez": {"Kauez"},
-    "lux": {"Lux"},
-    "NAF": {"NAF-FLY"},
-    "NertZ": {"nertZ"},
-    "skullz": {"Skullz"},
-    "Snax": {"snax"},
-    "woxic": {"Woxic"},
-}
-
-def norm_name(name: str) -> str:
-    if not isinstance(name, str):
-        return name
-    s = name.strip()
-    for canon, vars_ in alias_map.items():
-        if s == canon or s in vars_:
-            return canon
-    return s
-
-# ===== Find demo files =====
-demo_files = [f for f in sorted(demo_root.rglob("*.dem")) if not f.name.startswith("._")]
-print(f"Found {len(demo_files)} demos under {demo_root}")
-
-# ===== Global aggregators =====
-# player -> condition -> {"kills": int, "deaths": int, "rounds": int}
+# ===== Aggregators =====
+# steamid x condition x metric counts
 # conditions: "advantage", "equal", "disadvantage", "overall"
-player_stats = defaultdict(lambda: {
-    "advantage": {"kills": 0, "deaths": 0, "rounds": 0},
-    "equal": {"kills": 0, "deaths": 0, "rounds": 0},
-    "disadvantage": {"kills": 0, "deaths": 0, "rounds": 0},
-    "overall": {"kills": 0, "deaths": 0, "rounds": 0}
-})
-
-countknife = 0
-
-for demo_path in demo_files:
-    print(f"\nParsing {demo_path.name}")
-    try:
-        demo = Demo(str(demo_path), verbose=False)
-        demo.parse(player_props=["name", "current_equip_value", "side"])
-        
-        rounds_df = demo.rounds.to_pandas()
-        ticks_df = demo.ticks.to_pandas()
-        kills_df = demo.kills.to_pandas()
-        damages_df = demo.damages.to_pandas()
-    except Exception as e:
-        print(f"[warn] failed on {demo_path.name}: {e}")
-        continue
-
-    if rounds_df is None or rounds_df.empty:
-        print(f"[warn] {demo_path.name} has empty rounds data")
-        continue
-
-    # ===== Remove knife/warmup round =====
-    if not rounds_df.empty and damages_df is not None and not damages_df.empty:
-        first_round = int(rounds_df["round_num"].min())
-        first_round_damages = damages_df[damages_df["round_num"] == first_round]
-        
-        if not first_round_damages.empty and "weapon" in first_round_damages.columns:
-            used_weapons = set(first_round_damages["weapon"].dropna().astype(str).str.lower().unique())
-            
-            if used_weapons.isdisjoint(valid_guns):
-                print(f"[INFO] Removing knife round {first_round} from {demo_path.name}")
-                countknife += 1
-                rounds_df = rounds_df[rounds_df["round_num"] != first_round]
-                if ticks_df is not None and not ticks_df.empty:
-                    ticks_df = ticks_df[ticks_df["round_num"] != first_round]
-                if kills_df is not None and not kills_df.empty:
-                    kills_df = kills_df[kills_df["round_num"] != first_round]
-
-    # ===== Process each round =====
-    for _, rnd in rounds_df.iterrows():
-        round_num = rnd["round_num"]
-        freeze_end = rnd["freeze_end"]
-        
-        if pd.isna(round_num) or pd.isna(freeze_end):
-            continue
-        
-        round_num = int(round_num)
-        freeze_end = int(freeze_end)
-        
-        # Get ticks from freeze_end to freeze_end + 16
-        tick_slice = ticks_df[
-            (ticks_df["tick"] >= freeze_end) & 
-            (ticks_df["tick"] <= freeze_end + 16) &
-            (ticks_df["round_num"] == round_num)
-        ].dropna(subset=["name", "current_equip_value", "side"])
-        
+CONDITIONS = ["advantage", "equal", "disadvantage", "overall"]
+METRICS = ["kills", "deaths", "rounds"]
+
+def new_player_stats():
+    return Accumulator(CONDITIONS, METRICS)
+
+def add_counts(player_stats, counts, metric=None):
+    """Add a grouped count over (steamid, condition[, metric]) under its condition and overall"""
+    players, conditions = counts.index.get_level_values(0), counts.index.get_level_values(1)
+    metrics = counts.index.get_level_values(2) if metric is None else metric
+    player_stats.add(players, conditions, metrics, counts=counts.to_numpy())
+    player_stats.add(players, "overall", metrics, counts=counts.to_numpy())
+
+def kill_events(kills, key="round_num"):
+    """(key, steamid, stat): a "kills" row per attacker and a "deaths" row per victim with a
+    steamid, of the kills between two named players (no world kills)
+    """
+    kills = kills.drop_nulls(["attacker_name", "victim_name"])
+    return pl.concat([
+        with_ids(kills.select(key, pl.col(f"{role}_steamid").alias("steamid")), ["steamid"])
+        .with_columns(pl.lit(stat).alias("stat"))
+        for role, stat in [("attacker", "kills"), ("victim", "deaths")]
+    ])
+
+def condition_of(own_total, other_total, threshold=ECONOMY_THRESHOLD):
+    """advantage / equal / disadvantage of a side with own_total against other_total"""
+    return np.select(
+        [own_total > other_total + threshold, own_total < other_total - threshold],
+        ["advantage", "disadvantage"],
+        default="equal",
+    )
+
+def economy_conditions(grouped, threshold=ECONOMY_THRESHOLD):
+    """advantage / equal / disadvantage of each player's side, from the CT and T totals of the round"""
+    is_ct = grouped["side"] == "ct"
+    ct_total = side_totals(grouped, "current_equip_value", "ct")
+    t_total = side_totals(grouped, "current_equip_value", "t")
+    return condition_of(ct_total.where(is_ct, t_total), t_total.where(is_ct, ct_total), threshold)
+
+# ===== Analyzer =====
+class EconAdvAnalyzer(Analyzer):
+    name = "econ_adv"
+    version = 3  # aggregates in an Accumulator keyed on steamid
+    # Only the first 16 ticks after freeze end of each round are looked at
+    profile = ParseProfile(tables=("rounds", "kills", "damages", "ticks"),
+                           player_props=["name", "steamid", "current_equip_value", "side"],
+                           tick_windows=[("freeze_end", 0, 16)])
+
+    def __init__(self, output_csv=output_csv):
+        self.output_csv = output_csv
+        self.player_stats = new_player_stats()
+        self.names = {}  # steamid -> names seen
+        self.countknife = 0
+
+    def process(self, demo_path, demo):
+        partial = {"player_stats": new_player_stats(), "names": {}, "countknife": 0}
+        player_stats = partial["player_stats"]
+
+        try:
+            rounds = round_facts(demo)
+            ticks = demo.ticks.lazy() if demo.fits("ticks") else demo.scan("ticks")
+            kills = demo.kills
+            knife = knife_round(demo)
+        except Exception as e:
+            print(f"[warn] failed on {demo_path.name}: {e}")
+            return partial
+
+        if rounds is None or rounds.is_empty():
+            print(f"[warn] {demo_path.name} has empty rounds data")
+            return partial
+
+        # ===== Remove knife/warmup round =====
+        if knife["is_knife"]:
+            print(f"[INFO] Removing knife round {knife['first_round']} from {demo_path.name}")
+            partial["countknife"] += 1
+            rounds = drop_knife_round(rounds, knife)
+            kills = drop_knife_round(kills, knife)
+
+        # ===== Ticks freeze_end .. freeze_end + 16 of every round, in one pass =====
+        tick_slice = to_pandas(
+            with_ids(round_window(ticks.select("round_num", "tick", "steamid", "name", "side", "current_equip_value"),
+                                  rounds.lazy(), 0, 16), ["steamid"])
+            .drop_nulls(["name", "current_equip_value", "side"])
+            .select("round_order", "round_num", "steamid", "name", "side", "current_equip_value")
+            .collect(engine=demo.collect_engine())
+        )
         if tick_slice.empty:
-            continue
-        
-        # Get most common equipment value for each player
-        tick_slice = tick_slice.copy()
-        grouped = tick_slice.groupby(["name", "side"])["current_equip_value"].agg(
-            lambda x: x.value_counts().idxmax() if not x.empty else 0
-        ).reset_index()
-        # print(f" Round {round_num}: Player equipment values:\n{grouped}")
-        
-        # Normalize names
-        grouped["name"] = grouped["name"].apply(norm_name)
-        
-        # Calculate team totals for each side
-        team_totals = grouped.groupby("side")["current_equip_value"].sum().to_dict()
-        
-        ct_total = team_totals.get("ct", 0)
-        t_total = team_totals.get("t", 0)
-        
-        # Determine economy condition for each side
-        # CT perspective
-        if ct_total > t_total + ECONOMY_THRESHOLD:
-            ct_condition = "advantage"
-            t_condition = "disadvantage"
-        elif ct_total < t_total - ECONOMY_THRESHOLD:
-            ct_condition = "disadvantage"
-            t_condition = "advantage"
-        else:
-            ct_condition = "equal"
-            t_condition = "equal"
-        
-        # Create player -> condition mapping for this round
-        player_conditions = {}
-        for _, row in grouped.iterrows():
-            player = row["name"]
-            side = row["side"]
-            condition = ct_condition if side == "ct" else t_condition
-            player_conditions[player] = condition
-            
-            # Track round participation
-            player_stats[player][condition]["rounds"] += 1
-            player_stats[player]["overall"]["rounds"] += 1
-        
-        # Get kills for this round
-        round_kills = kills_df[kills_df["round_num"] == round_num].copy()
-        
-        if round_kills.empty:
-            continue
-        
-        # Process kills
-        round_kills = round_kills.dropna(subset=["attacker_name", "victim_name"])
-        round_kills["attacker_name"] = round_kills["attacker_name"].apply(norm_name)
-        round_kills["victim_name"] = round_kills["victim_name"].apply(norm_name)
-        
-        for _, kill_row in round_kills.iterrows():
-            attacker = kill_row["attacker_name"]
-            victim = kill_row["victim_name"]
-            
-            # Track kills for attacker
-            if attacker in player_conditions:
-                condition = player_conditions[attacker]
-                player_stats[attacker][condition]["kills"] += 1
-                player_stats[attacker]["overall"]["kills"] += 1
-            
-            # Track deaths for victim
-            if victim in player_conditions:
-                condition = player_conditions[victim]
-                player_stats[victim][condition]["deaths"] += 1
-                player_stats[victim]["overall"]["deaths"] += 1
-
-print(f"\n{'='*70}")
-print("GENERATING OUTPUT CSV")
-print(f"{'='*70}")
-
-# ===== Generate output CSV =====
-results = []
-
-for player, conditions in player_stats.items():
-    adv = conditions["advantage"]
-    eq = conditions["equal"]
-    disadv = conditions["disadvantage"]
-    overall = conditions["overall"]
-    
-    # Only include players who participated in at least one round
-    if overall["rounds"] == 0:
-        continue
-    
-    results.append({
-        "Player": player,
-        
-        # Advantage
-        "Adv_Kills": adv["kills"],
-        "Adv_Deaths": adv["deaths"],
-        "Adv_Rounds": adv["rounds"],
-        
-        # Equal
-        "Equal_Kills": eq["kills"],
-        "Equal_Deaths": eq["deaths"],
-        "Equal_Rounds": eq["rounds"],
-        
-        # Disadvantage
-        "Disadv_Kills": disadv["kills"],
-        "Disadv_Deaths": disadv["deaths"],
-        "Disadv_Rounds": disadv["rounds"],
-        
-        # Overall
-        "Overall_Kills": overall["kills"],
-        "Overall_Deaths": overall["deaths"],
-        "Overall_Rounds": overall["rounds"]
-    })
-
-# Create DataFrame and save
-df = pd.DataFrame(results)
-df = df.sort_values("Overall_Rounds", ascending=False)
-df.to_csv(output_csv, index=False)
-
-print(f"\nDone! Results saved to {output_csv}")
-print(f"Knife rounds removed: {countknife}")
-print(f"Total players tracked: {len(df)}")
-
-# ===== Print summary statistics =====
-print("\n" + "="*70)
-print("SUMMARY STATISTICS")
-print("="*70)
-
-if not df.empty:
-    total_rounds_all = df["Overall_Rounds"].sum()
-    total_adv_rounds = df["Adv_Rounds"].sum()
-    total_eq_rounds = df["Equal_Rounds"].sum()
-    total_disadv_rounds = df["Disadv_Rounds"].sum()
-    
-    print(f"Total player-rounds: {total_rounds_all}")
-    print(f"  Advantage rounds: {total_adv_rounds} ({total_adv_rounds/total_rounds_all*100:.1f}%)")
-    print(f"  Equal rounds: {total_eq_rounds} ({total_eq_rounds/total_rounds_all*100:.1f}%)")
-    print(f"  Disadvantage rounds: {total_disadv_rounds} ({total_disadv_rounds/total_rounds_all*100:.1f}%)")
-    
-    # Calculate K/D ratios by condition (for players with significant data)
-    significant_players = df[df["Overall_Rounds"] >= 20].copy()
-    
-    if not significant_players.empty:
-        print("\n" + "="*70)
-        print(f"K/D RATIOS (Players with 20+ rounds, n={len(significant_players)})")
-        print("="*70)
-        
-        # Calculate K/D ratios
-        for condition, prefix in [("Advantage", "Adv"), ("Equal", "Equal"), ("Disadvantage", "Disadv"), ("Overall", "Overall")]:
-            kills_col = f"{prefix}_Kills"
-            deaths_col = f"{prefix}_Deaths"
-            rounds_col = f"{prefix}_Rounds"
-            
-            # Filter players with at least 5 rounds in this condition (or 20 for overall)
-            min_rounds = 200 if condition == "Overall" else 50
-            condition_df = significant_players[significant_players[rounds_col] >= min_rounds].copy()
-            
-            if condition_df.empty:
-                continue
-            
-            condition_df["KD"] = condition_df[kills_col] / condition_df[deaths_col].replace(0, 1)
-            avg_kd = condition_df["KD"].mean()
-            
-            print(f"{condition:.<20} Avg K/D: {avg_kd:.3f}")
-        
+            return partial
+        add_names(partial["names"], tick_slice[["steamid", "name"]].drop_duplicates().itertuples(index=False))
+
+        # ===== Most common equipment value and economy condition per (round, player) =====
+        # Rows in round, then steamid/side order
+        grouped = modal_values(tick_slice, ["round_order", "round_num", "steamid", "side"], "current_equip_value",
+                                order=["round_order", "steamid", "side"])
+        grouped["condition"] = economy_conditions(grouped)
+
+        add_counts(player_stats, grouped.groupby(["steamid", "condition"], sort=False).size(), "rounds")
+
+        # ===== Kills and deaths, attributed through one join =====
+        events = kill_events(kills).to_pandas()
+        if events.empty:
+            return partial
+        # A player listed twice in a round (both sides) takes the last condition
+        player_conditions = grouped.drop_duplicates(["round_order", "steamid"], keep="last")
+        events = events.merge(player_conditions[["round_num", "steamid", "condition"]], on=["round_num", "steamid"])
+
+        add_counts(player_stats, events.groupby(["steamid", "condition", "stat"], sort=False).size())
+
+        return partial
+
+    def process_lazy(self, demo_path, demo):
+        """process() on polars LazyFrames: one query plan per demo, same partial"""
+        partial = {"player_stats": new_player_stats(), "names": {}, "countknife": 0}
+        player_stats = partial["player_stats"]
+
+        try:
+            rounds = round_facts(demo).lazy()
+            ticks = demo.scan("ticks")
+            kills = demo.scan("kills")
+            knife = knife_round(demo)
+        except Exception as e:
+            print(f"[warn] failed on {demo_path.name}: {e}")
+            return partial
+
+        if knife["first_round"] is None:
+            print(f"[warn] {demo_path.name} has empty rounds data")
+            return partial
+
+        # ===== Remove knife/warmup round =====
+        rounds = drop_knife_round(rounds, knife)
+
+        # ===== Most common equipment value per player, freeze_end .. freeze_end + 16 =====
+        tick_slice = with_ids(round_window(ticks, rounds, 0, 16), ["steamid"]).drop_nulls(
+            ["name", "current_equip_value", "side"]
+        )
+        names = tick_slice.select("steamid", "name").unique(maintain_order=True)
+        grouped = most_common(tick_slice, ["round_order", "steamid", "side"], "current_equip_value")
+
+        # ===== Economy condition per side =====
+        ct_total = pl.col("current_equip_value").filter(pl.col("side") == "ct").sum()
+        t_total = pl.col("current_equip_value").filter(pl.col("side") == "t").sum()
+        totals = grouped.group_by("round_order").agg(ct_total.alias("ct_total"), t_total.alias("t_total"))
+        ct_ahead = pl.col("ct_total") > pl.col("t_total") + ECONOMY_THRESHOLD
+        ct_behind = pl.col("ct_total") < pl.col("t_total") - ECONOMY_THRESHOLD
+        ct_condition = pl.when(ct_ahead).then(pl.lit("advantage")).when(ct_behind).then(pl.lit("disadvantage")).otherwise(pl.lit("equal"))
+        t_condition = pl.when(ct_ahead).then(pl.lit("disadvantage")).when(ct_behind).then(pl.lit("advantage")).otherwise(pl.lit("equal"))
+        conditions = grouped.join(totals, on="round_order", maintain_order="left").select(
+            "round_order",
+            "steamid",
+            pl.when(pl.col("side") == "ct").then(ct_condition).otherwise(t_condition).alias("condition"),
+        )
+
+        # ===== Kills of the rounds with equipment data =====
+        round_kills = (
+            kills.select("round_num", "attacker_steamid", "attacker_name", "victim_steamid", "victim_name")
+            .with_row_index("_row")
+            .join(tick_slice.select("round_order", "round_num").unique(), on="round_num")
+            .sort("round_order", "_row")
+            .select("round_order", "attacker_steamid", "attacker_name", "victim_steamid", "victim_name")
+        )
+
+        names, conditions, round_kills = pl.collect_all([names, conditions, round_kills], engine=demo.collect_engine())
+        if knife["is_knife"]:
+            print(f"[INFO] Removing knife round {knife['first_round']} from {demo_path.name}")
+            partial["countknife"] += 1
+
+        add_names(partial["names"], names.iter_rows())
+        # Kills never add players, so counting all rounds first keeps the pandas insertion order
+        add_counts(player_stats, conditions.to_pandas().groupby(["steamid", "condition"], sort=False).size(), "rounds")
+
+        # A player listed twice in a round (both sides) takes the last condition
+        player_conditions = conditions.unique(["round_order", "steamid"], keep="last", maintain_order=True)
+        events = kill_events(round_kills, "round_order").join(player_conditions, on=["round_order", "steamid"])
+        add_counts(player_stats, events.to_pandas().groupby(["steamid", "condition", "stat"], sort=False).size())
+
+        return partial
+
+    def merge(self, partial):
+        self.player_stats.merge(partial["player_stats"])
+        merge_names(self.names, partial["names"])
+        self.countknife += partial["countknife"]
+
+    def write_output(self):
+        print(f"\n{'='*70}")
+        print("GENERATING OUTPUT CSV")
+        print(f"{'='*70}")
+
+        # ===== Generate output CSV =====
+        # Only include players who participated in at least one round
+        stats = resolve_names(self.player_stats, self.names).frame("Player")
+        stats = stats[stats["overall_rounds"] > 0]
+        columns = {"Player": stats["Player"]}
+        for condition, prefix in [("advantage", "Adv"), ("equal", "Equal"), ("disadvantage", "Disadv"), ("overall", "Overall")]:
+            columns[f"{prefix}_Kills"] = stats[f"{condition}_kills"]
+            columns[f"{prefix}_Deaths"] = stats[f"{condition}_deaths"]
+            columns[f"{prefix}_Rounds"] = stats[f"{condition}_rounds"]
+
+        # Create DataFrame and save
+        df = pd.DataFrame(columns)
+        df = df.sort_values("Overall_Rounds", ascending=False)
+        df.to_csv(self.output_csv, index=False)
+
+        print(f"\nDone! Results saved to {self.output_csv}")
+        print(f"Knife rounds removed: {self.countknife}")
+        print(f"Total players tracked: {len(df)}")
+
+        # ===== Print summary statistics =====
         print("\n" + "="*70)
-        print("TOP 10 PLAYERS BY OVERALL K/D (20+ rounds)")
+        print("SUMMARY STATISTICS")
         print("="*70)
-        
-        top_players = significant_players.copy()
-        top_players["Overall_KD"] = top_players["Overall_Kills"] / top_players["Overall_Deaths"].replace(0, 1)
-        top_players = top_players.nlargest(10, "Overall_KD")
-        
-        for _, row in top_players.iterrows():
-            print(f"{row['Player']:.<25} {row['Overall_KD']:>5.2f} K/D "
-                  f"({row['Overall_Kills']}/{row['Overall_Deaths']} in {row['Overall_Rounds']} rounds)")
\ No newline at end of file
+
+        if not df.empty:
+            total_rounds_all = df["Overall_Rounds"].sum()
+            total_adv_rounds = df["Adv_Rounds"].sum()
+            total_eq_rounds = df["Equal_Rounds"].sum()
+            total_disadv_rounds = df["Disadv_Rounds"].sum()
+
+            print(f"Total player-rounds: {total_rounds_all}")
+            print(f"  Advantage rounds: {total_adv_rounds} ({total_adv_rounds/total_rounds_all*100:.1f}%)")
+            print(f"  Equal rounds: {total_eq_rounds} ({total_eq_rounds/total_rounds_all*100:.1f}%)")
+            print(f"  Disadvantage rounds: {total_disadv_rounds} ({total_disadv_rounds/total_rounds_all*100:.1f}%)")
+
+            # Calculate K/D ratios by condition (for players with significant data)
+            significant_players = df[df["Overall_Rounds"] >= 20].copy()
+
+            if not significant_players.empty:
+                print("\n" + "="*70)
+                print(f"K/D RATIOS (Players with 20+ rounds, n={len(significant_players)})")
+                print("="*70)
+
+                # Calculate K/D ratios
+                for condition, prefix in [("Advantage", "Adv"), ("Equal", "Equal"), ("Disadvantage", "Disadv"), ("Overall", "Overall")]:
+                    kills_col = f"{prefix}_Kills"
+                    deaths_col = f"{prefix}_Deaths"
+                    rounds_col = f"{prefix}_Rounds"
+
+                    # Filter players with at least 5 rounds in this condition (or 20 for overall)
+                    min_rounds = 200 if condition == "Overall" else 50
+                    condition_df = significant_players[significant_players[rounds_col] >= min_rounds].copy()
+
+                    if condition_df.empty:
+                        continue
+
+                    condition_df["KD"] = condition_df[kills_col] / condition_df[deaths_col].replace(0, 1)
+                    avg_kd = condition_df["KD"].mean()
+
+                    print(f"{condition:.<20} Avg K/D: {avg_kd:.3f}")
+
+                print("\n" + "="*70)
+                print("TOP 10 PLAYERS BY OVERALL K/D (20+ rounds)")
+                print("="*70)
+
+                top_players = significant_players.copy()
+                top_players["Overall_KD"] = top_players["Overall_Kills"] / top_players["Overall_Deaths"].replace(0, 1)
+                top_players = top_players.nlargest(10, "Overall_KD")
+
+                for _, row in top_players.iterrows():
+                    print(f"{row['Player']:.<25} {row['Overall_KD']:>5.2f} K/D "
+                          f"({row['Overall_Kills']}/{row['Overall_Deaths']} in {row['Overall_Rounds']} rounds)")
+
+
+if __name__ == "__main__":
+    args = parse_args(demo_root)
+    run_from_args([EconAdvAnalyzer()], args)
@@ -1,9 +1,20 @@
-from awpy import Demo
 from pathlib import Path
+import sys
 import pandas as pd
-import numpy as np
+import polars as pl
 from collections import defaultdict
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.categories import to_pandas
+from common.catalog import event_of
+from common.driver import Analyzer, merge_counts, parse_args, run_from_args
+from common.identity import add_names, merge_names, player_table, with_ids
+from common.knife import drop_knife_round, knife_round
+from common.lazy_engine import most_common, round_window
+from common.pandas_engine import modal_values
+from common.parse_profile import ParseProfile
+from common.round_facts import round_facts
+
 # === Weapon Price Dictionary ===
 weapon_prices = {
     # Pistols
@@ -24,208 +35,250 @@ weapon_prices = {
     "Zeus x27": 200
 }
 
-# === Valid weapons for knife round detection ===
-valid_guns = {
-    "hkp2000", "elite", "glock", "p250", "fiveseven", "tec9", "cz75a", "deagle", "revolver", "usp_silencer",
-    "mac10", "mp9", "mp7", "mp5sd", "ump45", "p90", "bizon",
-    "galilar", "famas", "ak47", "m4a1", "m4a1_silencer", "sg556", "aug",
-    "ssg08", "awp", "g3sg1", "scar20",
-    "nova", "xm1014", "mag7", "sawedoff",
-    "negev", "m249", "taser"
-}
-
-# === Name normalization ===
-alias_map = {
-    "sh1ro": {"SH1R0", "sh1r0"},
-    "910": {"910-", "-910"},
-    "mzinho": {"Mzinho"},
-    "Techno": {"Techno4K"},
-    "Ag1l": {"ag1l", "ag1L"},
-    "dav1deuS": {"dav1deu$", "davideuS"},
-    "device": {"dev1ce"},
-    "electroNic": {"electronic"},
-    "HeavyGod": {"HeavyGoD"},
-    "hfah": {"Hfah"},
-    "huNter-": {"huNter"},
-    "hypex": {"Hypex"},
-    "jcobbb": {"Jcobbb"},
-    "kauez": {"Kauez"},
-    "lux": {"Lux"},
-    "NAF": {"NAF-FLY"},
-    "NertZ": {"nertZ"},
-    "skullz": {"Skullz"},
-    "Snax": {"snax"},
-    "woxic": {"Woxic"},
-}
+# Value of every inventory priced so far, keyed by its items joined with INVENTORY_SEP.
+# The same few inventories repeat over ticks, rounds and demos, so each is priced once.
+INVENTORY_SEP = "\x1f"
+inventory_cache = {}
 
-def norm_name(name: str) -> str:
-    if not isinstance(name, str):
-        return name
-    s = name.strip()
-    for canon, vars_ in alias_map.items():
-        if s == canon or s in vars_:
-            return canon
-    return s
+def inventory_values(inventories: pl.Series) -> pl.Series:
+    """Total weapon_prices value of each inventory (List[String]) as "weapon_value";
+    items without a price count 0 and a null inventory is worth 0
 
-def calc_weapon_value(inv):
-    if isinstance(inv, (list, np.ndarray)):
-        return sum(weapon_prices.get(item, 0) for item in inv)
-    return 0
+    Inventories not in inventory_cache are exploded once and priced against the
+    price dictionary in one replace_strict; every row is then a lookup.
+    """
+    keys = inventories.list.join(INVENTORY_SEP)
+    uniques = keys.drop_nulls().unique().to_list()
+    new = pl.Series("key", [key for key in uniques if key not in inventory_cache], dtype=pl.String)
+    if len(new):
+        priced = (
+            pl.DataFrame({"key": new, "item": new.str.split(INVENTORY_SEP)})
+            .explode("item")
+            .group_by("key")
+            .agg(pl.col("item").replace_strict(weapon_prices, default=0, return_dtype=pl.Int64).sum().alias("value"))
+        )
+        inventory_cache.update(zip(priced["key"], priced["value"]))
+    lookup = {key: inventory_cache[key] for key in uniques}
+    return keys.replace_strict(lookup, default=0, return_dtype=pl.Int64).alias("weapon_value")
 
 # === Configuration ===
 demo_root = Path("/Volumes/TOSHIBA EXT/Demo_2025")  # Root directory containing event folders
 output_csv = "weapon_economy_percentage.csv"
 
-# === Global aggregators ===
-# player -> event -> {total_weapon_value, total_percentage, rounds_played}
-player_event_stats = defaultdict(lambda: defaultdict(lambda: {
-    "total_weapon_value": 0,
-    "total_percentage": 0.0,
-    "rounds_played": 0
-}))
-
-countknife = 0
-
-# === Find all event folders ===
-event_folders = [f for f in demo_root.iterdir() if f.is_dir() and not f.name.startswith(".")]
-print(f"Found {len(event_folders)} event folders under {demo_root}")
-
-for event_folder in sorted(event_folders):
-    event_name = event_folder.name
-    print(f"\n{'='*70}")
-    print(f"Processing Event: {event_name}")
-    print(f"{'='*70}")
-    
-    # Find demo files in this event folder
-    demo_files = [f for f in event_folder.rglob("*.dem") if not f.name.startswith("._")]
-    print(f"Found {len(demo_files)} demos in {event_name}")
-    
-    for demo_path in demo_files:
-        print(f"\nParsing {demo_path.name}")
+# === Aggregators ===
+# steamid -> event -> {total_weapon_value, total_percentage, rounds_played}
+def new_event_stats():
+    return {
+        "total_weapon_value": 0,
+        "total_percentage": 0.0,
+        "rounds_played": 0
+    }
+
+def new_player_events():
+    return defaultdict(new_event_stats)
+
+# === Analyzer ===
+class EconomyPercAnalyzer(Analyzer):
+    name = "economy_perc"
+    version = 2  # aggregates keyed on steamid
+    # Only the first 16 ticks after freeze end of each round are looked at
+    profile = ParseProfile(tables=("rounds", "damages", "ticks"),
+                           player_props=["name", "steamid", "inventory", "side"],
+                           tick_windows=[("freeze_end", 0, 16)])
+
+    def __init__(self, demo_root=demo_root, output_csv=output_csv):
+        self.demo_root = Path(demo_root)
+        self.output_csv = output_csv
+        self.player_event_stats = defaultdict(new_player_events)
+        self.names = {}  # steamid -> names seen
+        self.countknife = 0
+
+    def event_name(self, demo_path):
+        """Event folder (first directory under demo_root) a demo belongs to, or None"""
+        return event_of(self.demo_root, demo_path)
+
+    def process(self, demo_path, demo):
+        partial = {"player_event_stats": defaultdict(new_player_events), "names": {}, "countknife": 0}
+        player_event_stats = partial["player_event_stats"]
+
+        event_name = self.event_name(demo_path)
+        if event_name is None:
+            return partial
+
         try:
-            demo = Demo(str(demo_path), verbose=False)
-            demo.parse(player_props=["name", "inventory", "side"])
-            
-            rounds_df = demo.rounds.to_pandas()
-            ticks_df = demo.ticks.to_pandas()
-            damages_df = demo.damages.to_pandas()
+            rounds = round_facts(demo)
+            ticks = demo.ticks.lazy() if demo.fits("ticks") else demo.scan("ticks")
+            knife = knife_round(demo)
         except Exception as e:
             print(f"[warn] failed on {demo_path.name}: {e}")
-            continue
+            return partial
 
-        if rounds_df is None or rounds_df.empty:
+        if rounds is None or rounds.is_empty():
             print(f"[warn] {demo_path.name} has empty rounds data")
-            continue
+            return partial
 
         # === Remove knife/warmup round ===
-        if not rounds_df.empty and damages_df is not None and not damages_df.empty:
-            first_round = int(rounds_df["round_num"].min())
-            first_round_damages = damages_df[damages_df["round_num"] == first_round]
-            
-            if not first_round_damages.empty and "weapon" in first_round_damages.columns:
-                used_weapons = set(first_round_damages["weapon"].dropna().astype(str).str.lower().unique())
-                
-                if used_weapons.isdisjoint(valid_guns):
-                    print(f"[INFO] Removing knife round {first_round} from {demo_path.name}")
-                    countknife += 1
-                    rounds_df = rounds_df[rounds_df["round_num"] != first_round]
-                    if ticks_df is not None and not ticks_df.empty:
-                        ticks_df = ticks_df[ticks_df["round_num"] != first_round]
-
-        # === Process each round ===
-        for _, rnd in rounds_df.iterrows():
-            round_num = rnd["round_num"]
-            freeze_end = rnd["freeze_end"]
-            
-            if pd.isna(round_num) or pd.isna(freeze_end):
-                continue
-            
-            round_num = int(round_num)
-            freeze_end = int(freeze_end)
-            
-            # Get ticks from freeze_end to freeze_end + 16
-            tick_slice = ticks_df[
-                (ticks_df["tick"] >= freeze_end) & 
-                (ticks_df["tick"] <= freeze_end + 16) &
-                (ticks_df["round_num"] == round_num)
-            ].dropna(subset=["name", "inventory", "side"])
-            
-            if tick_slice.empty:
-                continue
-            
-            # Calculate weapon value for each tick
-            tick_slice = tick_slice.copy()
-            tick_slice["weapon_value"] = tick_slice["inventory"].apply(calc_weapon_value)
-            
-            # Get most common weapon value for each player
-            grouped = tick_slice.groupby(["name", "side"])["weapon_value"].agg(
-                lambda x: x.value_counts().idxmax() if not x.empty else 0
-            ).reset_index()
-            
-            # Normalize names
-            grouped["name"] = grouped["name"].apply(norm_name)
-            
-            # Calculate team totals for each side
-            team_totals = grouped.groupby("side")["weapon_value"].sum().to_dict()
-            
-            # Calculate percentage for each player
-            for _, row in grouped.iterrows():
-                player = row["name"]
-                side = row["side"]
-                weapon_value = row["weapon_value"]
-                
-                team_total = team_totals.get(side, 0)
-                percentage = (weapon_value / team_total * 100) if team_total > 0 else 0
-                
-                # Update player stats for this event
-                player_event_stats[player][event_name]["total_weapon_value"] += weapon_value
-                player_event_stats[player][event_name]["total_percentage"] += percentage
-                player_event_stats[player][event_name]["rounds_played"] += 1
-
-print(f"\n{'='*70}")
-print("GENERATING OUTPUT CSV")
-print(f"{'='*70}")
-
-# === Generate output CSV ===
-results = []
-
-for player, events in player_event_stats.items():
-    # Add per-event stats
-    for event_name, stats in events.items():
-        rounds_played = stats["rounds_played"]
-        avg_weapon_value = stats["total_weapon_value"] / rounds_played if rounds_played > 0 else 0
-        avg_percentage = stats["total_percentage"] / rounds_played if rounds_played > 0 else 0
-        
-        results.append({
-            "Player": player,
-            "Event": event_name,
-            "RoundsPlayed": rounds_played,
-            "AvgWeaponValue": round(avg_weapon_value, 2),
-            "AvgPercentageOfTeam": round(avg_percentage, 2)
-        })
-    
-    # Add overall stats
-    total_rounds = sum(stats["rounds_played"] for stats in events.values())
-    total_weapon_value = sum(stats["total_weapon_value"] for stats in events.values())
-    total_percentage = sum(stats["total_percentage"] for stats in events.values())
-    
-    overall_avg_weapon_value = total_weapon_value / total_rounds if total_rounds > 0 else 0
-    overall_avg_percentage = total_percentage / total_rounds if total_rounds > 0 else 0
-    
-    results.append({
-        "Player": player,
-        "Event": "overall",
-        "RoundsPlayed": total_rounds,
-        "AvgWeaponValue": round(overall_avg_weapon_value, 2),
-        "AvgPercentageOfTeam": round(overall_avg_percentage, 2)
-    })
-
-# Create DataFrame and save
-df = pd.DataFrame(results)
-df = df.sort_values(["Player", "Event"])
-df.to_csv(output_csv, index=False)
-
-print(f"\nDone! Results saved to {output_csv}")
-print(f"Knife rounds removed: {countknife}")
-print(f"Total players tracked: {len(player_event_stats)}")
-print(f"Total rows in CSV: {len(df)}")
\ No newline at end of file
+        if knife["is_knife"]:
+            print(f"[INFO] Removing knife round {knife['first_round']} from {demo_path.name}")
+            partial["countknife"] += 1
+            rounds = drop_knife_round(rounds, knife)
+
+        # === Ticks freeze_end .. freeze_end + 16 of every round, valued in bulk ===
+        tick_slice = (
+            with_ids(round_window(ticks.select("round_num", "tick", "steamid", "name", "side", "inventory"),
+                                  rounds.lazy(), 0, 16), ["steamid"])
+            .drop_nulls(["name", "inventory", "side"])
+            .select("round_order", "steamid", "name", "side", "inventory")
+            .collect(engine=demo.collect_engine())
+        )
+        if tick_slice.is_empty():
+            return partial
+        tick_slice = to_pandas(tick_slice.with_columns(inventory_values(tick_slice["inventory"])).drop("inventory"))
+        add_names(partial["names"], tick_slice[["steamid", "name"]].drop_duplicates().itertuples(index=False))
+
+        # === Most common weapon value per (round, player) and its share of the team total ===
+        # Rows in round, then steamid/side order
+        grouped = modal_values(tick_slice, ["round_order", "steamid", "side"], "weapon_value")
+        team_total = grouped.groupby(["round_order", "side"])["weapon_value"].transform("sum")
+        grouped["percentage"] = (grouped["weapon_value"] / team_total * 100).where(team_total > 0, 0)
+
+        # === Per-player totals for the demo ===
+        totals = grouped.groupby("steamid", sort=False).agg(
+            total_weapon_value=("weapon_value", "sum"),
+            total_percentage=("percentage", "sum"),
+            rounds_played=("weapon_value", "size"),
+        )
+        for player, row in totals.iterrows():
+            stats = player_event_stats[player][event_name]
+            stats["total_weapon_value"] += int(row["total_weapon_value"])
+            stats["total_percentage"] += float(row["total_percentage"])
+            stats["rounds_played"] += int(row["rounds_played"])
+
+        return partial
+
+    def process_lazy(self, demo_path, demo):
+        """process() on polars LazyFrames: one query plan per demo, same partial"""
+        partial = {"player_event_stats": defaultdict(new_player_events), "names": {}, "countknife": 0}
+        player_event_stats = partial["player_event_stats"]
+
+        event_name = self.event_name(demo_path)
+        if event_name is None:
+            return partial
+
+        try:
+            rounds = round_facts(demo).lazy()
+            ticks = demo.scan("ticks")
+            knife = knife_round(demo)
+        except Exception as e:
+            print(f"[warn] failed on {demo_path.name}: {e}")
+            return partial
+
+        if knife["first_round"] is None:
+            print(f"[warn] {demo_path.name} has empty rounds data")
+            return partial
+
+        # === Remove knife/warmup round ===
+        rounds = drop_knife_round(rounds, knife)
+
+        # === Most common inventory value per player, freeze_end .. freeze_end + 16 ===
+        tick_slice = (
+            with_ids(round_window(ticks, rounds, 0, 16), ["steamid"])
+            .drop_nulls(["name", "inventory", "side"])
+            .with_columns(pl.col("inventory").map_batches(inventory_values, return_dtype=pl.Int64).alias("weapon_value"))
+        )
+        names = tick_slice.select("steamid", "name").unique(maintain_order=True)
+        grouped = most_common(tick_slice, ["round_order", "steamid", "side"], "weapon_value")
+
+        # === Share of the team total per (round, player), then per-player totals for the demo ===
+        team_totals = grouped.group_by("round_order", "side").agg(pl.col("weapon_value").sum().alias("team_total"))
+        team_total = pl.col("team_total")
+        totals = (
+            grouped.join(team_totals, on=["round_order", "side"], maintain_order="left")
+            .with_columns(pl.when(team_total > 0).then(pl.col("weapon_value") / team_total * 100)
+                          .otherwise(0.0).alias("percentage"))
+            .group_by("steamid", maintain_order=True)
+            .agg(
+                pl.col("weapon_value").sum().alias("total_weapon_value"),
+                pl.col("percentage").sum().alias("total_percentage"),
+                pl.len().alias("rounds_played"),
+            )
+        )
+
+        names, totals = pl.collect_all([names, totals], engine=demo.collect_engine())
+        add_names(partial["names"], names.iter_rows())
+        if knife["is_knife"]:
+            print(f"[INFO] Removing knife round {knife['first_round']} from {demo_path.name}")
+            partial["countknife"] += 1
+
+        for player, total_weapon_value, total_percentage, rounds_played in totals.iter_rows():
+            stats = player_event_stats[player][event_name]
+            stats["total_weapon_value"] += total_weapon_value
+            stats["total_percentage"] += total_percentage
+            stats["rounds_played"] += rounds_played
+
+        return partial
+
+    def merge(self, partial):
+        merge_counts(self.player_event_stats, partial["player_event_stats"])
+        merge_names(self.names, partial["names"])
+        self.countknife += partial["countknife"]
+
+    def write_output(self):
+        print(f"\n{'='*70}")
+        print("GENERATING OUTPUT CSV")
+        print(f"{'='*70}")
+
+        # === Generate output CSV ===
+        # steamids sharing a canonical name are added up
+        players = player_table(self.names)
+        player_event_stats = defaultdict(new_player_events)
+        for steamid, events in self.player_event_stats.items():
+            merge_counts(player_event_stats[players.name(steamid)], events)
+
+        results = []
+
+        for player, events in player_event_stats.items():
+            # Add per-event stats
+            for event_name, stats in events.items():
+                rounds_played = stats["rounds_played"]
+                avg_weapon_value = stats["total_weapon_value"] / rounds_played if rounds_played > 0 else 0
+                avg_percentage = stats["total_percentage"] / rounds_played if rounds_played > 0 else 0
+
+                results.append({
+                    "Player": player,
+                    "Event": event_name,
+                    "RoundsPlayed": rounds_played,
+                    "AvgWeaponValue": round(avg_weapon_value, 2),
+                    "AvgPercentageOfTeam": round(avg_percentage, 2)
+                })
+
+            # Add overall stats
+            total_rounds = sum(stats["rounds_played"] for stats in events.values())
+            total_weapon_value = sum(stats["total_weapon_value"] for stats in events.values())
+            total_percentage = sum(stats["total_percentage"] for stats in events.values())
+
+            overall_avg_weapon_value = total_weapon_value / total_rounds if total_rounds > 0 else 0
+            overall_avg_percentage = total_percentage / total_rounds if total_rounds > 0 else 0
+
+            results.append({
+                "Player": player,
+                "Event": "overall",
+                "RoundsPlayed": total_rounds,
+                "AvgWeaponValue": round(overall_avg_weapon_value, 2),
+                "AvgPercentageOfTeam": round(overall_avg_percentage, 2)
+            })
+
+        # Create DataFrame and save
+        df = pd.DataFrame(results)
+        df = df.sort_values(["Player", "Event"])
+        df.to_csv(self.output_csv, index=False)
+
+        print(f"\nDone! Results saved to {self.output_csv}")
+        print(f"Knife rounds removed: {self.countknife}")
+        print(f"Total players tracked: {len(player_event_stats)}")
+        print(f"Total rows in CSV: {len(df)}")
+
+
+if __name__ == "__main__":
+    args = parse_args(demo_root)
+    run_from_args([EconomyPercAnalyzer(demo_root=args.demo_root)], args)
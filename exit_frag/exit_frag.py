@@ -1,329 +1,311 @@
-from awpy import Demo
 from pathlib import Path
+import sys
 import pandas as pd
-import numpy as np
-from collections import defaultdict
+import polars as pl
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.accumulator import Accumulator
+from common.demo_header import read_tickrate
+from common.driver import Analyzer, parse_args, run_from_args
+from common.identity import add_names, merge_names, resolve_names, with_ids
+from common.knife import drop_knife_round, knife_round
+from common.lazy_engine import round_participants
+from common.parse_profile import ParseProfile
+from common.round_facts import played_rounds
 
 # ===== Configuration =====
 demo_root = Path("/Volumes/TOSHIBA EXT/Demo_2025/BLAST_Rivals_2025_Season_2")  # Change to your root directory
 output_csv = "exit_frag_analysis_rival2.csv"
 DEFAULT_TICKRATE = 64
-
-# ===== Valid weapons for knife round detection =====
-valid_guns = {
-    "hkp2000", "elite", "glock", "p250", "fiveseven", "tec9", "cz75a", "deagle", "revolver", "usp_silencer", "usp_silencer_off",
-    "mac10", "mp9", "mp7", "mp5sd", "ump45", "p90", "bizon",
-    "galilar", "famas", "ak47", "m4a1", "m4a1_silencer", "sg556", "aug",
-    "ssg08", "awp", "g3sg1", "scar20",
-    "nova", "xm1014", "mag7", "sawedoff",
-    "negev", "m249", "taser"
-}
-
-# ===== Name normalization =====
-alias_map = {
-    "sh1ro": {"SH1R0", "sh1r0"},
-    "910": {"910-", "-910"},
-    "mzinho": {"Mzinho"},
-    "Techno": {"Techno4K"},
-    "Ag1l": {"ag1l", "ag1L"},
-    "dav1deuS": {"dav1deu$", "davideuS"},
-    "device": {"dev1ce"},
-    "electroNic": {"electronic"},
-    "HeavyGod": {"HeavyGoD"},
-    "hfah": {"Hfah"},
-    "huNter-": {"huNter"},
-    "hypex": {"Hypex"},
-    "jcobbb": {"Jcobbb"},
-    "kauez": {"Kauez"},
-    "lux": {"Lux"},
-    "NAF": {"NAF-FLY"},
-    "NertZ": {"nertZ"},
-    "skullz": {"Skullz"},
-    "Snax": {"snax"},
-    "woxic": {"Woxic"},
-}
-
-def norm_name(name: str) -> str:
-    if not isinstance(name, str):
-        return name
-    s = name.strip()
-    for canon, vars_ in alias_map.items():
-        if s == canon or s in vars_:
-            return canon
-    return s
+EXIT_WINDOW_SECONDS = 5  # kills this close to the round-deciding event are exit frags
 
 def get_tickrate_from_header(demo, default=64):
-    """Extract tickrate from demo header"""
-    try:
-        hd = demo.header.to_pandas() if hasattr(demo.header, "to_pandas") else pd.DataFrame()
-        if not hd.empty:
-            for col in ["tick_rate", "tickrate", "tickRate"]:
-                if col in hd.columns and pd.notna(hd.loc[0, col]):
-                    return int(hd.loc[0, col])
-    except Exception as e:
-        print(f"[warn] tickrate read failed: {e}")
-    return default
-
-# ===== Find demo files =====
-demo_files = [f for f in sorted(demo_root.rglob("*.dem")) if not f.name.startswith("._")]
-print(f"Found {len(demo_files)} demos under {demo_root}")
-
-# ===== Global aggregators =====
-# player -> {"total_kills": int, "exit_frags": int, "meaningful_kills": int, "rounds_participated": int}
-player_stats = defaultdict(lambda: {
-    "total_kills": 0,
-    "exit_frags": 0,
-    "meaningful_kills": 0,
-    "rounds_participated": 0  # Count rounds where player appeared
-})
-countknife = 0
-
-for demo_path in demo_files:
-    print(f"Parsing {demo_path.name}")
-    try:
-        demo = Demo(str(demo_path), verbose=False)
-        demo.parse(player_props=["name"])
-        
-        rounds_df = demo.rounds.to_pandas()
-        kills_df = demo.kills.to_pandas()
-        bombs_df = demo.bomb.to_pandas()
-        damages_df = demo.damages.to_pandas()
-        ticks_df = demo.ticks.to_pandas()
-    except Exception as e:
-        print(f"[warn] failed on {demo_path.name}: {e}")
-        continue
-
-    if rounds_df is None or rounds_df.empty:
-        print(f"[warn] {demo_path.name} has empty rounds data")
-        continue
-
-    # Get tickrate
-    tickrate = get_tickrate_from_header(demo, DEFAULT_TICKRATE)
-
-    # ===== Remove knife/warmup round =====
-    if not rounds_df.empty and damages_df is not None and not damages_df.empty:
-        first_round = int(rounds_df["round_num"].min())
-        first_round_damages = damages_df[damages_df["round_num"] == first_round]
-        
-        if not first_round_damages.empty and "weapon" in first_round_damages.columns:
-            used_weapons = set(first_round_damages["weapon"].dropna().astype(str).str.lower().unique())
-            
-            if used_weapons.isdisjoint(valid_guns):
-                print(f"[INFO] Removing knife round {first_round} from {demo_path.name}, weapons={used_weapons}")
-                countknife += 1
-                rounds_df = rounds_df[rounds_df["round_num"] != first_round]
-                if kills_df is not None and not kills_df.empty:
-                    kills_df = kills_df[kills_df["round_num"] != first_round]
-                if bombs_df is not None and not bombs_df.empty:
-                    bombs_df = bombs_df[bombs_df["round_num"] != first_round]
-                if ticks_df is not None and not ticks_df.empty:
-                    ticks_df = ticks_df[ticks_df["round_num"] != first_round]
-
-    # ===== Track all players in all rounds from ticks =====
-    # Loop through each round and find which players appeared
-    if ticks_df is not None and not ticks_df.empty and "name" in ticks_df.columns and "round_num" in ticks_df.columns:
-        ticks_df_clean = ticks_df.dropna(subset=["name", "round_num"]).copy()
-        ticks_df_clean["name"] = ticks_df_clean["name"].apply(lambda x: norm_name(str(x)))
-        
-        # For each round, find unique players
-        for round_num in rounds_df["round_num"].unique():
-            round_ticks = ticks_df_clean[ticks_df_clean["round_num"] == round_num]
-            if not round_ticks.empty:
-                # Get unique players in this round
-                players_in_round = round_ticks["name"].unique()
-                for player in players_in_round:
-                    player_stats[player]["rounds_participated"] += 1
-
-    # Check for required columns
-    required_round_cols = ["round_num", "winner", "reason", "end"]
-    
-    missing_round = [c for c in required_round_cols if c not in rounds_df.columns]
-    
-    if missing_round:
-        print(f"[warn] {demo_path.name} rounds missing columns: {missing_round}")
-        continue
-    
-    # Process kills if available
-    if kills_df is None or kills_df.empty:
-        print(f"[info] {demo_path.name} has no kills data, only tracking round participation")
-        continue
-    
-    required_kill_cols = ["attacker_name", "attacker_side", "tick", "round_num"]
-    missing_kill = [c for c in required_kill_cols if c not in kills_df.columns]
-    
-    if missing_kill:
-        print(f"[warn] {demo_path.name} kills missing columns: {missing_kill}")
-        continue
-
-    # ===== Build bomb event lookup: round_num -> {defuse_tick, detonate_tick} =====
-    bomb_events = {}
-    if bombs_df is not None and not bombs_df.empty and "event" in bombs_df.columns:
-        for _, bomb_row in bombs_df.iterrows():
-            rnd = bomb_row.get("round_num")
-            event = str(bomb_row.get("event", "")).lower()
-            tick = bomb_row.get("tick")
-            
-            if pd.isna(rnd) or pd.isna(tick):
-                continue
-            
-            rnd = int(rnd)
-            tick = int(tick)
-            
-            if rnd not in bomb_events:
-                bomb_events[rnd] = {"defuse_tick": None, "detonate_tick": None}
-            
-            if event == "defuse":
-                bomb_events[rnd]["defuse_tick"] = tick
-            elif event == "detonate":
-                bomb_events[rnd]["detonate_tick"] = tick
-
-    # ===== Process each round =====
-    for _, round_row in rounds_df.iterrows():
-        round_num = round_row["round_num"]
-        winner = str(round_row["winner"]).lower()
-        reason = str(round_row["reason"]).lower()
-        end_tick = round_row["end"]
-        official_end_tick = round_row.get("official_end", end_tick)
-        
-        if pd.isna(round_num) or pd.isna(winner) or pd.isna(end_tick):
-            continue
-        
-        round_num = int(round_num)
-        end_tick = int(end_tick)
-        if pd.notna(official_end_tick):
-            official_end_tick = int(official_end_tick)
+    """Extract tickrate from demo header, else from the demo's file info (header-only read)"""
+    header = demo.header if isinstance(demo.header, dict) else {}
+    for col in ["tick_rate", "tickrate", "tickRate"]:
+        if header.get(col):
+            return int(header[col])
+    tickrate = read_tickrate(demo.path)
+    return tickrate if tickrate else default
+
+def exit_frag_mask(kills, window_ticks):
+    """Exit frag = kill in the last window_ticks before the round-deciding event, by the losing side.
+
+    CT: T won by the bomb exploding (detonate tick, else round end).
+    T: CT won by a defuse (defuse tick), or by time running out (before official end).
+    No exit frags in rounds won by eliminating the other side.
+    """
+    side, reason, winner, tick = kills["attacker_side"], kills["reason"], kills["winner"], kills["tick"]
+    ct_exploded = ((side == "ct") & (reason == "bomb_exploded") & (winner == "t")
+                   & (tick > kills["detonate_tick"].fillna(kills["end"]) - window_ticks))
+    t_defused = ((side == "t") & (reason == "bomb_defused") & (winner == "ct")
+                 & (tick > kills["defuse_tick"] - window_ticks))
+    t_time_ran_out = ((side == "t") & (reason == "time_ran_out") & (winner == "ct")
+                      & (tick > kills["end"] - window_ticks) & (tick <= kills["official_end"]))
+    return ct_exploded | t_defused | t_time_ran_out
+
+# ===== Aggregators =====
+# steamid x metric counts
+METRICS = ["total_kills", "exit_frags", "meaningful_kills", "rounds_participated"]
+
+def new_player_stats():
+    return Accumulator(METRICS)
+
+# ===== Analyzer =====
+class ExitFragAnalyzer(Analyzer):
+    name = "exit_frag"
+    version = 3  # aggregates in an Accumulator keyed on steamid
+    profile = ParseProfile(tables=("rounds", "kills", "damages", "ticks", "bomb"), player_props=["name", "steamid"])
+
+    def __init__(self, output_csv=output_csv):
+        self.output_csv = output_csv
+        self.player_stats = new_player_stats()
+        self.names = {}  # steamid -> names seen
+        self.countknife = 0
+
+    def process(self, demo_path, demo):
+        partial = {"player_stats": new_player_stats(), "names": {}, "countknife": 0}
+        player_stats = partial["player_stats"]
+
+        try:
+            rounds_df = demo.rounds.to_pandas()
+            kills = demo.kills
+            kills_df = with_ids(kills, ["attacker_steamid"] if "attacker_steamid" in kills.columns else []).to_pandas()
+            facts = played_rounds(demo)
+            knife = knife_round(demo)
+            tick_columns = demo.scan("ticks").collect_schema().names()
+        except Exception as e:
+            print(f"[warn] failed on {demo_path.name}: {e}")
+            return partial
+
+        if rounds_df is None or rounds_df.empty:
+            print(f"[warn] {demo_path.name} has empty rounds data")
+            return partial
+
+        # Get tickrate
+        tickrate = get_tickrate_from_header(demo, DEFAULT_TICKRATE)
+
+        # ===== Remove knife/warmup round =====
+        if knife["is_knife"]:
+            print(f"[INFO] Removing knife round {knife['first_round']} from {demo_path.name}, weapons={set(knife['weapons'])}")
+            partial["countknife"] += 1
+            rounds_df = drop_knife_round(rounds_df, knife)
+            kills_df = drop_knife_round(kills_df, knife)
+
+        # ===== Track all players in all rounds from ticks =====
+        # Loop through each round and find which players appeared
+        # Ticks are read one round at a time (see common.driver.iter_demos)
+        if {"name", "steamid", "round_num"} <= set(tick_columns):
+            # For each round, find unique players
+            for round_num, round_ticks in demo.round_chunks("ticks", rounds_df["round_num"].dropna().unique(),
+                                                            columns=["round_num", "steamid", "name"]):
+                round_ticks = with_ids(round_ticks, ["steamid"]).to_pandas().dropna(subset=["name"])
+                if not round_ticks.empty:
+                    # Get unique players in this round
+                    add_names(partial["names"], round_ticks[["steamid", "name"]].drop_duplicates().itertuples(index=False))
+                    player_stats.add(round_ticks["steamid"].unique(), "rounds_participated")
+
+        # Check for required columns
+        required_round_cols = ["round_num", "winner", "reason", "end"]
+
+        missing_round = [c for c in required_round_cols if c not in rounds_df.columns]
+
+        if missing_round:
+            print(f"[warn] {demo_path.name} rounds missing columns: {missing_round}")
+            return partial
+
+        # Process kills if available
+        if kills_df is None or kills_df.empty:
+            print(f"[info] {demo_path.name} has no kills data, only tracking round participation")
+            return partial
+
+        required_kill_cols = ["attacker_steamid", "attacker_name", "attacker_side", "tick", "round_num"]
+        missing_kill = [c for c in required_kill_cols if c not in kills_df.columns]
+
+        if missing_kill:
+            print(f"[warn] {demo_path.name} kills missing columns: {missing_kill}")
+            return partial
+
+        # ===== Per-round facts: outcome, end ticks and last defuse / detonate tick =====
+        facts = facts.filter(pl.col("end").is_not_null()).select(
+            "round_num", "winner", "reason", "end", "official_end", "defuse_tick", "detonate_tick"
+        ).to_pandas()
+
+        # ===== Classify every kill of the demo at once =====
+        kills = kills_df.dropna(subset=["attacker_name", "attacker_side", "round_num"])
+        kills = kills.assign(round_num=kills["round_num"].astype("int64"),
+                             attacker_side=kills["attacker_side"].astype(str).str.lower())
+        kills = kills[kills["attacker_side"].isin(["t", "ct"])]
+        # Kills in rounds order, then table order, like a loop over rounds
+        kills = facts.merge(kills[["round_num", "tick", "attacker_steamid", "attacker_name", "attacker_side"]],
+                            on="round_num")
+        if kills.empty:
+            return partial
+        kills["is_exit_frag"] = exit_frag_mask(kills, EXIT_WINDOW_SECONDS * tickrate)
+
+        add_names(partial["names"], kills[["attacker_steamid", "attacker_name"]].drop_duplicates().itertuples(index=False))
+        counts = kills.groupby("attacker_steamid", sort=False)["is_exit_frag"].agg(["size", "sum"])
+        player_stats.add(counts.index, "total_kills", counts=counts["size"])
+        player_stats.add(counts.index, "exit_frags", counts=counts["sum"])
+        player_stats.add(counts.index, "meaningful_kills", counts=counts["size"] - counts["sum"])
+
+        return partial
+
+    def process_lazy(self, demo_path, demo):
+        """process() on polars LazyFrames: one query plan per demo, same partial"""
+        partial = {"player_stats": new_player_stats(), "names": {}, "countknife": 0}
+        player_stats = partial["player_stats"]
+
+        try:
+            rounds = demo.scan("rounds")
+            kills = demo.scan("kills")
+            facts = played_rounds(demo).lazy()
+            knife = knife_round(demo)
+            ticks = demo.scan("ticks")
+        except Exception as e:
+            print(f"[warn] failed on {demo_path.name}: {e}")
+            return partial
+
+        tickrate = get_tickrate_from_header(demo, DEFAULT_TICKRATE)
+        window_ticks = EXIT_WINDOW_SECONDS * tickrate
+
+        # ===== Remove knife/warmup round =====
+        rounds = drop_knife_round(rounds, knife)
+
+        # ===== Players in each round, from ticks =====
+        participants = round_participants(ticks, rounds)
+
+        # Check for required columns
+        round_cols = rounds.collect_schema().names()
+        kill_cols = kills.collect_schema().names()
+        missing_round = [c for c in ["round_num", "winner", "reason", "end"] if c not in round_cols]
+        missing_kill = [c for c in ["attacker_steamid", "attacker_name", "attacker_side", "tick", "round_num"]
+                        if c not in kill_cols]
+
+        # ===== Classify kills =====
+        round_kills = pl.LazyFrame(schema={"attacker_steamid": pl.Int64, "attacker_name": pl.String,
+                                           "is_exit_frag": pl.Boolean})
+        if not missing_round and not missing_kill:
+            # Per-round facts: outcome, end ticks and last defuse / detonate tick
+            round_facts = facts.with_row_index("round_order").filter(pl.col("end").is_not_null())
+            side = pl.col("attacker_side")
+            tick = pl.col("tick")
+            ct_exit = (
+                (side == "ct") & (pl.col("reason") == "bomb_exploded") & (pl.col("winner") == "t")
+                & (tick > pl.coalesce("detonate_tick", "end") - window_ticks)
+            )
+            t_defused_exit = (
+                (side == "t") & (pl.col("reason") == "bomb_defused") & (pl.col("winner") == "ct")
+                & (tick > pl.col("defuse_tick") - window_ticks)
+            )
+            t_time_exit = (
+                (side == "t") & (pl.col("reason") == "time_ran_out") & (pl.col("winner") == "ct")
+                & (tick > pl.col("end") - window_ticks) & (tick <= pl.col("official_end"))
+            )
+            round_kills = (
+                with_ids(kills.select("round_num", "tick", "attacker_steamid", "attacker_name", "attacker_side"),
+                         ["attacker_steamid"])
+                .drop_nulls(["attacker_name", "attacker_side"])
+                .with_row_index("_row")
+                .with_columns(side.cast(pl.String).str.to_lowercase())
+                .join(round_facts, on="round_num")
+                .filter(side.is_in(["t", "ct"]))
+                .sort("round_order", "_row")
+                .select("attacker_steamid", "attacker_name",
+                        (ct_exit | t_defused_exit | t_time_exit).fill_null(False).alias("is_exit_frag"))
+            )
+
+        participants, n_kills, round_kills = pl.collect_all(
+            [participants, kills.select(pl.len()), round_kills], engine=demo.collect_engine()
+        )
+        if knife["is_knife"]:
+            print(f"[INFO] Removing knife round {knife['first_round']} from {demo_path.name}, weapons={set(knife['weapons'])}")
+            partial["countknife"] += 1
+
+        add_names(partial["names"], participants.select("steamid", "name").iter_rows())
+        player_stats.add(participants["steamid"].to_numpy(), "rounds_participated")
+
+        if missing_round:
+            print(f"[warn] {demo_path.name} rounds missing columns: {missing_round}")
+            return partial
+        if n_kills.item() == 0:
+            print(f"[info] {demo_path.name} has no kills data, only tracking round participation")
+            return partial
+        if missing_kill:
+            print(f"[warn] {demo_path.name} kills missing columns: {missing_kill}")
+            return partial
+
+        add_names(partial["names"], round_kills.select("attacker_steamid", "attacker_name").iter_rows())
+        counts = round_kills.group_by("attacker_steamid", maintain_order=True).agg(
+            pl.len().alias("size"), pl.col("is_exit_frag").sum().alias("sum")
+        )
+        attackers = counts["attacker_steamid"].to_numpy()
+        player_stats.add(attackers, "total_kills", counts=counts["size"].to_numpy())
+        player_stats.add(attackers, "exit_frags", counts=counts["sum"].to_numpy())
+        player_stats.add(attackers, "meaningful_kills", counts=(counts["size"] - counts["sum"]).to_numpy())
+
+        return partial
+
+    def merge(self, partial):
+        self.player_stats.merge(partial["player_stats"])
+        merge_names(self.names, partial["names"])
+        self.countknife += partial["countknife"]
+
+    def write_output(self):
+        # ===== Generate output =====
+        # Only include players who got at least 1 kill
+        stats = resolve_names(self.player_stats, self.names).frame("Player")
+        stats = stats[stats["total_kills"] > 0]
+        df = pd.DataFrame({
+            "Player": stats["Player"],
+            "TotalRounds": stats["rounds_participated"],
+            "TotalKills": stats["total_kills"],
+            "MeaningfulKills": stats["meaningful_kills"],
+            "ExitFrags": stats["exit_frags"],
+            "MeaningfulRate_%": (stats["meaningful_kills"] / stats["total_kills"] * 100).round(4),
+            "ExitFragRate_%": (stats["exit_frags"] / stats["total_kills"] * 100).round(4),
+        })
+
+        if not df.empty:
+            # Sort by exit frag rate (descending) to highlight the "merchants"
+            df = df.sort_values("ExitFragRate_%", ascending=False)
+            df.to_csv(self.output_csv, index=False)
+            print(f"\nDone! Results saved to {self.output_csv}")
+            print(f"knife rounds removed: {self.countknife}")
+
+            # Print summary statistics
+            print("\n" + "="*70)
+            print("TOP 10 EXIT FRAG MERCHANTS:")
+            print("="*70)
+            top_exit = df.nlargest(10, "ExitFragRate_%")
+            for idx, row in top_exit.iterrows():
+                print(f"{row['Player']:.<25} {row['ExitFragRate_%']:>6.2f}% exit frags "
+                      f"({row['ExitFrags']}/{row['TotalKills']} kills, {row['TotalRounds']} rounds)")
+
+            print("\n" + "="*70)
+            print("TOP 10 MOST IMPACTFUL PLAYERS:")
+            print("="*70)
+            top_meaningful = df.nlargest(10, "MeaningfulRate_%")
+            for idx, row in top_meaningful.iterrows():
+                print(f"{row['Player']:.<25} {row['MeaningfulRate_%']:>6.2f}% meaningful "
+                      f"({row['MeaningfulKills']}/{row['TotalKills']} kills, {row['TotalRounds']} rounds)")
+
+            print("\n" + "="*70)
+            print("OVERALL STATISTICS:")
+            print("="*70)
+            total_all_kills = df["TotalKills"].sum()
+            total_exit = df["ExitFrags"].sum()
+            total_meaningful = df["MeaningfulKills"].sum()
+            avg_exit_rate = (total_exit / total_all_kills) * 100 if total_all_kills > 0 else 0
+
+            print(f"Total kills analyzed: {total_all_kills}")
+            print(f"Total exit frags: {total_exit} ({avg_exit_rate:.2f}%)")
+            print(f"Total meaningful kills: {total_meaningful} ({100-avg_exit_rate:.2f}%)")
+            print(f"Players analyzed: {len(df)}")
         else:
-            official_end_tick = end_tick
-        
-        # Get all kills in this round
-        round_kills = kills_df[kills_df["round_num"] == round_num].copy()
-        
-        if round_kills.empty:
-            continue
-        
-        # Clean and normalize data
-        round_kills = round_kills.dropna(subset=["attacker_name", "attacker_side"])
-        round_kills["attacker_name"] = round_kills["attacker_name"].apply(lambda x: norm_name(str(x)))
-        round_kills["attacker_side"] = round_kills["attacker_side"].apply(lambda x: str(x).lower())
-        
-        # Get bomb events for this round
-        defuse_tick = None
-        detonate_tick = None
-        if round_num in bomb_events:
-            defuse_tick = bomb_events[round_num]["defuse_tick"]
-            detonate_tick = bomb_events[round_num]["detonate_tick"]
-        
-        # Calculate 5-second window in ticks
-        five_seconds_ticks = 5 * tickrate
-        
-        # Process each kill
-        for _, kill_row in round_kills.iterrows():
-            attacker = kill_row["attacker_name"]
-            attacker_side = kill_row["attacker_side"]
-            kill_tick = int(kill_row["tick"])
-            
-            if attacker_side not in ["t", "ct"]:
-                continue
-            
-            # Determine if this is an exit frag
-            # Exit frag = kill in the last 5 seconds before round-deciding event for losing team
-            is_exit_frag = False
-            
-            # CT exit frags: CT lost by bomb exploding
-            if attacker_side == "ct" and reason == "bomb_exploded" and winner == "t":
-                # Use detonate tick if available, otherwise fallback to end_tick
-                event_tick = detonate_tick if detonate_tick is not None else end_tick
-                # Kill is exit frag if within 5 seconds before detonation
-                if kill_tick > event_tick - five_seconds_ticks:
-                    is_exit_frag = True
-            
-            # T exit frags: T lost by bomb defused
-            elif attacker_side == "t" and reason == "bomb_defused" and winner == "ct":
-                if defuse_tick is not None:
-                    # Kill is exit frag if within 5 seconds before defuse
-                    if kill_tick > defuse_tick - five_seconds_ticks:
-                        is_exit_frag = True
-            
-            # T exit frags: T lost by time running out
-            elif attacker_side == "t" and reason == "time_ran_out" and winner == "ct":
-                # Kill is exit frag if within 5 seconds before time ran out
-                if kill_tick > end_tick - five_seconds_ticks and kill_tick <= official_end_tick:
-                    is_exit_frag = True
-            
-            # No exit frags possible for:
-            # - ct_killed (T won by eliminating CT)
-            # - t_killed (CT won by eliminating T)
-            
-            # Update statistics
-            player_stats[attacker]["total_kills"] += 1
-            
-            if is_exit_frag:
-                player_stats[attacker]["exit_frags"] += 1
-            else:
-                player_stats[attacker]["meaningful_kills"] += 1
-
-# ===== Generate output =====
-rows = []
-
-for player, stats in player_stats.items():
-    total_kills = stats["total_kills"]
-    exit_frags = stats["exit_frags"]
-    meaningful = stats["meaningful_kills"]
-    total_rounds = stats["rounds_participated"]  # Already an integer count
-    
-    # Only include players who got at least 1 kill
-    if total_kills == 0:
-        continue
-    
-    exit_frag_rate = (exit_frags / total_kills) * 100
-    meaningful_rate = (meaningful / total_kills) * 100
-    
-    rows.append({
-        "Player": player,
-        "TotalRounds": total_rounds,
-        "TotalKills": total_kills,
-        "MeaningfulKills": meaningful,
-        "ExitFrags": exit_frags,
-        "MeaningfulRate_%": round(meaningful_rate, 4),
-        "ExitFragRate_%": round(exit_frag_rate, 4)
-    })
-
-if rows:
-    df = pd.DataFrame(rows)
-    # Sort by exit frag rate (descending) to highlight the "merchants"
-    df = df.sort_values("ExitFragRate_%", ascending=False)
-    df.to_csv(output_csv, index=False)
-    print(f"\nDone! Results saved to {output_csv}")
-    print(f"knife rounds removed: {countknife}")
-    
-    # Print summary statistics
-    print("\n" + "="*70)
-    print("TOP 10 EXIT FRAG MERCHANTS:")
-    print("="*70)
-    top_exit = df.nlargest(10, "ExitFragRate_%")
-    for idx, row in top_exit.iterrows():
-        print(f"{row['Player']:.<25} {row['ExitFragRate_%']:>6.2f}% exit frags "
-              f"({row['ExitFrags']}/{row['TotalKills']} kills, {row['TotalRounds']} rounds)")
-    
-    print("\n" + "="*70)
-    print("TOP 10 MOST IMPACTFUL PLAYERS:")
-    print("="*70)
-    top_meaningful = df.nlargest(10, "MeaningfulRate_%")
-    for idx, row in top_meaningful.iterrows():
-        print(f"{row['Player']:.<25} {row['MeaningfulRate_%']:>6.2f}% meaningful "
-              f"({row['MeaningfulKills']}/{row['TotalKills']} kills, {row['TotalRounds']} rounds)")
-    
-    print("\n" + "="*70)
-    print("OVERALL STATISTICS:")
-    print("="*70)
-    total_all_kills = df["TotalKills"].sum()
-    total_exit = df["ExitFrags"].sum()
-    total_meaningful = df["MeaningfulKills"].sum()
-    avg_exit_rate = (total_exit / total_all_kills) * 100 if total_all_kills > 0 else 0
-    
-    print(f"Total kills analyzed: {total_all_kills}")
-    print(f"Total exit frags: {total_exit} ({avg_exit_rate:.2f}%)")
-    print(f"Total meaningful kills: {total_meaningful} ({100-avg_exit_rate:.2f}%)")
-    print(f"Players analyzed: {len(df)}")
-else:
-    print("No data collected.")
\ No newline at end of file
+            print("No data collected.")
+
+
+if __name__ == "__main__":
+    args = parse_args(demo_root)
+    run_from_args([ExitFragAnalyzer()], args)
@@ -4,6 +4,10 @@ from matplotlib.offsetbox import OffsetImage, AnnotationBbox
 from PIL import Image, ImageDraw
 import numpy as np
 from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.teams import player_teams
 
 # ===== Configuration =====
 csv_file = "exit_frag/exit_frag_analysis.csv"
@@ -140,6 +144,7 @@ PLAYER_TEAMS = {
     "MAJ3R": "Eternal Fire",
     "cadiaN": "Astralis",
 }
+PLAYER_TEAMS = player_teams(PLAYER_TEAMS)  # plus the teams first_kill.py stored for everyone else
 
 # ===== ABSOLUTE POSITION CONTROLS - CHANGE THESE VALUES =====
 # Figure dimensions (pixels at 300 DPI)
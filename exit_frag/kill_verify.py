@@ -1,58 +1,23 @@
-from awpy import Demo
 from pathlib import Path
+import sys
 import pandas as pd
 from collections import defaultdict
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.aliases import norm_names
+from common.catalog import load_catalog
+from common.knife import drop_knife_round, knife_round
+from common.parse_cache import load_demo
+from common.parse_profile import ParseProfile
+
 # ===== Configuration =====
 demo_root = Path("/Volumes/TOSHIBA EXT/Demo_2025/IEM_Chengdu_2025")  # Change to your root directory
 output_csv = "player_kills_verification.csv"
 REMOVE_KNIFE_ROUND = True  # Set to True to remove knife rounds
-
-# ===== Valid weapons for knife round detection =====
-valid_guns = {
-    "hkp2000", "elite", "glock", "p250", "fiveseven", "tec9", "cz75a", "deagle", "revolver",
-    "mac10", "mp9", "mp7", "mp5sd", "ump45", "p90", "bizon",
-    "galilar", "famas", "ak47", "m4a1", "m4a1_silencer", "sg556", "aug",
-    "ssg08", "awp", "g3sg1", "scar20",
-    "nova", "xm1014", "mag7", "sawedoff",
-    "negev", "m249", "taser"
-}
-
-# ===== Name normalization =====
-alias_map = {
-    "sh1ro": {"SH1R0", "sh1r0"},
-    "910": {"910-", "-910"},
-    "mzinho": {"Mzinho"},
-    "Techno": {"Techno4K"},
-    "Ag1l": {"ag1l", "ag1L"},
-    "dav1deuS": {"dav1deu$", "davideuS"},
-    "device": {"dev1ce"},
-    "electroNic": {"electronic"},
-    "HeavyGod": {"HeavyGoD"},
-    "hfah": {"Hfah"},
-    "huNter-": {"huNter"},
-    "hypex": {"Hypex"},
-    "jcobbb": {"Jcobbb"},
-    "kauez": {"Kauez"},
-    "lux": {"Lux"},
-    "NAF": {"NAF-FLY"},
-    "NertZ": {"nertZ"},
-    "skullz": {"Skullz"},
-    "Snax": {"snax"},
-    "woxic": {"Woxic"},
-}
-
-def norm_name(name: str) -> str:
-    if not isinstance(name, str):
-        return name
-    s = name.strip()
-    for canon, vars_ in alias_map.items():
-        if s == canon or s in vars_:
-            return canon
-    return s
+PROFILE = ParseProfile(tables=("rounds", "kills", "damages"))  # kills only, no tick parse
 
 # ===== Find demo files =====
-demo_files = [f for f in sorted(demo_root.rglob("*.dem")) if not f.name.startswith("._")]
+demo_files = load_catalog(demo_root).select()
 print(f"Found {len(demo_files)} demos under {demo_root}")
 print(f"Remove knife rounds: {REMOVE_KNIFE_ROUND}")
 
@@ -62,14 +27,12 @@ player_kills = defaultdict(int)
 for demo_path in demo_files:
     print(f"Parsing {demo_path.name}")
     try:
-        demo = Demo(str(demo_path), verbose=False)
-        demo.parse()
+        demo = load_demo(demo_path, profile=PROFILE)
         
         kills_df = demo.kills.to_pandas()
         
         if REMOVE_KNIFE_ROUND:
-            rounds_df = demo.rounds.to_pandas()
-            damages_df = demo.damages.to_pandas()
+            knife = knife_round(demo)
     except Exception as e:
         print(f"[warn] failed on {demo_path.name}: {e}")
         continue
@@ -79,29 +42,12 @@ for demo_path in demo_files:
         continue
     
     # ===== Remove knife/warmup round if flag is set =====
-    if REMOVE_KNIFE_ROUND:
-        # if rounds_df is not None and not rounds_df.empty and damages_df is not None and not damages_df.empty:
-        #     first_round = int(rounds_df["round_num"].min())
-        #     first_round_damages = damages_df[damages_df["round_num"] == first_round]
-            
-        #     if not first_round_damages.empty and "weapon" in first_round_damages.columns:
-        #         used_weapons = set(first_round_damages["weapon"].dropna().astype(str).str.lower().unique())
-                
-        #         if used_weapons and used_weapons.isdisjoint(valid_guns):
-        #             print(f"[INFO] Removing knife round {first_round} from {demo_path.name}")
-        #             kills_df = kills_df[kills_df["round_num"] != first_round]
-        if not rounds_df.empty and not damages_df.empty:
-            first_round = int(rounds_df["round_num"].min())
-            first_round_damages = damages_df[damages_df["round_num"] == first_round]
-            used_weapons = set(first_round_damages["weapon"].dropna().astype(str).str.lower().unique())
-            print(f"[DEBUG] Demo {demo_path.name} round {first_round} used weapons: {used_weapons}")
+    if REMOVE_KNIFE_ROUND and knife["first_round"] is not None:
+        print(f"[DEBUG] Demo {demo_path.name} round {knife['first_round']} used weapons: {set(knife['weapons'])}")
 
-            if used_weapons.isdisjoint(valid_guns): 
-                print(f"[INFO] 剔除 demo {demo_path.name} 的第一个回合 (round {first_round})，武器={used_weapons}")
-                rounds_df = rounds_df[rounds_df["round_num"] != first_round]
-                damages_df = damages_df[damages_df["round_num"] != first_round]
-                # ticks_df = ticks_df[ticks_df["round_num"] != first_round]
-                kills_df = kills_df[kills_df["round_num"] != first_round]
+        if knife["is_knife"]:
+            print(f"[INFO] 剔除 demo {demo_path.name} 的第一个回合 (round {knife['first_round']})，武器={set(knife['weapons'])}")
+            kills_df = drop_knife_round(kills_df, knife)
     
     # Count kills per player
     if "attacker_name" not in kills_df.columns:
@@ -109,7 +55,7 @@ for demo_path in demo_files:
         continue
     
     kills_clean = kills_df.dropna(subset=["attacker_name"]).copy()
-    kills_clean["attacker_name"] = kills_clean["attacker_name"].apply(lambda x: norm_name(str(x)))
+    kills_clean["attacker_name"] = norm_names(kills_clean["attacker_name"].astype(str))
     
     # Aggregate
     kill_counts = kills_clean["attacker_name"].value_counts()
@@ -1,5 +1,5 @@
-from awpy import Demo
 from pathlib import Path
+import sys
 import pandas as pd
 import numpy as np
 from collections import defaultdict
@@ -7,23 +7,24 @@ import matplotlib.pyplot as plt
 import matplotlib.image as mpimg
 from awpy.plot.utils import game_to_pixel
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.catalog import load_catalog
+from common.knife import drop_knife_round, knife_round
+from common.pandas_engine import first_kills, valid_kills
+from common.parse_cache import load_demo
+from common.parse_profile import ParseProfile
+
 # ===== Configuration =====
 demo_root = Path("/Volumes/TOSHIBA EXT/last3month")  # Change to your root directory
 output_dir = Path("first_blood_heatmaps2")
 output_dir.mkdir(exist_ok=True)
-
-# ===== Valid weapons for knife round detection =====
-valid_guns = {
-    "hkp2000", "elite", "glock", "p250", "fiveseven", "tec9", "cz75a", "deagle", "revolver",
-    "mac10", "mp9", "mp7", "mp5sd", "ump45", "p90", "bizon",
-    "galilar", "famas", "ak47", "m4a1", "m4a1_silencer", "sg556", "aug",
-    "ssg08", "awp", "g3sg1", "scar20",
-    "nova", "xm1014", "mag7", "sawedoff",
-    "negev", "m249", "taser"
-}
+PROFILE = ParseProfile(tables=("rounds", "kills", "damages"))  # kills only, no tick parse
+MAP_FILTER = None       # e.g. "de_nuke" to only parse and plot that map
+TICKRATE_FILTER = None  # e.g. 128 to only use 128-tick demos
 
 # ===== Find demo files =====
-demo_files = [f for f in sorted(demo_root.rglob("*.dem")) if not f.name.startswith("._")]
+# Map and tickrate come from the demo headers in the catalog, so other demos are never parsed
+demo_files = load_catalog(demo_root).select(map_name=MAP_FILTER, tickrate=TICKRATE_FILTER)
 print(f"Found {len(demo_files)} demos under {demo_root}")
 
 # ===== Global aggregators =====
@@ -40,12 +41,11 @@ invalid_fd_count = 0  # Track filtered first deaths
 for demo_path in demo_files:
     print(f"Parsing {demo_path.name}")
     try:
-        demo = Demo(str(demo_path), verbose=False)
-        demo.parse()
+        demo = load_demo(demo_path, profile=PROFILE)
         
         rounds_df = demo.rounds.to_pandas()
         kills_df = demo.kills.to_pandas()
-        damages_df = demo.damages.to_pandas()
+        knife = knife_round(demo)
         header = demo.header
     except Exception as e:
         print(f"[warn] failed on {demo_path.name}: {e}")
@@ -62,19 +62,11 @@ for demo_path in demo_files:
         continue
 
     # ===== Remove knife/warmup round =====
-    if not rounds_df.empty and damages_df is not None and not damages_df.empty:
-        first_round = int(rounds_df["round_num"].min())
-        first_round_damages = damages_df[damages_df["round_num"] == first_round]
-        
-        if not first_round_damages.empty and "weapon" in first_round_damages.columns:
-            used_weapons = set(first_round_damages["weapon"].dropna().astype(str).str.lower().unique())
-            
-            if used_weapons.isdisjoint(valid_guns):
-                print(f"[INFO] Removing knife round {first_round} from {demo_path.name}")
-                countknife += 1
-                rounds_df = rounds_df[rounds_df["round_num"] != first_round]
-                if kills_df is not None and not kills_df.empty:
-                    kills_df = kills_df[kills_df["round_num"] != first_round]
+    if knife["is_knife"]:
+        print(f"[INFO] Removing knife round {knife['first_round']} from {demo_path.name}")
+        countknife += 1
+        rounds_df = drop_knife_round(rounds_df, knife)
+        kills_df = drop_knife_round(kills_df, knife)
 
     # Check for required columns
     if kills_df is None or kills_df.empty:
@@ -90,63 +82,24 @@ for demo_path in demo_files:
         print(f"[warn] {demo_path.name} kills missing columns: {missing_kill}")
         continue
 
-    # ===== Process each round to find first blood =====
-    for round_num in rounds_df["round_num"].unique():
-        round_kills = kills_df[kills_df["round_num"] == round_num].copy()
-        
-        if round_kills.empty:
-            continue
-        
-        # Sort by tick to get first kill
-        round_kills = round_kills.sort_values("tick")
-        
-        # Find the first VALID kill of the round
-        first_kill = None
-        for idx, kill_row in round_kills.iterrows():
-            attacker_name = str(kill_row.get("attacker_name", ""))
-            victim_name = str(kill_row.get("victim_name", ""))
-            weapon = str(kill_row.get("weapon", "")).lower()
-            
-            # Skip if attacker killed themselves
-            if attacker_name == victim_name:
-                invalid_fk_count += 1
-                continue #break
-            
-            # Skip if weapon is invalid (world, fall damage, etc.)
-            if weapon in ["", "world", "worldspawn", "inferno", "trigger_hurt", "unknown", " "]:
-                invalid_fk_count += 1
-                continue #break
-            
-            # This is a valid first kill
-            first_kill = kill_row
-            break
-        
-        # If no valid first kill found, skip this round
-        if first_kill is None:
-            continue
-        
-        # Extract ATTACKER position and side (first kill)
-        fk_x = first_kill["attacker_X"]
-        fk_y = first_kill["attacker_Y"]
-        fk_z = first_kill["attacker_Z"]
-        fk_side = str(first_kill["attacker_side"]).lower()
-        weapon = str(first_kill["weapon"]).lower()
-        
-        # Extract VICTIM position and side (first death)
-        fd_x = first_kill["victim_X"]
-        fd_y = first_kill["victim_Y"]
-        fd_z = first_kill["victim_Z"]
-        fd_side = str(first_kill["victim_side"]).lower()
-        
-        # Store first kill position if valid
-        if not (pd.isna(fk_x) or pd.isna(fk_y) or pd.isna(fk_z) or pd.isna(fk_side)):
-            first_blood_positions[map_name].append((fk_x, fk_y, fk_z, fk_side))
-            # Track weapon
-            first_blood_weapons[weapon] += 1
-        
-        # Store first death position if valid
-        if not (pd.isna(fd_x) or pd.isna(fd_y) or pd.isna(fd_z) or pd.isna(fd_side)):
-            first_death_positions[map_name].append((fd_x, fd_y, fd_z, fd_side))
+    # ===== Find the first blood of every round =====
+    # Earliest valid kill per round; suicides and world damage before it are counted as filtered
+    kills_df = kills_df[kills_df["round_num"].isin(rounds_df["round_num"].unique())]
+    first_by_round = first_kills(kills_df)
+    first_tick = kills_df["round_num"].map(first_by_round["tick"])
+    invalid_fk_count += int((~valid_kills(kills_df) & ~(kills_df["tick"] >= first_tick)).sum())
+
+    # Store ATTACKER positions and weapons (first kill) where the position and side are known
+    first_blood = first_by_round.dropna(subset=["attacker_X", "attacker_Y", "attacker_Z", "attacker_side"])
+    first_blood_positions[map_name].extend(zip(first_blood["attacker_X"], first_blood["attacker_Y"],
+                                               first_blood["attacker_Z"], first_blood["attacker_side"]))
+    for weapon in first_blood["weapon"]:
+        first_blood_weapons[weapon] += 1
+
+    # Store VICTIM positions (first death) where the position and side are known
+    first_death = first_by_round.dropna(subset=["victim_X", "victim_Y", "victim_Z", "victim_side"])
+    first_death_positions[map_name].extend(zip(first_death["victim_X"], first_death["victim_Y"],
+                                               first_death["victim_Z"], first_death["victim_side"]))
 
 # ===== Generate heatmaps for each map =====
 print(f"\n{'='*70}")
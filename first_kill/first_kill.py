@@ -1,57 +1,26 @@
-from awpy import Demo
 from pathlib import Path
+import sys
 import pandas as pd
-import numpy as np
+import polars as pl
 from collections import defaultdict
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.accumulator import Accumulator
+from common.aliases import norm_name
+from common.catalog import event_of
+from common.driver import Analyzer, merge_counts, parse_args, run_from_args
+from common.identity import NO_ID, add_names, merge_names, player_table, with_ids
+from common.knife import drop_knife_round, knife_round
+from common.pandas_engine import INVALID_WEAPONS, first_kills
+from common.parse_profile import ParseProfile
+from common.round_facts import played_rounds
+from common.teams import NO_EVENT, TEAM_COLUMN, TeamTable, demo_team_counts, modal_team, new_event_demos
+
 # ===== Configuration =====
 demo_root = Path("/Volumes/TOSHIBA EXT/Demo_2025")  # Change to your root directory
 output_csv = "first_kill/first_kill_analysis.csv"
 DEFAULT_TICKRATE = 64
 
-# ===== Valid weapons for knife round detection =====
-valid_guns = {
-    "hkp2000", "elite", "glock", "p250", "fiveseven", "tec9", "cz75a", "deagle", "revolver", "usp_silencer", "usp_silencer_off",
-    "mac10", "mp9", "mp7", "mp5sd", "ump45", "p90", "bizon",
-    "galilar", "famas", "ak47", "m4a1", "m4a1_silencer", "sg556", "aug",
-    "ssg08", "awp", "g3sg1", "scar20",
-    "nova", "xm1014", "mag7", "sawedoff",
-    "negev", "m249", "taser"
-}
-
-# ===== Name normalization =====
-alias_map = {
-    "sh1ro": {"SH1R0", "sh1r0"},
-    "910": {"910-", "-910"},
-    "mzinho": {"Mzinho"},
-    "Techno": {"Techno4K"},
-    "Ag1l": {"ag1l", "ag1L"},
-    "dav1deuS": {"dav1deu$", "davideuS"},
-    "device": {"dev1ce"},
-    "electroNic": {"electronic"},
-    "HeavyGod": {"HeavyGoD"},
-    "hfah": {"Hfah"},
-    "huNter-": {"huNter"},
-    "hypex": {"Hypex"},
-    "jcobbb": {"Jcobbb"},
-    "kauez": {"Kauez"},
-    "lux": {"Lux"},
-    "NAF": {"NAF-FLY"},
-    "NertZ": {"nertZ"},
-    "skullz": {"Skullz"},
-    "Snax": {"snax"},
-    "woxic": {"Woxic"},
-}
-
-def norm_name(name: str) -> str:
-    if not isinstance(name, str):
-        return name
-    s = name.strip()
-    for canon, vars_ in alias_map.items():
-        if s == canon or s in vars_:
-            return canon
-    return s
-
 # ===== Team mapping (you can expand this) =====
 PLAYER_TEAMS = {
     "donk": "Spirit",
@@ -105,285 +74,366 @@ PLAYER_TEAMS = {
     "kyousuke": "Falcons"
 }
 
-# ===== Global aggregators =====
-# player -> {stats dict}
-player_stats = defaultdict(lambda: {
-    "team": "Unknown",
-    "rounds_played": 0,
-    "total_kills": 0,
-    "first_kills": 0,
-    "rounds_won": 0,
-    "rounds_lost": 0,
-    "fk_and_won": 0,      # Got first kill AND won round
-    "fk_and_lost": 0,     # Got first kill BUT lost round
-    "no_fk_and_won": 0,   # No first kill BUT won round
-    "no_fk_and_lost": 0,  # No first kill AND lost round
-})
-
-countknife = 0
-
-# ===== Find demo files =====
-demo_files = [f for f in sorted(demo_root.rglob("*.dem")) if not f.name.startswith("._")]
-print(f"Found {len(demo_files)} demos under {demo_root}")
-
-for demo_path in demo_files:
-    print(f"Parsing {demo_path.name}")
-    try:
-        demo = Demo(str(demo_path), verbose=False)
-        demo.parse(player_props=["name", "team_name"])
-        
-        rounds_df = demo.rounds.to_pandas()
-        kills_df = demo.kills.to_pandas()
-        damages_df = demo.damages.to_pandas()
-        ticks_df = demo.ticks.to_pandas()
-    except Exception as e:
-        print(f"[warn] failed on {demo_path.name}: {e}")
-        continue
-
-    if rounds_df is None or rounds_df.empty:
-        print(f"[warn] {demo_path.name} has empty rounds data")
-        continue
-
-    # ===== Remove knife/warmup round =====
-    if not rounds_df.empty and damages_df is not None and not damages_df.empty:
-        first_round = int(rounds_df["round_num"].min())
-        first_round_damages = damages_df[damages_df["round_num"] == first_round]
-        
-        if not first_round_damages.empty and "weapon" in first_round_damages.columns:
-            used_weapons = set(first_round_damages["weapon"].dropna().astype(str).str.lower().unique())
-            
-            if used_weapons.isdisjoint(valid_guns):
-                print(f"[INFO] Removing knife round {first_round} from {demo_path.name}")
-                countknife += 1
-                rounds_df = rounds_df[rounds_df["round_num"] != first_round]
-                if kills_df is not None and not kills_df.empty:
-                    kills_df = kills_df[kills_df["round_num"] != first_round]
-                if ticks_df is not None and not ticks_df.empty:
-                    ticks_df = ticks_df[ticks_df["round_num"] != first_round]
-
-    # ===== Track team assignments from ticks =====
-    player_to_team = {}
-    if ticks_df is not None and not ticks_df.empty:
-        if "name" in ticks_df.columns and "team_name" in ticks_df.columns:
-            ticks_clean = ticks_df.dropna(subset=["name", "team_name"]).copy()
-            ticks_clean["name"] = ticks_clean["name"].apply(lambda x: norm_name(str(x)))
-            
-            # Get the most common team_name for each player
-            for player_name in ticks_clean["name"].unique():
-                player_ticks = ticks_clean[ticks_clean["name"] == player_name]
-                most_common_team = player_ticks["team_name"].mode()
-                if len(most_common_team) > 0:
-                    player_to_team[player_name] = str(most_common_team.iloc[0])
-
-    # Check for required columns
-    required_round_cols = ["round_num", "winner"]
-    missing_round = [c for c in required_round_cols if c not in rounds_df.columns]
-    
-    if missing_round:
-        print(f"[warn] {demo_path.name} rounds missing columns: {missing_round}")
-        continue
-    
-    # Process kills if available
-    if kills_df is None or kills_df.empty:
-        print(f"[info] {demo_path.name} has no kills data")
-        continue
-    
-    required_kill_cols = ["attacker_name", "attacker_side", "tick", "round_num"]
-    missing_kill = [c for c in required_kill_cols if c not in kills_df.columns]
-    
-    if missing_kill:
-        print(f"[warn] {demo_path.name} kills missing columns: {missing_kill}")
-        continue
-
-    # ===== Process each round =====
-    for _, round_row in rounds_df.iterrows():
-        round_num = round_row["round_num"]
-        winner = str(round_row["winner"]).lower()
-        
-        if pd.isna(round_num) or pd.isna(winner):
-            continue
-        
-        round_num = int(round_num)
-        
-        # Get all kills in this round
-        round_kills = kills_df[kills_df["round_num"] == round_num].copy()
-        
-        if round_kills.empty:
-            continue
-        
-        # Clean and normalize data
-        round_kills = round_kills.dropna(subset=["attacker_name", "attacker_side"])
-        round_kills["attacker_name"] = round_kills["attacker_name"].apply(lambda x: norm_name(str(x)))
-        round_kills["attacker_side"] = round_kills["attacker_side"].apply(lambda x: str(x).lower())
-        round_kills = round_kills.sort_values("tick")
-        
-        # Get first kill of the round
-        first_kill = round_kills.iloc[0] if len(round_kills) > 0 else None
-        first_killer = None
-        first_killer_side = None
-        
-        if first_kill is not None:
-            first_killer = first_kill["attacker_name"]
-            first_killer_side = first_kill["attacker_side"]
-        
-        # Get all unique players in this round from ticks
-        round_players = set()
-        if ticks_df is not None and not ticks_df.empty:
-            round_ticks = ticks_df[ticks_df["round_num"] == round_num]
-            if not round_ticks.empty and "name" in round_ticks.columns and "side" in round_ticks.columns:
-                ticks_players = round_ticks.dropna(subset=["name", "side"])
-                for _, tick_row in ticks_players.iterrows():
-                    player_name = norm_name(str(tick_row["name"]))
-                    player_side = str(tick_row["side"]).lower()
-                    if player_side in ["t", "ct"]:
-                        round_players.add((player_name, player_side))
-        
-        # Update stats for all players in this round
-        for player_name, player_side in round_players:
-            # Determine team name
-            team_name = "Unknown"
-            if player_name in PLAYER_TEAMS:
-                team_name = PLAYER_TEAMS[player_name]
-            elif player_name in player_to_team:
-                team_name = player_to_team[player_name]
-            
-            player_stats[player_name]["team"] = team_name
-            player_stats[player_name]["rounds_played"] += 1
-            
-            # Check if player won this round
-            player_won = (player_side == winner)
-            
-            if player_won:
-                player_stats[player_name]["rounds_won"] += 1
-            else:
-                player_stats[player_name]["rounds_lost"] += 1
-            
-            # Check if player got first kill
-            got_first_kill = (player_name == first_killer)
-            
-            if got_first_kill:
-                player_stats[player_name]["first_kills"] += 1
-                
-                if player_won:
-                    player_stats[player_name]["fk_and_won"] += 1
-                else:
-                    player_stats[player_name]["fk_and_lost"] += 1
-            else:
-                if player_won:
-                    player_stats[player_name]["no_fk_and_won"] += 1
-                else:
-                    player_stats[player_name]["no_fk_and_lost"] += 1
-        
-        # Count total kills for each player in this round
-        for _, kill_row in round_kills.iterrows():
-            attacker = kill_row["attacker_name"]
-            player_stats[attacker]["total_kills"] += 1
-
-# ===== Generate output =====
-rows = []
-
-for player, stats in player_stats.items():
-    rounds_played = stats["rounds_played"]
-    
-    # Only include players who played at least 1 round
-    if rounds_played == 0:
-        continue
-    
-    total_kills = stats["total_kills"]
-    first_kills = stats["first_kills"]
-    rounds_won = stats["rounds_won"]
-    rounds_lost = stats["rounds_lost"]
-    fk_and_won = stats["fk_and_won"]
-    fk_and_lost = stats["fk_and_lost"]
-    no_fk_and_won = stats["no_fk_and_won"]
-    no_fk_and_lost = stats["no_fk_and_lost"]
-    team = stats["team"]
-    
-    # Calculate rates
-    first_kill_rate = (first_kills / rounds_played) * 100 if rounds_played > 0 else 0
-    win_rate = (rounds_won / rounds_played) * 100 if rounds_played > 0 else 0
-    
-    # First kill impact
-    fk_win_rate = (fk_and_won / first_kills) * 100 if first_kills > 0 else 0
-    no_fk_win_rate = (no_fk_and_won / (rounds_played - first_kills)) * 100 if (rounds_played - first_kills) > 0 else 0
-    
-    rows.append({
-        "Player": player,
-        "Team": team,
-        "RoundsPlayed": rounds_played,
-        "TotalKills": total_kills,
-        "FirstKills": first_kills,
-        "RoundsWon": rounds_won,
-        "RoundsLost": rounds_lost,
-        "FK_and_Won": fk_and_won,
-        "FK_and_Lost": fk_and_lost,
-        "NoFK_and_Won": no_fk_and_won,
-        "NoFK_and_Lost": no_fk_and_lost,
-        "FirstKillRate_%": round(first_kill_rate, 2),
-        "WinRate_%": round(win_rate, 2),
-        "FK_WinRate_%": round(fk_win_rate, 2),
-        "NoFK_WinRate_%": round(no_fk_win_rate, 2),
-    })
-
-if rows:
-    df = pd.DataFrame(rows)
-    # Sort by first kills (descending)
-    df = df.sort_values("FirstKills", ascending=False)
-    df.to_csv(output_csv, index=False)
-    print(f"\nDone! Results saved to {output_csv}")
-    print(f"Knife rounds removed: {countknife}")
-    
-    # Print summary statistics
-    print("\n" + "="*80)
-    print("TOP 10 FIRST KILL LEADERS:")
-    print("="*80)
-    top_fk = df.nlargest(10, "FirstKills")
-    for idx, row in top_fk.iterrows():
-        print(f"{row['Player']:.<20} {row['Team']:.<15} "
-              f"{row['FirstKills']:>3} first kills in {row['RoundsPlayed']:>4} rounds "
-              f"({row['FirstKillRate_%']:>5.2f}%) | FK Win Rate: {row['FK_WinRate_%']:>5.2f}%")
-    
-    print("\n" + "="*80)
-    print("TOP 10 FIRST KILL RATE (min 0 rounds):")
-    print("="*80)
-    df_qualified = df[df["RoundsPlayed"] >= 0]
-    if len(df_qualified) >= 10:
-        top_rate = df_qualified.nlargest(10, "FirstKillRate_%")
-        for idx, row in top_rate.iterrows():
-            print(f"{row['Player']:.<20} {row['Team']:.<15} "
-                  f"{row['FirstKillRate_%']:>5.2f}% ({row['FirstKills']}/{row['RoundsPlayed']} rounds) | "
-                  f"FK Win Rate: {row['FK_WinRate_%']:>5.2f}%")
-    
-    print("\n" + "="*80)
-    print("LOW 10 FIRST KILL RATE (min 0 rounds):")
-    print("="*80)
-    df_qualified = df[df["RoundsPlayed"] >= 0]
-    if len(df_qualified) >= 10:
-        top_rate = df_qualified.nsmallest(10, "FirstKillRate_%")
-        for idx, row in top_rate.iterrows():
-            print(f"{row['Player']:.<20} {row['Team']:.<15} "
-                  f"{row['FirstKillRate_%']:>5.2f}% ({row['FirstKills']}/{row['RoundsPlayed']} rounds) | "
-                  f"FK Win Rate: {row['FK_WinRate_%']:>5.2f}%")
-    
-    print("\n" + "="*80)
-    print("OVERALL STATISTICS:")
-    print("="*80)
-    total_rounds = df["RoundsPlayed"].sum()
-    total_first_kills = df["FirstKills"].sum()
-    total_fk_wins = df["FK_and_Won"].sum()
-    total_fk_losses = df["FK_and_Lost"].sum()
-    total_no_fk_wins = df["NoFK_and_Won"].sum()
-    total_no_fk_losses = df["NoFK_and_Lost"].sum()
-    
-    overall_fk_win_rate = (total_fk_wins / total_first_kills) * 100 if total_first_kills > 0 else 0
-    rounds_without_fk = total_rounds - total_first_kills
-    overall_no_fk_win_rate = (total_no_fk_wins / rounds_without_fk) * 100 if rounds_without_fk > 0 else 0
-    
-    print(f"Total rounds analyzed: {total_rounds}")
-    print(f"Total first kills: {total_first_kills}")
-    print(f"Win rate WITH first kill: {overall_fk_win_rate:.2f}%")
-    print(f"Win rate WITHOUT first kill: {overall_no_fk_win_rate:.2f}%")
-    print(f"First kill advantage: +{overall_fk_win_rate - overall_no_fk_win_rate:.2f}%")
-    print(f"Players analyzed: {len(df)}")
-else:
-    print("No data collected.")
\ No newline at end of file
+# ===== Aggregators =====
+# steamid x metric counts (teams are kept apart, steamid -> team)
+METRICS = [
+    "rounds_played",
+    "total_kills",
+    "first_kills",
+    "rounds_won",
+    "rounds_lost",
+    "fk_and_won",      # Got first kill AND won round
+    "fk_and_lost",     # Got first kill BUT lost round
+    "no_fk_and_won",   # No first kill BUT won round
+    "no_fk_and_lost",  # No first kill AND lost round
+]
+
+def new_player_stats():
+    return Accumulator(METRICS)
+
+# ===== Tick tables =====
+def round_players(ticks: pl.LazyFrame, round_nums: list) -> pl.LazyFrame:
+    """Distinct (round_num, steamid, side) of the given rounds with t/ct sides, and the
+    first name the steamid had on that side
+    """
+    return (
+        with_ids(ticks.select("round_num", "steamid", "name", "side"), ["steamid"])
+        .filter(pl.col("round_num").is_in(round_nums))
+        .drop_nulls(["name", "side"])
+        .select(pl.col("round_num").cast(pl.Int64), "steamid", pl.col("name").str.strip_chars(),
+                pl.col("side").cast(pl.String).str.to_lowercase().alias("side"))
+        .filter(pl.col("side").is_in(["t", "ct"]))
+        .unique(["round_num", "steamid", "side"], keep="first", maintain_order=True)
+    )
+
+def assign_teams(partial, steamids, team_counts) -> None:
+    """Team of each steamid, from the name it first had in this demo: PLAYER_TEAMS, else the
+    most common team of the demo's ticks (ties go to the first in sorted order, like mode())
+    """
+    for steamid in steamids:
+        player_name = norm_name(partial["names"][steamid][0])
+        teams = team_counts.get(player_name)
+        partial["teams"][steamid] = PLAYER_TEAMS.get(player_name, modal_team(teams) if teams else "Unknown")
+
+# ===== Analyzer =====
+class FirstKillAnalyzer(Analyzer):
+    name = "first_kill"
+    version = 6  # team counts kept per demo
+    profile = ParseProfile(tables=("rounds", "kills", "damages", "ticks"),
+                           player_props=["name", "steamid", TEAM_COLUMN])
+
+    def __init__(self, demo_root=demo_root, output_csv=output_csv):
+        self.demo_root = Path(demo_root)
+        self.output_csv = output_csv
+        self.player_stats = new_player_stats()
+        self.names = {}  # steamid -> names seen
+        self.teams = {}  # steamid -> team, the last assignment wins
+        self.team_counts = defaultdict(new_event_demos)  # event -> demo -> player -> team -> ticks
+        self.countknife = 0
+
+    def process(self, demo_path, demo):
+        # Teams are kept apart from the counters: the last assignment wins on merge
+        partial = {"player_stats": new_player_stats(), "names": {}, "teams": {}, "team_counts": {}, "countknife": 0}
+        player_stats = partial["player_stats"]
+        event_name = event_of(self.demo_root, demo_path) or NO_EVENT
+
+        try:
+            rounds_df = demo.rounds.to_pandas()
+            kills = demo.kills
+            # Int64 ids before .to_pandas(); kills by the world get NO_ID instead of a float NaN
+            kill_ids = [c for c in ["attacker_steamid", "victim_steamid"] if c in kills.columns]
+            kills_df = kills.with_columns(pl.col(c).cast(pl.Int64).fill_null(NO_ID) for c in kill_ids).to_pandas()
+            facts = played_rounds(demo).to_pandas()
+            knife = knife_round(demo)
+        except Exception as e:
+            print(f"[warn] failed on {demo_path.name}: {e}")
+            return partial
+
+        if rounds_df is None or rounds_df.empty:
+            print(f"[warn] {demo_path.name} has empty rounds data")
+            return partial
+
+        # ===== Remove knife/warmup round =====
+        if knife["is_knife"]:
+            print(f"[INFO] Removing knife round {knife['first_round']} from {demo_path.name}")
+            partial["countknife"] += 1
+            rounds_df = drop_knife_round(rounds_df, knife)
+            kills_df = drop_knife_round(kills_df, knife)
+
+        # Check for required columns
+        required_round_cols = ["round_num", "winner"]
+        missing_round = [c for c in required_round_cols if c not in rounds_df.columns]
+
+        if missing_round:
+            print(f"[warn] {demo_path.name} rounds missing columns: {missing_round}")
+            return partial
+
+        # Process kills if available
+        if kills_df is None or kills_df.empty:
+            print(f"[info] {demo_path.name} has no kills data")
+            return partial
+
+        required_kill_cols = ["attacker_steamid", "attacker_name", "attacker_side", "victim_name", "weapon", "tick", "round_num"]
+        missing_kill = [c for c in required_kill_cols if c not in kills_df.columns]
+
+        if missing_kill:
+            print(f"[warn] {demo_path.name} kills missing columns: {missing_kill}")
+            return partial
+
+        # ===== Rounds with at least one kill, with their winner =====
+        all_round_nums = facts["round_num"].unique().tolist()
+        facts = facts[facts["round_num"].isin(kills_df["round_num"])]
+        round_nums = facts["round_num"].unique().tolist()
+        round_winners = facts[["round_num", "winner"]]
+
+        # ===== Round participants and team assignments, one deduplication over the ticks =====
+        ticks = demo.ticks.lazy() if demo.fits("ticks") else demo.scan("ticks")
+        players = round_players(ticks, round_nums).collect(engine=demo.collect_engine()).to_pandas()
+        add_names(partial["names"], players[["steamid", "name"]].itertuples(index=False))
+        team_counts = demo_team_counts(ticks, all_round_nums, demo.collect_engine())
+        if team_counts:
+            partial["team_counts"][event_name] = {str(demo_path): team_counts}
+
+        # ===== Win/loss and first-kill attribution for every player-round, through joins =====
+        # First valid kill of every round at once (suicides and world damage skipped)
+        kills_df = kills_df.dropna(subset=["attacker_name", "attacker_side"])
+        first_killers = first_kills(kills_df)["attacker_steamid"].astype("Int64").rename("first_killer")
+        player_rounds = (
+            players.merge(round_winners, on="round_num")
+            .merge(first_killers, left_on="round_num", right_index=True, how="left")
+        )
+        won = player_rounds["side"] == player_rounds["winner"]
+        got_fk = (player_rounds["steamid"] == player_rounds["first_killer"]).fillna(False).astype(bool)
+        outcomes = pd.DataFrame({
+            "steamid": player_rounds["steamid"],
+            "rounds_played": 1,
+            "first_kills": got_fk,
+            "rounds_won": won,
+            "rounds_lost": ~won,
+            "fk_and_won": got_fk & won,
+            "fk_and_lost": got_fk & ~won,
+            "no_fk_and_won": ~got_fk & won,
+            "no_fk_and_lost": ~got_fk & ~won,
+        })
+
+        counts = outcomes.groupby("steamid", sort=False).sum()
+        for key in counts.columns:
+            player_stats.add(counts.index, key, counts=counts[key].to_numpy())
+        assign_teams(partial, counts.index, team_counts)
+
+        # Count total kills for each player in the analyzed rounds
+        kills_df = kills_df[kills_df["round_num"].isin(round_nums) & (kills_df["attacker_steamid"] != NO_ID)]
+        kill_counts = kills_df["attacker_steamid"].value_counts(sort=False)
+        player_stats.add(kill_counts.index, "total_kills", counts=kill_counts.to_numpy())
+
+        return partial
+
+    def process_lazy(self, demo_path, demo):
+        """process() on polars LazyFrames: one query plan per demo, same partial"""
+        partial = {"player_stats": new_player_stats(), "names": {}, "teams": {}, "team_counts": {}, "countknife": 0}
+        player_stats = partial["player_stats"]
+        event_name = event_of(self.demo_root, demo_path) or NO_EVENT
+
+        try:
+            facts = played_rounds(demo)
+            kills = demo.scan("kills")
+            ticks = demo.scan("ticks")
+            knife = knife_round(demo)
+        except Exception as e:
+            print(f"[warn] failed on {demo_path.name}: {e}")
+            return partial
+
+        if knife["first_round"] is None:
+            print(f"[warn] {demo_path.name} has empty rounds data")
+            return partial
+
+        if knife["is_knife"]:
+            print(f"[INFO] Removing knife round {knife['first_round']} from {demo_path.name}")
+            partial["countknife"] += 1
+
+        required_kill_cols = ["attacker_steamid", "attacker_name", "attacker_side", "victim_name", "weapon", "tick", "round_num"]
+        missing_kill = [c for c in required_kill_cols if c not in kills.collect_schema().names()]
+        if missing_kill:
+            print(f"[warn] {demo_path.name} kills missing columns: {missing_kill}")
+            return partial
+
+        kills = (
+            drop_knife_round(kills, knife)
+            .select(required_kill_cols)
+            .with_columns(pl.col("attacker_steamid").cast(pl.Int64).fill_null(NO_ID), pl.col("round_num").cast(pl.Int64))
+            .collect(engine=demo.collect_engine())
+        )
+        if kills.is_empty():
+            print(f"[info] {demo_path.name} has no kills data")
+            return partial
+
+        # ===== Rounds with at least one kill, with their winner =====
+        all_round_nums = facts["round_num"].unique().to_list()
+        facts = facts.filter(pl.col("round_num").is_in(kills["round_num"].implode()))
+        round_nums = facts["round_num"].unique().to_list()
+        round_winners = facts.lazy().select(pl.col("round_num").cast(pl.Int64), pl.col("winner").cast(pl.String))
+
+        # ===== First valid kill of every round: no self-kills or world damage, earliest tick =====
+        kills = kills.lazy().drop_nulls(["attacker_name", "attacker_side"])
+        weapon = pl.col("weapon").cast(pl.String).str.to_lowercase()
+        valid = (
+            ~(pl.col("attacker_name") == pl.col("victim_name")).fill_null(False)
+            & ~weapon.is_in(list(INVALID_WEAPONS)).fill_null(False)
+            & pl.col("tick").is_not_null()
+        )
+        first_killers = (
+            kills.with_row_index("_row")
+            .filter(valid)
+            .group_by("round_num")
+            .agg(pl.col("attacker_steamid").sort_by("tick", "_row").first().alias("first_killer"))
+        )
+
+        # ===== Win/loss and first-kill attribution for every player-round, through joins =====
+        players = round_players(ticks, round_nums)
+        won = (pl.col("side") == pl.col("winner")).fill_null(False)
+        got_fk = (pl.col("steamid") == pl.col("first_killer")).fill_null(False)
+        counts = (
+            players.join(round_winners, on="round_num", maintain_order="left")
+            .join(first_killers, on="round_num", how="left", maintain_order="left")
+            .group_by("steamid", maintain_order=True)
+            .agg(
+                pl.len().alias("rounds_played"),
+                got_fk.sum().alias("first_kills"),
+                won.sum().alias("rounds_won"),
+                (~won).sum().alias("rounds_lost"),
+                (got_fk & won).sum().alias("fk_and_won"),
+                (got_fk & ~won).sum().alias("fk_and_lost"),
+                (~got_fk & won).sum().alias("no_fk_and_won"),
+                (~got_fk & ~won).sum().alias("no_fk_and_lost"),
+            )
+        )
+        kill_counts = (
+            kills.filter(pl.col("round_num").is_in(round_nums) & (pl.col("attacker_steamid") != NO_ID))
+            .group_by("attacker_steamid", maintain_order=True)
+            .agg(pl.len().alias("total_kills"))
+        )
+
+        players, counts, kill_counts = pl.collect_all([players, counts, kill_counts], engine=demo.collect_engine())
+        add_names(partial["names"], players.select("steamid", "name").iter_rows())
+        team_counts = demo_team_counts(ticks, all_round_nums, demo.collect_engine())
+        if team_counts:
+            partial["team_counts"][event_name] = {str(demo_path): team_counts}
+
+        steamids = counts["steamid"].to_numpy()
+        for key in counts.columns[1:]:
+            player_stats.add(steamids, key, counts=counts[key].to_numpy())
+        assign_teams(partial, steamids, team_counts)
+        player_stats.add(kill_counts["attacker_steamid"].to_numpy(), "total_kills",
+                         counts=kill_counts["total_kills"].to_numpy())
+
+        return partial
+
+    def merge(self, partial):
+        self.player_stats.merge(partial["player_stats"])
+        merge_names(self.names, partial["names"])
+        self.teams.update(partial["teams"])
+        merge_counts(self.team_counts, partial["team_counts"])
+        self.countknife += partial["countknife"]
+
+    def write_output(self):
+        # ===== Store the player -> team table of the events seen =====
+        teams = TeamTable()
+        teams.update(self.team_counts)
+        teams.save()
+
+        # ===== Generate output =====
+        # Only include players who played at least 1 round
+        players = player_table(self.names)
+        stats = players.by_name(self.player_stats).frame("Player")
+        stats = stats[stats["rounds_played"] > 0]
+        player_teams = {players.name(steamid): team for steamid, team in self.teams.items()}
+        rounds_played = stats["rounds_played"]
+        first_kills = stats["first_kills"]
+        rounds_without_fk = rounds_played - first_kills
+
+        df = pd.DataFrame({
+            "Player": stats["Player"],
+            "Team": stats["Player"].map(player_teams).fillna("Unknown"),
+            "RoundsPlayed": rounds_played,
+            "TotalKills": stats["total_kills"],
+            "FirstKills": first_kills,
+            "RoundsWon": stats["rounds_won"],
+            "RoundsLost": stats["rounds_lost"],
+            "FK_and_Won": stats["fk_and_won"],
+            "FK_and_Lost": stats["fk_and_lost"],
+            "NoFK_and_Won": stats["no_fk_and_won"],
+            "NoFK_and_Lost": stats["no_fk_and_lost"],
+            # Rates
+            "FirstKillRate_%": (first_kills / rounds_played * 100).round(2),
+            "WinRate_%": (stats["rounds_won"] / rounds_played * 100).round(2),
+            # First kill impact
+            "FK_WinRate_%": (stats["fk_and_won"] / first_kills * 100).where(first_kills > 0, 0).round(2),
+            "NoFK_WinRate_%": (stats["no_fk_and_won"] / rounds_without_fk * 100).where(rounds_without_fk > 0, 0).round(2),
+        })
+
+        if not df.empty:
+            # Sort by first kills (descending)
+            df = df.sort_values("FirstKills", ascending=False)
+            df.to_csv(self.output_csv, index=False)
+            print(f"\nDone! Results saved to {self.output_csv}")
+            print(f"Knife rounds removed: {self.countknife}")
+
+            # Print summary statistics
+            print("\n" + "="*80)
+            print("TOP 10 FIRST KILL LEADERS:")
+            print("="*80)
+            top_fk = df.nlargest(10, "FirstKills")
+            for idx, row in top_fk.iterrows():
+                print(f"{row['Player']:.<20} {row['Team']:.<15} "
+                      f"{row['FirstKills']:>3} first kills in {row['RoundsPlayed']:>4} rounds "
+                      f"({row['FirstKillRate_%']:>5.2f}%) | FK Win Rate: {row['FK_WinRate_%']:>5.2f}%")
+
+            print("\n" + "="*80)
+            print("TOP 10 FIRST KILL RATE (min 0 rounds):")
+            print("="*80)
+            df_qualified = df[df["RoundsPlayed"] >= 0]
+            if len(df_qualified) >= 10:
+                top_rate = df_qualified.nlargest(10, "FirstKillRate_%")
+                for idx, row in top_rate.iterrows():
+                    print(f"{row['Player']:.<20} {row['Team']:.<15} "
+                          f"{row['FirstKillRate_%']:>5.2f}% ({row['FirstKills']}/{row['RoundsPlayed']} rounds) | "
+                          f"FK Win Rate: {row['FK_WinRate_%']:>5.2f}%")
+
+            print("\n" + "="*80)
+            print("LOW 10 FIRST KILL RATE (min 0 rounds):")
+            print("="*80)
+            df_qualified = df[df["RoundsPlayed"] >= 0]
+            if len(df_qualified) >= 10:
+                top_rate = df_qualified.nsmallest(10, "FirstKillRate_%")
+                for idx, row in top_rate.iterrows():
+                    print(f"{row['Player']:.<20} {row['Team']:.<15} "
+                          f"{row['FirstKillRate_%']:>5.2f}% ({row['FirstKills']}/{row['RoundsPlayed']} rounds) | "
+                          f"FK Win Rate: {row['FK_WinRate_%']:>5.2f}%")
+
+            print("\n" + "="*80)
+            print("OVERALL STATISTICS:")
+            print("="*80)
+            total_rounds = df["RoundsPlayed"].sum()
+            total_first_kills = df["FirstKills"].sum()
+            total_fk_wins = df["FK_and_Won"].sum()
+            total_fk_losses = df["FK_and_Lost"].sum()
+            total_no_fk_wins = df["NoFK_and_Won"].sum()
+            total_no_fk_losses = df["NoFK_and_Lost"].sum()
+
+            overall_fk_win_rate = (total_fk_wins / total_first_kills) * 100 if total_first_kills > 0 else 0
+            rounds_without_fk = total_rounds - total_first_kills
+            overall_no_fk_win_rate = (total_no_fk_wins / rounds_without_fk) * 100 if rounds_without_fk > 0 else 0
+
+            print(f"Total rounds analyzed: {total_rounds}")
+            print(f"Total first kills: {total_first_kills}")
+            print(f"Win rate WITH first kill: {overall_fk_win_rate:.2f}%")
+            print(f"Win rate WITHOUT first kill: {overall_no_fk_win_rate:.2f}%")
+            print(f"First kill advantage: +{overall_fk_win_rate - overall_no_fk_win_rate:.2f}%")
+            print(f"Players analyzed: {len(df)}")
+        else:
+            print("No data collected.")
+
+
+if __name__ == "__main__":
+    args = parse_args(demo_root)
+    run_from_args([FirstKillAnalyzer(demo_root=args.demo_root)], args)
@@ -0,0 +1,233 @@
+from pathlib import Path
+import os
+import sys
+import polars as pl
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.driver import Analyzer, parse_args, run_from_args
+from common.identity import NO_ID, with_ids
+from common.knife import knife_round
+from common.lazy_engine import most_common, round_participants, round_window
+from common.manifest import STATE_DIR
+from common.parse_profile import ParseProfile
+from common.round_facts import played_rounds
+from exit_frag.exit_frag import DEFAULT_TICKRATE, get_tickrate_from_header
+from weapon_duel.weapon_duel import weapon_value_expr
+
+# ===== Configuration =====
+# Stores one row per kill and per player-round of every demo (knife round
+# excluded), with everything the econ_adv, weapon_duel and exit_frag
+# thresholds are applied to, so recompute.py can redo their CSVs for any
+# threshold without parsing a demo.
+demo_root = Path("/Volumes/TOSHIBA EXT/Demo_2025")  # Change to your root directory
+store_dir = STATE_DIR / "kill_facts"
+TABLES = ("kills", "round_players", "demos")
+KILL_COLUMNS = ["round_num", "tick", "attacker_steamid", "attacker_name", "attacker_side",
+                "victim_steamid", "victim_name", "victim_side", "weapon",
+                "attacker_active_weapon_name", "victim_active_weapon_name"]
+# Kills that are not gun/knife/zeus duels (weapon_duel's filter)
+WORLD_WEAPONS = ["world", "worldspawn", "trigger_hurt", "entityflame"]
+UTILITY_WEAPONS = "grenade|molotov|incendiary|inferno|flashbang|smoke|decoy"
+
+# ===== Store layout =====
+# Rows are sorted by demo; a run replaces the rows of the demos it processed
+# and keeps the others, so --event/--map/--tickrate runs add to the store.
+# <store_dir>/kills.parquet          one row per kill
+#     demo, round_num, tick, tickrate
+#     attacker_/victim_ steamid (null for bots), name, side (lowercased)
+#     weapon, attacker_weapon, victim_weapon (held weapons), *_weapon_value, is_awp_duel
+#     is_duel                        kill between opponents with a gun, knife or zeus
+#     attacker_/victim_ equipment    the player's equipment value at freeze end
+#     attacker_/victim_ team_equipment, ct_equipment, t_equipment   side totals at freeze end
+#     winner, reason, end, official_end, defuse_tick, detonate_tick (common.round_facts)
+#     seconds_to_end, seconds_to_defuse, seconds_to_detonate        from the kill
+# <store_dir>/round_players.parquet  one row per player and round
+#     demo, round_num, steamid, name, side, equipment, ct_equipment, t_equipment
+# <store_dir>/demos.parquet          demo, tickrate, knife_round
+
+def player_id(column):
+    """steamid as an Int64 key, null for bots and the world (see common.identity.with_ids)"""
+    steamid = pl.col(column).cast(pl.Int64)
+    return pl.when(steamid != NO_ID).then(steamid).alias(column)
+
+def seconds_until(column, tickrate):
+    return ((pl.col(column) - pl.col("tick")) / tickrate).alias(f"seconds_to_{column.removesuffix('_tick')}")
+
+def player_economy(ticks, rounds):
+    """(round_num, steamid, side, equipment, ct_equipment, t_equipment): each player's most common
+    equipment value freeze_end..freeze_end+16 (like econ_adv) and the side totals of the round
+    """
+    window = round_window(ticks.select("round_num", "tick", "steamid", "name", "side", "current_equip_value"),
+                          rounds, 0, 16)
+    economy = most_common(with_ids(window, ["steamid"]).drop_nulls(["name", "current_equip_value", "side"]),
+                          ["round_order", "round_num", "steamid", "side"], "current_equip_value")
+    totals = economy.group_by("round_order").agg(
+        pl.col("current_equip_value").filter(pl.col("side") == "ct").sum().alias("ct_equipment"),
+        pl.col("current_equip_value").filter(pl.col("side") == "t").sum().alias("t_equipment"),
+    )
+    return economy.join(totals, on="round_order", maintain_order="left").select(
+        pl.col("round_num").cast(pl.Int64),
+        "steamid",
+        pl.col("side").cast(pl.String),
+        pl.col("current_equip_value").cast(pl.Int64).alias("equipment"),
+        pl.col("ct_equipment").cast(pl.Int64),
+        pl.col("t_equipment").cast(pl.Int64),
+    )
+
+def load_store(store_dir=store_dir):
+    """table -> DataFrame of a stored kill facts run"""
+    missing = [table for table in TABLES if not (Path(store_dir) / f"{table}.parquet").exists()]
+    if missing:
+        raise FileNotFoundError(f"no kill facts {missing} in {store_dir}; run kill_facts/kill_facts.py first")
+    return {table: pl.read_parquet(Path(store_dir) / f"{table}.parquet") for table in TABLES}
+
+# ===== Analyzer =====
+class KillFactsAnalyzer(Analyzer):
+    name = "kill_facts"
+    version = 2  # player economy keyed on steamid, like econ_adv
+    profile = ParseProfile(tables=("rounds", "kills", "damages", "ticks", "bomb"),
+                           player_props=["name", "steamid", "side", "current_equip_value", "active_weapon_name"])
+
+    def __init__(self, store_dir=store_dir):
+        self.store_dir = Path(store_dir)
+        self.tables = {table: [] for table in TABLES}
+
+    def process(self, demo_path, demo):
+        partial = {}
+
+        try:
+            rounds = played_rounds(demo).lazy()
+            kills = demo.scan("kills")
+            ticks = demo.scan("ticks")
+            knife = knife_round(demo)
+        except Exception as e:
+            print(f"[warn] failed on {demo_path.name}: {e}")
+            return partial
+
+        if knife["first_round"] is None:
+            print(f"[warn] {demo_path.name} has empty rounds data")
+            return partial
+
+        tickrate = get_tickrate_from_header(demo, DEFAULT_TICKRATE)
+        demo_column = pl.lit(str(demo_path)).alias("demo")
+
+        # ===== Players of each round: steamid from all ticks, equipment from freeze end =====
+        economy = player_economy(ticks, rounds)
+        orders = rounds.with_row_index("round_order").select("round_order", "round_num")
+        round_players = (
+            round_participants(ticks, rounds)
+            .join(orders, on="round_order")
+            .select("round_num", "steamid", "name")
+            .join(economy, on=["round_num", "steamid"], how="full", coalesce=True)
+            .sort("round_num", maintain_order=True)
+            .select(demo_column, pl.all())
+        )
+
+        # ===== Kills with the economy and outcome of their round =====
+        missing = [c for c in KILL_COLUMNS if c not in kills.collect_schema().names()]
+        kill_facts = pl.LazyFrame()
+        if not missing:
+            # A player listed on both sides of a round takes the last one (like econ_adv)
+            team_equipment = pl.when(pl.col("side") == "ct").then(pl.col("ct_equipment")).otherwise(pl.col("t_equipment"))
+            teams = economy.select(
+                "round_num", "steamid", "equipment", team_equipment.alias("team_equipment")
+            ).unique(["round_num", "steamid"], keep="last", maintain_order=True)
+            totals = economy.select("round_num", "ct_equipment", "t_equipment").unique("round_num")
+
+            weapon = pl.col("weapon").str.to_lowercase()
+            is_duel = (
+                pl.all_horizontal(pl.col(c).is_not_null() for c in ["attacker_name", "victim_name", "attacker_side",
+                                                                     "victim_side", "attacker_steamid", "victim_steamid"])
+                & ~weapon.is_in(WORLD_WEAPONS).fill_null(False)
+                & ~weapon.str.contains(UTILITY_WEAPONS).fill_null(False)
+                & (pl.col("attacker_steamid") != pl.col("victim_steamid"))
+                & (pl.col("attacker_side") != pl.col("victim_side"))
+            )
+            kill_facts = (
+                kills.select(KILL_COLUMNS)
+                .with_row_index("_row")
+                .with_columns(
+                    pl.col("round_num").cast(pl.Int64),
+                    player_id("attacker_steamid"),
+                    player_id("victim_steamid"),
+                    *(pl.col(f"{role}_name").str.strip_chars() for role in ("attacker", "victim")),
+                    *(pl.col(f"{role}_side").cast(pl.String).str.to_lowercase() for role in ("attacker", "victim")),
+                    pl.col("weapon").cast(pl.String),
+                    pl.col("attacker_active_weapon_name").str.strip_chars().alias("attacker_weapon"),
+                    pl.col("victim_active_weapon_name").str.strip_chars().alias("victim_weapon"),
+                )
+                .join(rounds.with_row_index("round_order"), on="round_num")
+                .join(teams.rename({"steamid": "attacker_steamid", "equipment": "attacker_equipment",
+                                    "team_equipment": "attacker_team_equipment"}),
+                      on=["round_num", "attacker_steamid"], how="left")
+                .join(teams.rename({"steamid": "victim_steamid", "equipment": "victim_equipment",
+                                    "team_equipment": "victim_team_equipment"}),
+                      on=["round_num", "victim_steamid"], how="left")
+                .join(totals, on="round_num", how="left")
+                .sort("round_order", "_row")
+                .select(
+                    demo_column,
+                    "round_num",
+                    "tick",
+                    pl.lit(tickrate).alias("tickrate"),
+                    "attacker_steamid", "attacker_name", "attacker_side",
+                    "victim_steamid", "victim_name", "victim_side",
+                    "weapon", "attacker_weapon", "victim_weapon",
+                    weapon_value_expr("attacker_weapon").alias("attacker_weapon_value"),
+                    weapon_value_expr("victim_weapon").alias("victim_weapon_value"),
+                    ((pl.col("attacker_weapon") == "AWP").fill_null(False)
+                     | (pl.col("victim_weapon") == "AWP").fill_null(False)).alias("is_awp_duel"),
+                    is_duel.fill_null(False).alias("is_duel"),
+                    "attacker_equipment", "victim_equipment",
+                    "attacker_team_equipment", "victim_team_equipment", "ct_equipment", "t_equipment",
+                    "winner", "reason", "end", "official_end", "defuse_tick", "detonate_tick",
+                    seconds_until("end", tickrate),
+                    seconds_until("defuse_tick", tickrate),
+                    seconds_until("detonate_tick", tickrate),
+                )
+            )
+
+        round_players, kill_facts = pl.collect_all([round_players, kill_facts], engine=demo.collect_engine())
+        if knife["is_knife"]:
+            print(f"[INFO] Removing knife round {knife['first_round']} from {demo_path.name}")
+
+        partial["round_players"] = round_players
+        partial["demos"] = pl.DataFrame({"demo": [str(demo_path)], "tickrate": [tickrate],
+                                         "knife_round": [knife["is_knife"]]})
+        if missing:
+            print(f"[warn] {demo_path.name} kills missing columns: {missing}")
+        else:
+            partial["kills"] = kill_facts
+
+        return partial
+
+    process_lazy = process  # already polars lazy queries
+
+    def merge(self, partial):
+        for table, frame in partial.items():
+            self.tables[table].append(frame)
+
+    def write_output(self):
+        """Replace the stored rows of this run's demos and keep those of every other demo,
+        so a run over an --event/--map/--tickrate selection does not shrink the store
+        """
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        run_demos = [demo for frame in self.tables["demos"] for demo in frame["demo"]]
+        for table in TABLES:
+            path = self.store_dir / f"{table}.parquet"
+            frames = list(self.tables[table])
+            if path.exists():
+                frames.insert(0, pl.read_parquet(path).filter(~pl.col("demo").is_in(run_demos)))
+            if not frames:
+                print(f"[warn] no {table} to store")
+                continue
+            frame = pl.concat(frames, how="diagonal_relaxed").sort("demo", maintain_order=True)
+            tmp = path.with_name(f"{table}.tmp{os.getpid()}.parquet")
+            frame.write_parquet(tmp)
+            tmp.replace(path)
+            print(f"Stored {len(frame)} {table} rows in {path}")
+
+
+if __name__ == "__main__":
+    args = parse_args(demo_root)
+    run_from_args([KillFactsAnalyzer()], args)
@@ -0,0 +1,128 @@
+"""Recompute the econ_adv, weapon_duel and exit_frag CSVs from the kill facts store.
+
+kill_facts/kill_facts.py stores one row per kill and per player-round of
+every demo. The thresholds of the three analyzers only come in when those
+rows are counted, so another threshold is a few grouped counts over the
+store instead of a reparse of the corpus. The counts go into each
+analyzer's own aggregates and write_output(), so the CSVs and summaries
+have the same layout as a full run.
+
+    python recompute.py --economy-threshold 3000 --equal-threshold 500 --exit-window 3
+"""
+import argparse
+from pathlib import Path
+
+import pandas as pd
+import polars as pl
+
+from common.identity import add_names
+from econ_adv import econ_adv
+from exit_frag import exit_frag
+from kill_facts.kill_facts import load_store, store_dir
+from weapon_duel import weapon_duel
+
+# ===== Configuration =====
+ANALYZERS = ("econ_adv", "weapon_duel", "exit_frag")
+
+
+def knife_rounds(store: dict) -> int:
+    return int(store["demos"]["knife_round"].sum())
+
+
+def economy_events(kills: pl.DataFrame, role: str, stat: str, threshold: int) -> pd.DataFrame:
+    """(steamid, condition, stat) of the kills' attackers or victims that have freeze-end equipment"""
+    kills = kills.drop_nulls([f"{role}_steamid", f"{role}_team_equipment"]).to_pandas()
+    own = kills[f"{role}_team_equipment"]
+    other = kills["ct_equipment"] + kills["t_equipment"] - own
+    return pd.DataFrame({"steamid": kills[f"{role}_steamid"],
+                         "condition": econ_adv.condition_of(own, other, threshold), "stat": stat})
+
+
+def recompute_econ_adv(store: dict, threshold: int, output_csv: str) -> None:
+    analyzer = econ_adv.EconAdvAnalyzer(output_csv=output_csv)
+    analyzer.countknife = knife_rounds(store)
+
+    players = store["round_players"].drop_nulls(["steamid", "equipment"])
+    add_names(analyzer.names, players.select("steamid", "name").iter_rows())
+    players = players.to_pandas()
+    is_ct = players["side"] == "ct"
+    players["condition"] = econ_adv.condition_of(players["ct_equipment"].where(is_ct, players["t_equipment"]),
+                                                 players["t_equipment"].where(is_ct, players["ct_equipment"]),
+                                                 threshold)
+    econ_adv.add_counts(analyzer.player_stats, players.groupby(["steamid", "condition"], sort=False).size(), "rounds")
+
+    kills = store["kills"].drop_nulls(["attacker_name", "victim_name"])
+    events = pd.concat([economy_events(kills, "attacker", "kills", threshold),
+                        economy_events(kills, "victim", "deaths", threshold)])
+    econ_adv.add_counts(analyzer.player_stats, events.groupby(["steamid", "condition", "stat"], sort=False).size())
+    analyzer.write_output()
+
+
+def recompute_weapon_duel(store: dict, threshold: int, output_csv: str) -> None:
+    analyzer = weapon_duel.WeaponDuelAnalyzer(output_csv=output_csv)
+    analyzer.countknife = knife_rounds(store)
+
+    players = store["round_players"].drop_nulls("steamid").unique(["demo", "round_num", "steamid"], maintain_order=True)
+    add_names(analyzer.names, players.select("steamid", "name").iter_rows())
+    weapon_duel.count_rounds(analyzer.player_stats, players["steamid"].to_numpy())
+
+    duels = store["kills"].filter(pl.col("is_duel"))
+    add_names(analyzer.names, duels.select("attacker_steamid", "attacker_name").iter_rows())
+    add_names(analyzer.names, duels.select("victim_steamid", "victim_name").iter_rows())
+    analyzer.unique_attacker_weapons = set(duels["attacker_weapon"].drop_nulls().unique())
+    analyzer.unique_victim_weapons = set(duels["victim_weapon"].drop_nulls().unique())
+    analyzer.unique_kill_weapons = set(duels["weapon"].str.strip_chars().drop_nulls().unique())
+    weapon_duel.count_duels(analyzer.player_stats, duels["attacker_steamid"].to_numpy(),
+                            duels["victim_steamid"].to_numpy(),
+                            (duels["attacker_weapon_value"] - duels["victim_weapon_value"]).to_numpy(),
+                            duels["is_awp_duel"].to_numpy(), threshold)
+    analyzer.write_output()
+
+
+def recompute_exit_frag(store: dict, window_seconds: float, output_csv: str) -> None:
+    analyzer = exit_frag.ExitFragAnalyzer(output_csv=output_csv)
+    analyzer.countknife = knife_rounds(store)
+    player_stats = analyzer.player_stats
+
+    players = store["round_players"].drop_nulls("steamid").unique(["demo", "round_num", "steamid"], maintain_order=True)
+    add_names(analyzer.names, players.select("steamid", "name").iter_rows())
+    player_stats.add(players["steamid"].to_numpy(), "rounds_participated")
+
+    kills = store["kills"].drop_nulls(["attacker_steamid", "attacker_name", "end"]).filter(
+        pl.col("attacker_side").is_in(["t", "ct"])
+    )
+    add_names(analyzer.names, kills.select("attacker_steamid", "attacker_name").iter_rows())
+    kills = kills.to_pandas()
+    kills["is_exit_frag"] = exit_frag.exit_frag_mask(kills, window_seconds * kills["tickrate"])
+    counts = kills.groupby("attacker_steamid", sort=False)["is_exit_frag"].agg(["size", "sum"])
+    player_stats.add(counts.index, "total_kills", counts=counts["size"])
+    player_stats.add(counts.index, "exit_frags", counts=counts["sum"])
+    player_stats.add(counts.index, "meaningful_kills", counts=counts["size"] - counts["sum"])
+    analyzer.write_output()
+
+
+def with_suffix(csv: str, suffix: str) -> str:
+    return f"{Path(csv).stem}_{suffix}{Path(csv).suffix}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--store", type=Path, default=store_dir, help="kill facts store directory")
+    parser.add_argument("--economy-threshold", type=int, default=econ_adv.ECONOMY_THRESHOLD,
+                        help="econ_adv: side totals within ± this are an equal economy")
+    parser.add_argument("--equal-threshold", type=int, default=weapon_duel.EQUAL_THRESHOLD,
+                        help="weapon_duel: held weapon values within ± this are an equal duel")
+    parser.add_argument("--exit-window", type=float, default=exit_frag.EXIT_WINDOW_SECONDS,
+                        help="exit_frag: seconds before the round-deciding event")
+    parser.add_argument("--analyzers", nargs="+", choices=ANALYZERS, default=list(ANALYZERS))
+    args = parser.parse_args()
+
+    store = load_store(args.store)
+    if "econ_adv" in args.analyzers:
+        recompute_econ_adv(store, args.economy_threshold,
+                           with_suffix(econ_adv.output_csv, f"threshold{args.economy_threshold}"))
+    if "weapon_duel" in args.analyzers:
+        recompute_weapon_duel(store, args.equal_threshold,
+                              with_suffix(weapon_duel.output_csv, f"threshold{args.equal_threshold}"))
+    if "exit_frag" in args.analyzers:
+        recompute_exit_frag(store, args.exit_window, with_suffix(exit_frag.output_csv, f"window{args.exit_window:g}s"))
@@ -0,0 +1,29 @@
+from pathlib import Path
+
+from common.driver import parse_args, run_from_args
+from econ_adv.econ_adv import EconAdvAnalyzer
+from economy_perc.economy_perc import EconomyPercAnalyzer
+from exit_frag.exit_frag import ExitFragAnalyzer
+from first_kill.first_kill import FirstKillAnalyzer
+from kill_facts.kill_facts import KillFactsAnalyzer
+from weapon_duel.weapon_duel import WeaponDuelAnalyzer
+
+# ===== Configuration =====
+# Parses every demo once and writes the exit-frag, first-kill, weapon-duel,
+# econ-advantage and economy-percentage CSVs in one pass, and stores the
+# kill facts recompute.py rebuilds the threshold-dependent CSVs from.
+demo_root = Path("/Volumes/TOSHIBA EXT/Demo_2025")  # Change to your root directory
+
+
+if __name__ == "__main__":
+    args = parse_args(demo_root)
+    analyzers = [
+        ExitFragAnalyzer(),
+        FirstKillAnalyzer(demo_root=args.demo_root),
+        WeaponDuelAnalyzer(),
+        EconAdvAnalyzer(),
+        EconomyPercAnalyzer(demo_root=args.demo_root),
+        KillFactsAnalyzer(),
+    ]
+
+    run_from_args(analyzers, args)
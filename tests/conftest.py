@@ -0,0 +1,26 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Keep the state and parse cache of the tests out of the checkout; set before common is imported
+os.environ.setdefault("CS2_STATE_DIR", tempfile.mkdtemp(prefix="cs2_state_"))
+os.environ.setdefault("CS2_PARSE_CACHE", tempfile.mkdtemp(prefix="cs2_cache_"))
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def parser_panic(tmp_path_factory):
+    """The pyo3 PanicException demoparser2 raises on a truncated demo (a BaseException)"""
+    from demoparser2 import DemoParser
+
+    demo = tmp_path_factory.mktemp("panic") / "truncated.dem"
+    demo.write_bytes(b"PBDEMS")
+    try:
+        DemoParser(str(demo)).parse_header()
+    except BaseException as e:
+        assert not isinstance(e, Exception)
+        return e
+    raise AssertionError("demoparser2 parsed a 6-byte demo")
@@ -0,0 +1,93 @@
+"""Small synthetic demos stored the way common.parse_cache caches parsed ones.
+
+make_corpus() writes a few demo files under <root>/<event>/ and their tables
+into the parse cache (CS2_PARSE_CACHE, see tests/conftest.py) for a parse
+profile, so analyzers and the driver, worker processes included, load them
+with load_demo() without awpy parsing anything.
+"""
+import json
+import random
+from pathlib import Path
+
+import polars as pl
+
+from common.parse_cache import DemoTables, cache_path
+
+PLAYERS = [(76561190000000000 + i, name) for i, name in enumerate(
+    ["donk", "sh1ro ", "zont1x", "magixx", "chopper", "ZywOo", "ropz", "flameZ", "apEX", "mezii"])]
+TEAMS = ["Team Spirit", "Vitality"]
+GUNS = ["AK-47", "M4A1-S", "AWP", "Glock-18", "USP-S", "Galil AR", "knife_t"]
+KILL_WEAPONS = ["ak47", "awp", "m4a1", "world", "hegrenade"]
+REASONS = {"ct_killed": "t", "t_killed": "ct", "bomb_exploded": "t", "bomb_defused": "ct", "time_ran_out": "ct"}
+
+
+def make_demo(demo_path: Path, seed: int, n_rounds: int = 8, knife: bool = True, profile=None) -> DemoTables:
+    """Write one demo and its cached tables (the first round is a knife round if knife)"""
+    rng = random.Random(seed)
+    rounds, kills, damages, ticks, bomb = [], [], [], [], []
+    tick = 0
+    for round_num in range(1, n_rounds + 1):
+        freeze_end = tick + 100
+        end = freeze_end + 2000 + rng.randint(0, 500)
+        reason = rng.choice(list(REASONS))
+        rounds.append({"round_num": round_num, "start": tick, "freeze_end": freeze_end, "end": end,
+                       "official_end": end + 300, "winner": REASONS[reason], "reason": reason})
+        if reason == "bomb_exploded":
+            bomb.append({"round_num": round_num, "tick": end - 10, "event": "detonate"})
+        if reason == "bomb_defused":
+            bomb.append({"round_num": round_num, "tick": end - 5, "event": "defuse"})
+
+        sides = {}
+        for i, (steamid, name) in enumerate(PLAYERS):
+            first_half = round_num <= n_rounds // 2
+            sides[steamid] = ("ct" if i < 5 else "t") if first_half else ("t" if i < 5 else "ct")
+            for t in range(freeze_end - 5, freeze_end + 40, 3):
+                equipment = rng.choice([800, 1000, 4000, 5500]) if t < freeze_end + 8 else 700
+                ticks.append({"tick": t, "round_num": round_num, "steamid": steamid, "name": name,
+                              "side": sides[steamid], "team_clan_name": TEAMS[i >= 5],
+                              "current_equip_value": equipment, "inventory": [rng.choice(GUNS)],
+                              "active_weapon_name": rng.choice(GUNS)})
+
+        for k in range(rng.randint(1, 6)):
+            (attacker_id, attacker), (victim_id, victim) = rng.sample(PLAYERS, 2)
+            weapon = "knife" if knife and round_num == 1 else rng.choice(KILL_WEAPONS)
+            world = weapon == "world"
+            kills.append({"round_num": round_num, "tick": freeze_end + 100 + k * 300 if k < 5 else end - 50,
+                          "attacker_steamid": None if world else attacker_id,
+                          "attacker_name": None if world else attacker,
+                          "attacker_side": None if world else sides[attacker_id],
+                          "victim_steamid": victim_id, "victim_name": victim, "victim_side": sides[victim_id],
+                          "weapon": weapon,
+                          "attacker_X": 1.0, "attacker_Y": 2.0, "attacker_Z": 0.0,
+                          "victim_X": 3.0, "victim_Y": 4.0, "victim_Z": 0.0,
+                          "attacker_active_weapon_name": rng.choice(GUNS),
+                          "victim_active_weapon_name": rng.choice(GUNS)})
+            damages.append({"round_num": round_num, "tick": freeze_end + 50, "weapon": weapon})
+        tick = end + 400
+
+    # The cache is keyed on the file's content, so equal arguments share one cache entry
+    demo_path.write_bytes(f"synthetic demo seed={seed} rounds={n_rounds} knife={knife}".encode())
+    cache_dir = cache_path(demo_path, profile)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    ids = {"attacker_steamid": pl.UInt64, "victim_steamid": pl.UInt64}
+    pl.DataFrame(rounds).write_parquet(cache_dir / "rounds.parquet")
+    pl.DataFrame(kills, schema_overrides=ids).write_parquet(cache_dir / "kills.parquet")
+    pl.DataFrame(damages).write_parquet(cache_dir / "damages.parquet")
+    pl.DataFrame(ticks, schema_overrides={"steamid": pl.UInt64}).write_parquet(cache_dir / "ticks.parquet")
+    pl.DataFrame(bomb, schema={"round_num": pl.Int64, "tick": pl.Int64, "event": pl.String}).write_parquet(
+        cache_dir / "bomb.parquet")
+    header = {"map_name": "de_nuke", "tick_rate": 64}
+    (cache_dir / "meta.json").write_text(json.dumps({"source": str(demo_path), "header": header, "errors": {}}))
+    return DemoTables(demo_path, cache_dir, header, {})
+
+
+def make_corpus(root: Path, events=("EventA", "EventA", "EventB"), profile=None) -> dict:
+    """demo_path -> DemoTables of one synthetic demo per entry of events, in path order,
+    cached for the given parse profile
+    """
+    demos = {}
+    for seed, event in enumerate(events):
+        demo_path = root / event / f"demo{seed}.dem"
+        demo_path.parent.mkdir(parents=True, exist_ok=True)
+        demos[demo_path] = make_demo(demo_path, seed, profile=profile)
+    return demos
@@ -0,0 +1,71 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from common.accumulator import Accumulator
+
+CONDITIONS = ("eco", "full")
+METRICS = ("kills", "deaths")
+
+
+def test_add_counts_repeated_keys_and_labels():
+    acc = Accumulator(CONDITIONS, METRICS)
+    acc.add(["donk", "ZywOo", "donk"], "eco", "kills")
+    acc.add(["ZywOo", "ropz"], ["full", "eco"], "deaths", counts=[2, 5])
+    assert acc.keys == ["donk", "ZywOo", "ropz"]
+    assert acc.get("donk", "eco", "kills") == 2
+    assert acc.get("ZywOo", "eco", "kills") == 1
+    assert acc.get("ZywOo", "full", "deaths") == 2
+    assert acc.get("ropz", "eco", "deaths") == 5
+    assert acc.get("apEX", "eco", "kills") == 0
+    assert acc.values.sum() == 10
+
+
+def test_merge_adds_rows_and_appends_new_keys():
+    a, b = Accumulator(METRICS), Accumulator(METRICS)
+    a.add(["donk", "ZywOo"], "kills", counts=[3, 1])
+    b.add(["ropz", "donk"], "deaths", counts=[4, 2])
+    a.merge(b)
+    assert a.keys == ["donk", "ZywOo", "ropz"]
+    assert a.values.tolist() == [[3, 2], [1, 0], [0, 4]]
+    a.merge(Accumulator(METRICS))
+    assert len(a) == 3
+
+    with pytest.raises(ValueError, match="different axes"):
+        a.merge(Accumulator(CONDITIONS))
+
+
+def test_renamed_adds_up_keys_that_collide():
+    acc = Accumulator(METRICS)
+    acc.add([(1, "donk"), (2, "ropz"), (1, "donk ")], "kills", counts=[1, 2, 3])
+    renamed = acc.renamed(lambda key: key[0])
+    assert renamed.keys == [1, 2]
+    assert renamed.values[:, 0].tolist() == [4, 2]
+
+
+def test_frame_with_and_without_an_axis_in_the_rows():
+    acc = Accumulator(CONDITIONS, METRICS)
+    acc.add(["donk", "ZywOo"], "full", ["kills", "deaths"], counts=[3, 1])
+
+    wide = acc.frame(key="player")
+    assert list(wide.columns) == ["player", "eco_kills", "eco_deaths", "full_kills", "full_deaths"]
+    assert wide.to_dict("records")[0] == {"player": "donk", "eco_kills": 0, "eco_deaths": 0,
+                                          "full_kills": 3, "full_deaths": 0}
+
+    long = acc.frame(key="player", axis=0, label="condition")
+    assert list(long.columns) == ["player", "condition", "kills", "deaths"]
+    assert long.values.tolist() == [["donk", "eco", 0, 0], ["donk", "full", 3, 0],
+                                    ["ZywOo", "eco", 0, 0], ["ZywOo", "full", 0, 1]]
+
+
+def test_pickles_as_keys_and_values():
+    acc = Accumulator(CONDITIONS, METRICS)
+    acc.add(["donk", None], "eco", "kills")
+    restored = pickle.loads(pickle.dumps(acc))
+    assert restored.axes == acc.axes and restored.keys == acc.keys
+    assert np.array_equal(restored.values, acc.values)
+
+    restored.add(["ZywOo", None], "full", "deaths")  # keeps working after a restore
+    assert restored.keys == ["donk", None, "ZywOo"]
+    assert restored.get(None, "eco", "kills") == restored.get(None, "full", "deaths") == 1
@@ -0,0 +1,24 @@
+from common import catalog
+from common.catalog import Catalog
+
+
+def test_unreadable_headers_are_cataloged_without_map(tmp_path, monkeypatch, parser_panic):
+    root = tmp_path / "demos"
+    (root / "EventA").mkdir(parents=True)
+    (root / "EventA" / "copying.dem").write_bytes(b"PBDEMS")  # a demo still being copied
+    (root / "EventA" / "corrupt.dem").write_bytes(b"PBDEMS2\x00" + bytes(64))
+
+    real_read_header = catalog.read_header
+
+    def read_header(demo_path):
+        if demo_path.name == "corrupt.dem":
+            raise parser_panic
+        return real_read_header(demo_path)
+
+    monkeypatch.setattr(catalog, "read_header", read_header)
+    demos = Catalog(root, state_dir=tmp_path / "state")
+    stats = demos.refresh()
+
+    assert stats["added"] == 2
+    assert demos.select(event="EventA") == [root / "EventA" / "copying.dem", root / "EventA" / "corrupt.dem"]
+    assert all(entry["map_name"] is None and entry["tickrate"] is None for entry in demos.demos.values())
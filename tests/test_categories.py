@@ -0,0 +1,19 @@
+import polars as pl
+
+from common.categories import DICTIONARIES, to_pandas
+
+
+def test_side_columns_of_one_frame_compare():
+    side = DICTIONARIES["side"]
+    new_value = f"side{len(side.values)}"  # not seen by the shared dictionary yet
+    kills = pl.DataFrame({"attacker_side": ["ct", "ct"], "victim_side": ["ct", new_value]})
+
+    df = to_pandas(kills)
+    assert df["attacker_side"].dtype == df["victim_side"].dtype
+    assert (df["attacker_side"] != df["victim_side"]).tolist() == [False, True]
+
+
+def test_t_only_in_second_side_column():
+    kills = pl.DataFrame({"attacker_side": ["ct"], "victim_side": ["t"]})
+    df = to_pandas(kills)
+    assert (df["attacker_side"] != df["victim_side"]).tolist() == [True]
@@ -0,0 +1,85 @@
+import struct
+
+import pytest
+
+from common.demo_header import (DEM_FILE_INFO, DEM_IS_COMPRESSED, DEMO_MAGIC, _proto_fields, _snappy_decompress,
+                                _varint, read_file_info, read_header, read_tickrate)
+
+
+def varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        out.append(n & 0x7F | (0x80 if n > 0x7F else 0))
+        n >>= 7
+        if not n:
+            return bytes(out)
+
+
+def file_info(playback_time: float, playback_ticks: int, playback_frames: int) -> bytes:
+    """CDemoFileInfo with a game_info submessage after the scalar fields"""
+    return (varint(1 << 3 | 5) + struct.pack("<f", playback_time)
+            + varint(2 << 3 | 0) + varint(playback_ticks)
+            + varint(3 << 3 | 0) + varint(playback_frames)
+            + varint(4 << 3 | 2) + varint(20) + b"a" * 20)
+
+
+def snappy(payload: bytes) -> bytes:
+    """A snappy block for a payload ending in a run of 20 equal bytes: a literal up to the
+    first byte of the run, then one copy of the remaining 19 overlapping its own output
+    """
+    literal = payload[:-19]
+    assert payload[-20:] == payload[-1:] * 20
+    return (varint(len(payload)) + bytes([(len(literal) - 1) << 2]) + literal
+            + bytes([(19 - 1) << 2 | 2]) + (1).to_bytes(2, "little"))
+
+
+def write_demo(path, payload: bytes, cmd: int = DEM_FILE_INFO):
+    body = b"\x00" * 100  # stands in for the demo's frames
+    offset = 16 + len(body)
+    frame = varint(cmd) + varint(128000) + varint(len(payload)) + payload
+    path.write_bytes(DEMO_MAGIC + struct.pack("<ii", offset, 0) + body + frame)
+    return path
+
+
+def test_varint_and_proto_fields():
+    assert _varint(varint(300) + b"\x01", 0) == (300, 2)
+    fields = _proto_fields(file_info(2000.0, 128000, 64000))
+    assert struct.unpack("<f", fields[1])[0] == 2000.0
+    assert (fields[2], fields[3], fields[4]) == (128000, 64000, b"a" * 20)
+
+
+def test_snappy_block_with_an_overlapping_copy():
+    payload = file_info(2000.0, 128000, 64000)
+    assert _snappy_decompress(snappy(payload)) == payload
+    with pytest.raises(ValueError, match="corrupt"):
+        _snappy_decompress(varint(len(payload) + 1) + snappy(payload)[len(varint(len(payload))):])
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_tickrate_from_the_file_info_frame(tmp_path, compressed):
+    payload = file_info(1500.0, 96000, 48000)
+    if compressed:
+        demo = write_demo(tmp_path / "match.dem", snappy(payload), DEM_FILE_INFO | DEM_IS_COMPRESSED)
+    else:
+        demo = write_demo(tmp_path / "match.dem", payload)
+    assert read_file_info(demo) == {"playback_time": 1500.0, "playback_ticks": 96000, "playback_frames": 48000}
+    assert read_tickrate(demo) == 64
+
+
+def test_unreadable_file_info_has_no_tickrate(tmp_path, capsys):
+    wrong_frame = write_demo(tmp_path / "wrong.dem", file_info(1500.0, 96000, 48000), cmd=7)
+    with pytest.raises(ValueError, match="command 7"):
+        read_file_info(wrong_frame)
+    assert read_tickrate(wrong_frame) is None
+
+    recording = tmp_path / "recording.dem"
+    recording.write_bytes(DEMO_MAGIC + struct.pack("<ii", 0, 0))  # offsets are filled in when it ends
+    assert read_tickrate(recording) is None
+    assert "no file info in recording.dem" in capsys.readouterr().out
+
+
+def test_truncated_demo_header_raises_instead_of_panicking(tmp_path):
+    demo = tmp_path / "copying.dem"
+    demo.write_bytes(b"PBDEMS")
+    with pytest.raises(ValueError, match="truncated"):
+        read_header(demo)
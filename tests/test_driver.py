@@ -0,0 +1,107 @@
+import os
+
+import pytest
+
+from common import driver
+from common.checkpoint import Quarantine
+from common.driver import Analyzer, iter_partials, lazy_fallbacks, run_analyzers, union_profile
+from synthetic import make_demo
+
+
+class FakeDemo:
+    memory_limit = None
+
+    def release(self):
+        pass
+
+
+class PandasAnalyzer(Analyzer):
+    name = "pandas_only"
+
+    def process(self, demo_path, demo):
+        return "pandas"
+
+
+class LazyAnalyzer(PandasAnalyzer):
+    name = "lazy"
+
+    def process_lazy(self, demo_path, demo):
+        return "lazy"
+
+
+def test_polars_engine_warns_about_analyzers_without_process_lazy(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(driver, "load_demo", lambda demo_path, profile: FakeDemo())
+    analyzers = [PandasAnalyzer(), LazyAnalyzer()]
+    assert lazy_fallbacks(analyzers) == analyzers[:1]
+
+    results = list(iter_partials(analyzers, [tmp_path / "a.dem"], engine="polars"))
+    assert results == [(tmp_path / "a.dem", ["pandas", "lazy"], None)]
+    output = capsys.readouterr().out
+    assert "pandas_only has no process_lazy()" in output
+    assert "lazy has no" not in output
+
+    list(iter_partials(analyzers, [tmp_path / "a.dem"], engine="pandas"))
+    assert "no process_lazy()" not in capsys.readouterr().out
+
+
+class RecordingAnalyzer(Analyzer):
+    name = "recording"
+    fail_on = None
+
+    def __init__(self):
+        self.demos = []
+
+    def process(self, demo_path, demo):
+        return demo_path.name
+
+    def merge(self, partial):
+        if partial == self.fail_on:
+            raise RuntimeError(f"merge failed on {partial}")
+        self.demos.append(partial)
+
+    def write_output(self):
+        pass
+
+
+class AbortingAnalyzer(RecordingAnalyzer):
+    fail_on = "c.dem"
+
+
+class CrashingAnalyzer(RecordingAnalyzer):
+    def process(self, demo_path, demo):
+        if demo_path.name == "b.dem":
+            os._exit(1)
+        return demo_path.name
+
+
+@pytest.fixture
+def demo_files(tmp_path):
+    """a.dem and c.dem are cached synthetic demos; b.dem is 6 bytes, so parsing it panics"""
+    profile = union_profile([RecordingAnalyzer()])
+    demo_files = [tmp_path / name for name in ("a.dem", "b.dem", "c.dem")]
+    make_demo(demo_files[0], seed=1, profile=profile)
+    demo_files[1].write_bytes(b"PBDEMS")
+    make_demo(demo_files[2], seed=2, profile=profile)
+    return demo_files
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_panicking_demo_is_quarantined_and_the_run_resumes(tmp_path, demo_files, workers):
+    state_dir = tmp_path / "state"
+    with pytest.raises(RuntimeError):
+        run_analyzers([AbortingAnalyzer()], demo_files, workers=workers, state_dir=state_dir)
+    assert Quarantine(state_dir).is_bad(demo_files[1])
+    assert "PanicException" in Quarantine(state_dir).entries[str(demo_files[1])]["error"]
+
+    resumed = RecordingAnalyzer()
+    run_analyzers([resumed], demo_files, workers=workers, resume=True, state_dir=state_dir)
+    assert resumed.demos == ["a.dem", "c.dem"]
+
+
+def test_demo_that_kills_its_worker_is_quarantined(tmp_path, demo_files):
+    make_demo(demo_files[1], seed=3, profile=union_profile([CrashingAnalyzer()]))
+    state_dir = tmp_path / "state"
+    analyzer = CrashingAnalyzer()
+    run_analyzers([analyzer], demo_files, workers=2, state_dir=state_dir)
+    assert analyzer.demos == ["a.dem", "c.dem"]
+    assert "worker process died" in Quarantine(state_dir).entries[str(demo_files[1])]["error"]
@@ -0,0 +1,55 @@
+"""The pandas and polars engines write the same CSVs, however the demos are run."""
+import pytest
+
+from common.driver import run_analyzers, run_incremental, union_profile
+from econ_adv.econ_adv import EconAdvAnalyzer
+from economy_perc.economy_perc import EconomyPercAnalyzer
+from exit_frag.exit_frag import ExitFragAnalyzer
+from first_kill.first_kill import FirstKillAnalyzer
+from synthetic import make_corpus
+from weapon_duel.weapon_duel import WeaponDuelAnalyzer
+
+ANALYZERS = {
+    "exit_frag": lambda demo_root, csv: ExitFragAnalyzer(output_csv=csv),
+    "first_kill": lambda demo_root, csv: FirstKillAnalyzer(demo_root=demo_root, output_csv=csv),
+    "weapon_duel": lambda demo_root, csv: WeaponDuelAnalyzer(output_csv=csv),
+    "econ_adv": lambda demo_root, csv: EconAdvAnalyzer(output_csv=csv),
+    "economy_perc": lambda demo_root, csv: EconomyPercAnalyzer(demo_root=demo_root, output_csv=csv),
+}
+
+
+@pytest.fixture(scope="module")
+def corpus(tmp_path_factory):
+    demo_root = tmp_path_factory.mktemp("demos")
+    profile = union_profile([make(demo_root, "unused.csv") for make in ANALYZERS.values()])
+    return demo_root, list(make_corpus(demo_root, profile=profile))
+
+
+def run_csvs(out_dir, corpus, engine="pandas", mode="serial") -> dict:
+    """name -> CSV text of every analyzer after one run over the corpus"""
+    demo_root, demos = corpus
+    out_dir.mkdir()
+    analyzers = [make(demo_root, str(out_dir / f"{name}.csv")) for name, make in ANALYZERS.items()]
+    options = {
+        "serial": {},
+        "chunked": {"memory_limit_mb": 8 / 1024},  # 8 KB: the ticks are read one round at a time
+        "workers": {"workers": 2},
+    }
+    if mode == "incremental":
+        run_incremental(analyzers, demo_root, demos, engine=engine, state_dir=out_dir / "state")
+    else:
+        run_analyzers(analyzers, demos, engine=engine, state_dir=out_dir / "state", **options[mode])
+    return {name: (out_dir / f"{name}.csv").read_text() for name in ANALYZERS}
+
+
+@pytest.fixture(scope="module")
+def expected(tmp_path_factory, corpus):
+    csvs = run_csvs(tmp_path_factory.mktemp("expected") / "pandas_serial", corpus)
+    assert all(len(csv.splitlines()) > 1 for csv in csvs.values())
+    return csvs
+
+
+@pytest.mark.parametrize("engine", ["pandas", "polars"])
+@pytest.mark.parametrize("mode", ["serial", "chunked", "workers", "incremental"])
+def test_engines_and_run_modes_write_the_same_csvs(tmp_path, corpus, expected, engine, mode):
+    assert run_csvs(tmp_path / "run", corpus, engine, mode) == expected
@@ -0,0 +1,89 @@
+import pytest
+
+from common import driver
+from common.driver import Analyzer, run_incremental
+from common.manifest import Manifest
+
+
+class FakeDemo:
+    memory_limit = None
+
+    def release(self):
+        pass
+
+
+class CountingAnalyzer(Analyzer):
+    name = "counting"
+
+    def __init__(self, version):
+        self.version = version
+        self.demos = []
+
+    def process(self, demo_path, demo):
+        return {"demo": demo_path.name, "version": self.version}
+
+    def merge(self, partial):
+        self.demos.append((partial["demo"], partial["version"]))
+
+    def write_output(self):
+        pass
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    demo_root = tmp_path / "demos"
+    demo_root.mkdir()
+    demo = demo_root / "a.dem"
+    demo.write_bytes(b"demo")
+    return demo_root, [demo], tmp_path / "state"
+
+
+def failing_load(demo_path, profile):
+    raise RuntimeError("corrupt demo")
+
+
+def test_stale_partial_is_not_merged_when_reprocessing_fails(corpus, monkeypatch):
+    demo_root, demo_files, state_dir = corpus
+    monkeypatch.setattr(driver, "load_demo", lambda demo_path, profile: FakeDemo())
+    first = CountingAnalyzer(version=1)
+    run_incremental([first], demo_root, demo_files, state_dir=state_dir)
+    assert first.demos == [("a.dem", 1)]
+
+    monkeypatch.setattr(driver, "load_demo", failing_load)
+    bumped = CountingAnalyzer(version=2)
+    run_incremental([bumped], demo_root, demo_files, state_dir=state_dir)
+    assert bumped.demos == []
+    assert Manifest(state_dir).entries[str(demo_files[0])]["partials"] == {"counting": 1}
+
+
+def test_partial_of_an_analyzer_never_stored_is_skipped(corpus, monkeypatch):
+    demo_root, demo_files, state_dir = corpus
+    monkeypatch.setattr(driver, "load_demo", lambda demo_path, profile: FakeDemo())
+    run_incremental([CountingAnalyzer(version=1)], demo_root, demo_files, state_dir=state_dir)
+
+    class OtherAnalyzer(CountingAnalyzer):
+        name = "other"
+
+    monkeypatch.setattr(driver, "load_demo", failing_load)
+    counting, other = CountingAnalyzer(version=1), OtherAnalyzer(version=1)
+    run_incremental([counting, other], demo_root, demo_files, state_dir=state_dir)
+    assert counting.demos == [("a.dem", 1)]
+    assert other.demos == []
+
+
+def test_missing_partial_file_is_reprocessed_or_skipped(corpus, monkeypatch):
+    demo_root, demo_files, state_dir = corpus
+    monkeypatch.setattr(driver, "load_demo", lambda demo_path, profile: FakeDemo())
+    run_incremental([CountingAnalyzer(version=1)], demo_root, demo_files, state_dir=state_dir)
+    partial_file = Manifest(state_dir).partial_dir(demo_files[0]) / "counting.pkl"
+    partial_file.unlink()
+
+    analyzer = CountingAnalyzer(version=1)
+    run_incremental([analyzer], demo_root, demo_files, state_dir=state_dir)
+    assert analyzer.demos == [("a.dem", 1)]
+
+    partial_file.unlink()
+    monkeypatch.setattr(driver, "load_demo", failing_load)
+    analyzer = CountingAnalyzer(version=1)
+    run_incremental([analyzer], demo_root, demo_files, state_dir=state_dir)
+    assert analyzer.demos == []
@@ -0,0 +1,24 @@
+import polars as pl
+
+from kill_facts.kill_facts import TABLES, KillFactsAnalyzer, load_store
+from synthetic import make_corpus
+
+
+def store_run(store_dir, demos) -> dict:
+    analyzer = KillFactsAnalyzer(store_dir=store_dir)
+    for demo_path, demo in demos.items():
+        analyzer.merge(analyzer.process(demo_path, demo))
+    analyzer.write_output()
+    return load_store(store_dir)
+
+
+def test_selection_run_only_replaces_its_own_demos(tmp_path):
+    demos = make_corpus(tmp_path / "demos")
+    store_dir = tmp_path / "store"
+    full = store_run(store_dir, demos)
+    assert full["demos"]["demo"].to_list() == [str(p) for p in demos]
+
+    event_a = {demo_path: demo for demo_path, demo in demos.items() if demo_path.parent.name == "EventA"}
+    selection = store_run(store_dir, event_a)
+    for table in TABLES:
+        assert selection[table].sort(pl.all()).equals(full[table].sort(pl.all())), table
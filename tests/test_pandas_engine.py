@@ -0,0 +1,22 @@
+import pandas as pd
+
+from common.pandas_engine import first_kills
+
+
+def test_first_kills_keep_missing_sides_null():
+    kills = pd.DataFrame({
+        "round_num": [1, 1, 2],
+        "tick": [20, 10, 30],
+        "attacker_name": ["a", "b", "a"],
+        "victim_name": ["b", "a", "b"],
+        "attacker_side": pd.Categorical(["ct", None, "T"]),
+        "victim_side": pd.Categorical(["t", "ct", None]),
+        "weapon": ["ak47", "AWP", "m4a1"],
+    })
+
+    first = first_kills(kills)
+    assert first["attacker_side"].isna().tolist() == [True, False]
+    assert first["victim_side"].tolist()[0] == "ct"
+    assert first["victim_side"].isna().tolist() == [False, True]
+    assert first.loc[2, "attacker_side"] == "t"
+    assert first["weapon"].tolist() == ["awp", "m4a1"]
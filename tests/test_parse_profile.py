@@ -0,0 +1,46 @@
+import polars as pl
+import pytest
+
+from common.parse_profile import ParseProfile, window_ticks
+
+
+def test_union_covers_every_profile():
+    kills = ParseProfile(tables=("kills",), player_props=("team_clan_name",))
+    econ = ParseProfile(tables=("ticks",), player_props=("current_equip_value", "team_clan_name"),
+                        tick_windows=[("freeze_end", 0, 16)])
+    exits = ParseProfile(tables=("ticks",), tick_windows=[("end", -64, 0), ("freeze_end", 0, 16)])
+
+    union = ParseProfile.union([kills, econ, exits])
+    assert union.tables == ("rounds", "kills", "ticks")
+    assert union.player_props == ("team_clan_name", "current_equip_value")
+    assert union.tick_windows == (("end", -64, 0), ("freeze_end", 0, 16))
+
+
+def test_union_needs_every_tick_if_one_profile_does():
+    windowed = ParseProfile(tables=("ticks",), tick_windows=[("freeze_end", 0, 16)])
+    full = ParseProfile(tables=("ticks",))
+    assert ParseProfile.union([windowed, full]).tick_windows is None
+    # Windows of profiles that do not read ticks do not count
+    kills = ParseProfile(tables=("kills",), tick_windows=[("end", 0, 1)])
+    assert ParseProfile.union([windowed, kills]).tick_windows == (("freeze_end", 0, 16),)
+    assert ParseProfile.union([kills]).tick_windows is None
+
+
+def test_equal_profiles_share_a_key():
+    a = ParseProfile(tables=("ticks", "kills"), player_props=("b", "a", "b"), tick_windows=[("end", 0, 1)] * 2)
+    b = ParseProfile(tables=("kills", "ticks"), player_props=("a", "b"), tick_windows=[("end", 0, 1)])
+    assert a == b and a.key() == b.key()
+    assert ParseProfile.union([a]) == a
+    assert a.key() != ParseProfile(tables=("kills", "ticks")).key()
+
+
+def test_unknown_tables_are_rejected():
+    with pytest.raises(ValueError, match="grenades"):
+        ParseProfile(tables=("kills", "grenades"))
+
+
+def test_window_ticks_merges_overlapping_windows():
+    rounds = pl.DataFrame({"freeze_end": [100, 103, None], "end": [110, None, 200]})
+    ticks = window_ticks(rounds, [("freeze_end", 0, 4), ("end", -1, 0)])
+    assert ticks == [100, 101, 102, 103, 104, 105, 106, 107, 109, 110, 199, 200]
+    assert window_ticks(rounds.clear(), [("freeze_end", 0, 4)]) == []
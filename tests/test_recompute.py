@@ -0,0 +1,45 @@
+"""recompute.py writes the same CSVs from the kill facts store as the analyzers' own run."""
+import pandas as pd
+import pytest
+
+import recompute
+from common.driver import run_analyzers, union_profile
+from econ_adv.econ_adv import ECONOMY_THRESHOLD, EconAdvAnalyzer
+from exit_frag.exit_frag import EXIT_WINDOW_SECONDS, ExitFragAnalyzer
+from kill_facts.kill_facts import KillFactsAnalyzer, load_store
+from synthetic import make_corpus
+from weapon_duel.weapon_duel import EQUAL_THRESHOLD, WeaponDuelAnalyzer
+
+RECOMPUTE = {
+    "econ_adv": (EconAdvAnalyzer, recompute.recompute_econ_adv, ECONOMY_THRESHOLD),
+    "weapon_duel": (WeaponDuelAnalyzer, recompute.recompute_weapon_duel, EQUAL_THRESHOLD),
+    "exit_frag": (ExitFragAnalyzer, recompute.recompute_exit_frag, EXIT_WINDOW_SECONDS),
+}
+
+
+@pytest.fixture(scope="module")
+def full_run(tmp_path_factory):
+    """CSV path of each analyzer and the store, after one run over the corpus"""
+    out_dir = tmp_path_factory.mktemp("full_run")
+    analyzers = [make(output_csv=str(out_dir / f"{name}.csv")) for name, (make, _, _) in RECOMPUTE.items()]
+    analyzers.append(KillFactsAnalyzer(store_dir=out_dir / "store"))
+    demos = list(make_corpus(out_dir / "demos", profile=union_profile(analyzers)))
+    run_analyzers(analyzers, demos, state_dir=out_dir / "state")
+    return out_dir, load_store(out_dir / "store")
+
+
+def sorted_csv(path) -> pd.DataFrame:
+    """Rows in key order: players with tied values may come out in another order"""
+    df = pd.read_csv(path)
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("name", RECOMPUTE)
+def test_recompute_matches_the_analyzer(tmp_path, full_run, name):
+    out_dir, store = full_run
+    _, recompute_csv, threshold = RECOMPUTE[name]
+    recompute_csv(store, threshold, str(tmp_path / f"{name}.csv"))
+
+    expected = sorted_csv(out_dir / f"{name}.csv")
+    assert len(expected) > 1
+    pd.testing.assert_frame_equal(sorted_csv(tmp_path / f"{name}.csv"), expected, check_dtype=False)
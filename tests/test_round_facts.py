@@ -0,0 +1,61 @@
+import polars as pl
+
+from common.parse_cache import DemoTables
+from common.round_facts import played_rounds, round_facts
+
+
+def demo_tables(tmp_path, bomb=True) -> DemoTables:
+    """Three rounds (the first a knife round) and a row without a round"""
+    pl.DataFrame({
+        "round_num": [1, 2, 3, None],
+        "start": [0, 1000, 2000, 3000],
+        "freeze_end": [100, 1100, 2100, None],
+        "end": [900, 1900, 2900, None],
+        "official_end": [950, None, 2950, None],
+        "winner": ["CT", "T", None, None],
+        "reason": ["T_Killed", "Bomb_Exploded", None, None],
+    }).write_parquet(tmp_path / "rounds.parquet")
+    pl.DataFrame({"round_num": [1, 1, 2], "weapon": ["knife", "knife_t", "ak47"]}).write_parquet(
+        tmp_path / "damages.parquet")
+    errors = {}
+    if bomb:
+        pl.DataFrame({
+            "round_num": [2, 2, 3, 3, None],
+            "tick": [1800, 1890, 2500, 2600, 10],
+            "event": ["plant", "detonate", "defuse", "defuse", "detonate"],
+        }).write_parquet(tmp_path / "bomb.parquet")
+    else:
+        errors["bomb"] = "not in the parse profile"
+    return DemoTables(tmp_path / "match.dem", tmp_path, {}, errors)
+
+
+def test_round_facts_columns(tmp_path):
+    facts = round_facts(demo_tables(tmp_path))
+    assert facts.schema == {
+        "round_num": pl.Int64, "winner": pl.String, "reason": pl.String,
+        "start": pl.Int64, "freeze_end": pl.Int64, "end": pl.Int64, "official_end": pl.Int64,
+        "is_knife": pl.Boolean, "defuse_tick": pl.Int64, "detonate_tick": pl.Int64,
+    }
+    assert facts.to_dicts() == [
+        {"round_num": 1, "winner": "ct", "reason": "t_killed", "start": 0, "freeze_end": 100, "end": 900,
+         "official_end": 950, "is_knife": True, "defuse_tick": None, "detonate_tick": None},
+        {"round_num": 2, "winner": "t", "reason": "bomb_exploded", "start": 1000, "freeze_end": 1100, "end": 1900,
+         "official_end": 1900, "is_knife": False, "defuse_tick": None, "detonate_tick": 1890},
+        {"round_num": 3, "winner": None, "reason": None, "start": 2000, "freeze_end": 2100, "end": 2900,
+         "official_end": 2950, "is_knife": False, "defuse_tick": 2600, "detonate_tick": None},
+    ]
+    assert played_rounds(demo_tables(tmp_path))["round_num"].to_list() == [2, 3]
+
+
+def test_bomb_ticks_are_null_without_the_bomb_table(tmp_path):
+    facts = round_facts(demo_tables(tmp_path, bomb=False))
+    assert facts["detonate_tick"].null_count() == facts["defuse_tick"].null_count() == 3
+
+
+def test_facts_are_read_back_from_the_cache(tmp_path):
+    demo = demo_tables(tmp_path)
+    facts = round_facts(demo)
+    assert (tmp_path / "round_facts.parquet").exists()
+
+    (tmp_path / "rounds.parquet").unlink()  # a rebuild would fail now
+    assert round_facts(demo).equals(facts)
@@ -0,0 +1,40 @@
+import polars as pl
+import pytest
+
+from common.round_index import RoundIndex
+from synthetic import make_demo
+
+
+def unsorted_kills() -> pl.DataFrame:
+    return pl.DataFrame({"round_num": [2, 1, None, 2, 3, 1], "tick": [20, 10, 0, 21, 30, 11]})
+
+
+@pytest.mark.parametrize("to_frame", [lambda df: df, lambda df: df.to_pandas()], ids=["polars", "pandas"])
+def test_rows_of_each_round_in_table_order(to_frame):
+    index = RoundIndex(to_frame(unsorted_kills()))
+    ticks = {round_num: list(index.rows(round_num)["tick"]) for round_num in (1, 2, 3, 4)}
+    assert ticks == {1: [10, 11], 2: [20, 21], 3: [30], 4: []}
+    assert len(index.frame) == 5  # the row without a round is left out
+    assert index.bounds(0) == index.bounds(1)[:1] * 2
+
+
+def test_tables_in_round_order_are_not_copied():
+    kills = unsorted_kills().drop_nulls().sort("round_num", maintain_order=True)
+    assert RoundIndex(kills).frame is kills
+
+
+def test_round_frame_slices_and_chunks_agree(tmp_path):
+    demo = make_demo(tmp_path / "match.dem", seed=1)
+    ticks = demo.ticks
+    for round_num in demo.rounds["round_num"]:
+        expected = ticks.filter(pl.col("round_num") == round_num)
+        assert demo.round_frame("ticks", round_num).equals(expected)
+    assert demo.round_index("ticks") is demo.round_index("ticks")
+
+    chunked = make_demo(tmp_path / "chunked.dem", seed=1)
+    chunked.memory_limit = 8 * 1024  # below the size of the ticks: read one round at a time
+    assert not chunked.fits("ticks")
+    rounds = demo.rounds["round_num"].to_list()
+    for (_, rows), (_, chunk) in zip(demo.round_chunks("ticks", rounds, ["tick", "steamid"]),
+                                     chunked.round_chunks("ticks", rounds, ["tick", "steamid"])):
+        assert rows.equals(chunk)
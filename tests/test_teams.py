@@ -0,0 +1,67 @@
+import json
+
+import polars as pl
+from awpy.parsers.utils import fix_common_names
+
+from common.teams import TeamTable, demo_team_counts, load_player_teams, player_teams
+from first_kill.first_kill import FirstKillAnalyzer
+
+
+def parsed_ticks() -> pl.LazyFrame:
+    """Ticks as parse_demo() stores them: demoparser2 props through awpy's fix_common_names()"""
+    raw = pl.DataFrame({
+        "tick": [1, 1, 2, 2, 3, 3],
+        "round_num": [1, 1, 1, 1, 2, 2],
+        "steamid": [11, 22, 11, 22, 11, 22],
+        "name": ["donk", "ZywOo", "donk", "ZywOo", "donk", "ZywOo"],
+        "team_name": ["CT", "TERRORIST", "CT", "TERRORIST", "TERRORIST", "CT"],
+        "team_clan_name": ["Team Spirit", "Vitality", "Team Spirit", "Vitality", "Team Spirit", "Vitality"],
+    })
+    return fix_common_names(raw).lazy()
+
+
+def test_profile_parses_the_team_prop():
+    assert "team_clan_name" in FirstKillAnalyzer.profile.player_props
+
+
+def test_team_counts_fill_the_team_table(tmp_path):
+    ticks = parsed_ticks()
+    assert "team_name" not in ticks.collect_schema().names()  # awpy renamed it to side
+
+    counts = demo_team_counts(ticks, [1, 2])
+    assert counts == {"donk": {"Team Spirit": 3}, "ZywOo": {"Vitality": 3}}
+
+    table = TeamTable(tmp_path)
+    table.update({"Major": {"a.dem": counts}})
+    table.save()
+    stored = json.loads((tmp_path / "teams.json").read_text())
+    assert stored == {"Major": {"a.dem": {"donk": {"Team Spirit": 3}, "ZywOo": {"Vitality": 3}}}}
+    assert load_player_teams(state_dir=tmp_path) == {"donk": "Team Spirit", "ZywOo": "Vitality"}
+
+
+def test_ticks_without_the_team_prop_add_nothing():
+    ticks = parsed_ticks().drop("team_clan_name")
+    assert demo_team_counts(ticks) == {}
+
+
+def test_overrides_win_over_stored_teams(tmp_path):
+    table = TeamTable(tmp_path)
+    table.update({"Major": {"a.dem": demo_team_counts(parsed_ticks())}})
+    table.save()
+    assert player_teams({"donk": "Spirit"}, state_dir=tmp_path) == {"donk": "Spirit", "ZywOo": "Vitality"}
+
+
+def test_a_selection_only_replaces_its_own_demos(tmp_path):
+    table = TeamTable(tmp_path)
+    table.update({"Major": {"nuke.dem": {"donk": {"Team Spirit": 5}},
+                            "inferno.dem": {"donk": {"Team Spirit": 4}}}})
+    table.save()
+
+    # A --map de_inferno run merges the inferno demo only, where donk stood in for another team
+    table = TeamTable(tmp_path)
+    table.update({"Major": {"inferno.dem": {"donk": {"Mix": 6}}}})
+    table.save()
+    assert TeamTable(tmp_path).events["Major"]["nuke.dem"] == {"donk": {"Team Spirit": 5}}
+    assert load_player_teams("Major", tmp_path) == {"donk": "Mix"}
+    table.update({"Major": {"nuke.dem": {"donk": {"Team Spirit": 5}}, "ancient.dem": {"donk": {"Team Spirit": 2}}}})
+    assert table.teams("Major") == {"donk": "Team Spirit"}
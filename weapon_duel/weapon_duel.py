@@ -1,8 +1,19 @@
-from awpy import Demo
 from pathlib import Path
+import sys
 import pandas as pd
 import numpy as np
-from collections import defaultdict
+import polars as pl
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.accumulator import Accumulator
+from common.categories import to_pandas
+from common.driver import Analyzer, parse_args, run_from_args
+from common.identity import add_names, merge_names, resolve_names, with_ids
+from common.knife import VALID_GUNS, drop_knife_round, knife_round
+from common.lazy_engine import round_participants
+from common.pandas_engine import map_distinct
+from common.parse_profile import ParseProfile
+from common.round_facts import round_facts
 
 # ===== Configuration =====
 #demo_root = Path("/Volumes/TOSHIBA EXT/Demo_2025")  # Change to your root directory
@@ -31,48 +42,9 @@ weapon_prices = {
     "Zeus x27": 200
 }
 
-# ===== Valid weapons for knife round detection =====
-valid_guns = {
-    "hkp2000", "elite", "glock", "p250", "fiveseven", "tec9", "cz75a", "deagle", "revolver", "usp_silencer", "usp_silencer_off",
-    "mac10", "mp9", "mp7", "mp5sd", "ump45", "p90", "bizon",
-    "galilar", "famas", "ak47", "m4a1", "m4a1_silencer", "sg556", "aug",
-    "ssg08", "awp", "g3sg1", "scar20",
-    "nova", "xm1014", "mag7", "sawedoff",
-    "negev", "m249", "taser"
-}
-
-# ===== Name normalization =====
-alias_map = {
-    "sh1ro": {"SH1R0", "sh1r0"},
-    "910": {"910-", "-910"},
-    "mzinho": {"Mzinho"},
-    "Techno": {"Techno4K"},
-    "Ag1l": {"ag1l", "ag1L"},
-    "dav1deuS": {"dav1deu$", "davideuS"},
-    "device": {"dev1ce"},
-    "electroNic": {"electronic"},
-    "HeavyGod": {"HeavyGoD"},
-    "hfah": {"Hfah"},
-    "huNter-": {"huNter"},
-    "hypex": {"Hypex"},
-    "jcobbb": {"Jcobbb"},
-    "kauez": {"Kauez"},
-    "lux": {"Lux"},
-    "NAF": {"NAF-FLY"},
-    "NertZ": {"nertZ"},
-    "skullz": {"Skullz"},
-    "Snax": {"snax"},
-    "woxic": {"Woxic"},
-}
-
-def norm_name(name: str) -> str:
-    if not isinstance(name, str):
-        return name
-    s = name.strip()
-    for canon, vars_ in alias_map.items():
-        if s == canon or s in vars_:
-            return canon
-    return s
+# Knife and grenades = $0
+knife_grenade_keywords = ["knife", "grenade", "molotov", "incendiary", "flashbang",
+                          "smoke", "decoy", "c4", "karambit", "shadow", "dagger", "bayonet"]
 
 def get_weapon_value(weapon_name):
     """Get weapon value from price dict, return 0 for knife/grenades/unknown"""
@@ -82,261 +54,352 @@ def get_weapon_value(weapon_name):
     weapon_name = weapon_name.strip()
     
     # Knife and grenades = $0
-    knife_grenade_keywords = ["knife", "grenade", "molotov", "incendiary", "flashbang", 
-                              "smoke", "decoy", "c4", "karambit", "shadow", "dagger", "bayonet"]
     if any(kw in weapon_name.lower() for kw in knife_grenade_keywords):
         return 0
     
     # Look up in price dictionary
     return weapon_prices.get(weapon_name, 0)
 
-# ===== Find demo files =====
-demo_files = [f for f in sorted(demo_root.rglob("*.dem")) if not f.name.startswith("._")]
-print(f"Found {len(demo_files)} demos under {demo_root}")
+def weapon_value_expr(column):
+    """get_weapon_value() for the polars engine"""
+    weapon = pl.col(column).str.strip_chars()
+    return (
+        pl.when(weapon.str.to_lowercase().str.contains("|".join(knife_grenade_keywords)))
+        .then(0)
+        .otherwise(weapon.replace_strict(weapon_prices, default=0, return_dtype=pl.Int64))
+        .fill_null(0)
+    )
+
+def is_awp(weapon_name):
+    return str(weapon_name).strip() == "AWP"
 
-# ===== Global aggregators =====
-# player -> awp_filter -> category -> count
+def count_duels(player_stats, attackers, victims, value_diff, is_awp_duel, threshold=EQUAL_THRESHOLD):
+    """Add duels (arrays over kills) into player_stats with one grouped count.
+
+    The attacker gets a kill and the victim a death in the economy category of
+    value_diff (attacker minus victim weapon value, equal within ±threshold),
+    under include_awp always and under exclude_awp when no AWP was involved.
+    """
+    higher = value_diff > threshold
+    lower = value_diff < -threshold
+    kill_category = np.select([higher, lower], ["higher_econ_kills", "lower_econ_kills"], "equal_econ_kills")
+    death_category = np.select([higher, lower], ["lower_econ_deaths", "higher_econ_deaths"], "equal_econ_deaths")
+    no_awp = ~is_awp_duel
+    duels = pd.DataFrame({
+        "player": np.concatenate([attackers, victims, attackers[no_awp], victims[no_awp]]),
+        "awp_filter": np.repeat(["include_awp", "include_awp", "exclude_awp", "exclude_awp"],
+                                [len(attackers), len(victims), no_awp.sum(), no_awp.sum()]),
+        "category": np.concatenate([kill_category, death_category, kill_category[no_awp], death_category[no_awp]]),
+    })
+    counts = duels.groupby(["player", "awp_filter", "category"], sort=False).size()
+    players, awp_filters, categories = (counts.index.get_level_values(level) for level in range(3))
+    totals = np.where(categories.str.endswith("_kills"), "total_kills", "total_deaths")
+    player_stats.add(players, awp_filters, categories, counts=counts.to_numpy())
+    player_stats.add(players, awp_filters, totals, counts=counts.to_numpy())
+
+def count_rounds(player_stats, steamids):
+    """One round participated for each steamid, under both AWP filters"""
+    for awp_filter in AWP_FILTERS:
+        player_stats.add(steamids, awp_filter, "rounds_participated")
+
+# ===== Aggregators =====
+# steamid x awp_filter x metric counts
 # awp_filter: "include_awp" or "exclude_awp"
-# categories: kills/deaths by economy condition
-player_stats = defaultdict(lambda: {
-    "include_awp": {
-        "higher_econ_kills": 0,
-        "equal_econ_kills": 0,
-        "lower_econ_kills": 0,
-        "higher_econ_deaths": 0,
-        "equal_econ_deaths": 0,
-        "lower_econ_deaths": 0,
-        "total_kills": 0,
-        "total_deaths": 0
-    },
-    "exclude_awp": {
-        "higher_econ_kills": 0,
-        "equal_econ_kills": 0,
-        "lower_econ_kills": 0,
-        "higher_econ_deaths": 0,
-        "equal_econ_deaths": 0,
-        "lower_econ_deaths": 0,
-        "total_kills": 0,
-        "total_deaths": 0
-    },
-    "rounds_participated": 0
-})
-
-# Track all unique weapons seen
-unique_attacker_weapons = set()
-unique_victim_weapons = set()
-unique_kill_weapons = set()  # Track weapons from 'weapon' column
-
-countknife = 0
-
-for demo_path in demo_files:
-    print(f"\nParsing {demo_path.name}")
-    try:
-        demo = Demo(str(demo_path), verbose=False)
-        demo.parse(player_props=["name", "side", 
-                                 "active_weapon_name","inventory", "team_rounds_total", "steamid"])
-        
-        rounds_df = demo.rounds.to_pandas()
-        ticks_df = demo.ticks.to_pandas()
-        kills_df = demo.kills.to_pandas()
-        damages_df = demo.damages.to_pandas()
-    except Exception as e:
-        print(f"[warn] failed on {demo_path.name}: {e}")
-        continue
-
-    if rounds_df is None or rounds_df.empty:
-        print(f"[warn] {demo_path.name} has empty rounds data")
-        continue
-
-    # ===== Remove knife/warmup round =====
-    if not rounds_df.empty and damages_df is not None and not damages_df.empty:
-        first_round = int(rounds_df["round_num"].min())
-        first_round_damages = damages_df[damages_df["round_num"] == first_round]
-        
-        if not first_round_damages.empty and "weapon" in first_round_damages.columns:
-            used_weapons = set(first_round_damages["weapon"].dropna().astype(str).str.lower().unique())
-            
-            if used_weapons.isdisjoint(valid_guns):
-                print(f"[INFO] Removing knife round {first_round} from {demo_path.name}")
-                countknife += 1
-                rounds_df = rounds_df[rounds_df["round_num"] != first_round]
-                if ticks_df is not None and not ticks_df.empty:
-                    ticks_df = ticks_df[ticks_df["round_num"] != first_round]
-                if kills_df is not None and not kills_df.empty:
-                    kills_df = kills_df[kills_df["round_num"] != first_round]
-
-    # ===== Track round participation from ticks =====
-    if ticks_df is not None and not ticks_df.empty and "name" in ticks_df.columns and "round_num" in ticks_df.columns:
-        ticks_df_clean = ticks_df.dropna(subset=["name", "round_num"]).copy()
-        ticks_df_clean["name"] = ticks_df_clean["name"].apply(lambda x: norm_name(str(x)))
-        
-        # For each round, find unique players
-        for round_num in rounds_df["round_num"].unique():
-            round_ticks = ticks_df_clean[ticks_df_clean["round_num"] == round_num]
-            if not round_ticks.empty:
-                players_in_round = round_ticks["name"].unique()
-                for player in players_in_round:
-                    player_stats[player]["rounds_participated"] += 1
-
-    # ===== Process kills =====
-    if kills_df is None or kills_df.empty:
-        print(f"[info] {demo_path.name} has no kills data")
-        continue
-    
-    # Check for required columns
-    required_cols = ["attacker_name", "attacker_side", "victim_name", "victim_side", 
-                     "weapon","attacker_active_weapon_name", "victim_active_weapon_name"]
-    missing = [c for c in required_cols if c not in kills_df.columns]
-    
-    if missing:
-        print(f"[warn] {demo_path.name} kills missing columns: {missing}")
-        continue
-    
-    # Clean kills data - remove suicides and world deaths
-    kills_df = kills_df.dropna(subset=["attacker_name", "victim_name", "attacker_side", "victim_side"])
-    
-    # Normalize names
-    kills_df["attacker_name"] = kills_df["attacker_name"].apply(norm_name)
-    kills_df["victim_name"] = kills_df["victim_name"].apply(norm_name)
-    
-    # Exclude world/environmental deaths AND utility kills
-    # Only keep valid weapons (guns + knife + zeus)
-    if "weapon" in kills_df.columns:
-        # Exclude world damage
-        kills_df = kills_df[~kills_df["weapon"].astype(str).str.lower().isin(
-            ["world", "worldspawn", "trigger_hurt", "entityflame"]
-        )]
-        
-        # Exclude utility/grenade kills (HE grenade, molotov/incendiary burn kills)
-        # Keep only: guns, knife, zeus
-        kills_df = kills_df[~kills_df["weapon"].astype(str).str.lower().str.contains(
-            "grenade|molotov|incendiary|inferno|flashbang|smoke|decoy", 
-            case=False, 
-            na=False
-        )]
-    
-    # Exclude suicides (attacker == victim)
-    kills_df = kills_df[kills_df["attacker_name"] != kills_df["victim_name"]]
-    
-    # Exclude teamkills
-    kills_df = kills_df[kills_df["attacker_side"] != kills_df["victim_side"]]
-    
-    # Process each kill
-    for _, kill in kills_df.iterrows():
-        attacker = kill["attacker_name"]
-        victim = kill["victim_name"]
-        attacker_weapon = kill["attacker_active_weapon_name"]  # Weapon attacker was holding
-        victim_weapon = kill["victim_active_weapon_name"]  # Weapon victim was holding
-        kill_weapon = kill.get("weapon", None)  # Weapon used to make the kill
-        
-        # Track unique weapons
-        if pd.notna(attacker_weapon):
-            unique_attacker_weapons.add(str(attacker_weapon).strip())
-        if pd.notna(victim_weapon):
-            unique_victim_weapons.add(str(victim_weapon).strip())
-        if pd.notna(kill_weapon):
-            unique_kill_weapons.add(str(kill_weapon).strip())
-        
-        # Get weapon values
-        attacker_value = get_weapon_value(attacker_weapon)
-        victim_value = get_weapon_value(victim_weapon)
-        
-        # Determine if AWP is involved
-        is_awp_duel = (str(attacker_weapon).strip() == "AWP" or 
-                       str(victim_weapon).strip() == "AWP")
-        
-        # Determine economy condition for this kill
-        value_diff = attacker_value - victim_value
-        
-        if value_diff > EQUAL_THRESHOLD:
-            # Attacker had higher economy
-            kill_category = "higher_econ_kills"
-            death_category = "lower_econ_deaths"
-        elif value_diff < -EQUAL_THRESHOLD:
-            # Attacker had lower economy
-            kill_category = "lower_econ_kills"
-            death_category = "higher_econ_deaths"
-        else:
-            # Equal economy
-            kill_category = "equal_econ_kills"
-            death_category = "equal_econ_deaths"
-        
-        # Update stats for INCLUDE_AWP version (always)
-        player_stats[attacker]["include_awp"][kill_category] += 1
-        player_stats[attacker]["include_awp"]["total_kills"] += 1
-        
-        player_stats[victim]["include_awp"][death_category] += 1
-        player_stats[victim]["include_awp"]["total_deaths"] += 1
-        
-        # Update stats for EXCLUDE_AWP version (only if no AWP involved)
-        if not is_awp_duel:
-            player_stats[attacker]["exclude_awp"][kill_category] += 1
-            player_stats[attacker]["exclude_awp"]["total_kills"] += 1
-            
-            player_stats[victim]["exclude_awp"][death_category] += 1
-            player_stats[victim]["exclude_awp"]["total_deaths"] += 1
-
-print(f"\n{'='*70}")
-print("GENERATING OUTPUT CSV")
-print(f"{'='*70}")
-
-# ===== Print unique weapons seen =====
-print("\n" + "="*70)
-print("UNIQUE WEAPONS SEEN IN PROCESSED KILLS")
-print("="*70)
-
-print(f"\nKill weapons (from 'weapon' column) ({len(unique_kill_weapons)}):")
-for weapon in sorted(unique_kill_weapons):
-    value = get_weapon_value(weapon)
-    print(f"  {weapon:<30} ")
-
-print(f"\nAttacker active weapons ({len(unique_attacker_weapons)}):")
-for weapon in sorted(unique_attacker_weapons):
-    value = get_weapon_value(weapon)
-    print(f"  {weapon:<30} ${value}")
-
-print(f"\nVictim active weapons ({len(unique_victim_weapons)}):")
-for weapon in sorted(unique_victim_weapons):
-    value = get_weapon_value(weapon)
-    print(f"  {weapon:<30} ${value}")
-
-# Find weapons in data but not in price dict
-all_weapons = unique_attacker_weapons.union(unique_victim_weapons)
-missing_from_dict = []
-for weapon in all_weapons:
-    if get_weapon_value(weapon) == 0 and "knife" not in weapon.lower():
-        missing_from_dict.append(weapon)
-
-if missing_from_dict:
-    print(f"\nWeapons NOT in price dictionary (counted as $0):")
-    for weapon in sorted(missing_from_dict):
-        print(f"  {weapon}")
-
-miss_from_valid_gun = []
-for weapon in unique_kill_weapons:
-    if weapon.lower() not in valid_guns:
-        miss_from_valid_gun.append(weapon)
-
-if miss_from_valid_gun:
-    print(f"\nKill weapons NOT in valid_guns set:")
-    for weapon in sorted(miss_from_valid_gun):
-        print(f"  {weapon}")
-
-print("\n" + "="*70)
-
-# ===== Generate output CSV =====
-results = []
-
-for player, data in player_stats.items():
-    rounds_participated = data["rounds_participated"]
-    
-    # Generate two rows per player: include_awp and exclude_awp
-    for awp_filter in ["include_awp", "exclude_awp"]:
-        stats = data[awp_filter]
-        
-        results.append({
-            "Player": player,
-            "AWP_Filter": awp_filter,
+# metrics: kills/deaths by economy condition, totals and rounds participated
+AWP_FILTERS = ["include_awp", "exclude_awp"]
+METRICS = ["higher_econ_kills", "equal_econ_kills", "lower_econ_kills",
+           "higher_econ_deaths", "equal_econ_deaths", "lower_econ_deaths",
+           "total_kills", "total_deaths", "rounds_participated"]
+
+def new_player_stats():
+    return Accumulator(AWP_FILTERS, METRICS)
+
+# ===== Analyzer =====
+class WeaponDuelAnalyzer(Analyzer):
+    name = "weapon_duel"
+    version = 3  # aggregates in an Accumulator keyed on steamid
+    profile = ParseProfile(tables=("rounds", "kills", "damages", "ticks"),
+                           player_props=["name", "side", "active_weapon_name", "inventory", "steamid"])
+
+    def __init__(self, output_csv=output_csv):
+        self.output_csv = output_csv
+        self.player_stats = new_player_stats()
+        self.names = {}  # steamid -> names seen
+
+        # Track all unique weapons seen
+        self.unique_attacker_weapons = set()
+        self.unique_victim_weapons = set()
+        self.unique_kill_weapons = set()  # Track weapons from 'weapon' column
+
+        self.countknife = 0
+
+    def process(self, demo_path, demo):
+        partial = {
+            "player_stats": new_player_stats(),
+            "names": {},
+            "unique_attacker_weapons": set(),
+            "unique_victim_weapons": set(),
+            "unique_kill_weapons": set(),
+            "countknife": 0,
+        }
+        player_stats = partial["player_stats"]
+
+        try:
+            rounds_df = round_facts(demo).to_pandas()
+            tick_columns = demo.scan("ticks").collect_schema().names()
+            kills = demo.kills
+            kill_ids = [c for c in ["attacker_steamid", "victim_steamid"] if c in kills.columns]
+            kills_df = to_pandas(with_ids(kills, kill_ids))
+            knife = knife_round(demo)
+        except Exception as e:
+            print(f"[warn] failed on {demo_path.name}: {e}")
+            return partial
+
+        if rounds_df is None or rounds_df.empty:
+            print(f"[warn] {demo_path.name} has empty rounds data")
+            return partial
+
+        # ===== Remove knife/warmup round =====
+        if knife["is_knife"]:
+            print(f"[INFO] Removing knife round {knife['first_round']} from {demo_path.name}")
+            partial["countknife"] += 1
+            rounds_df = drop_knife_round(rounds_df, knife)
+            kills_df = drop_knife_round(kills_df, knife)
+
+        # ===== Track round participation from ticks =====
+        # Ticks are read one round at a time (see common.driver.iter_demos)
+        if {"name", "steamid", "round_num"} <= set(tick_columns):
+            # For each round, find unique players
+            for round_num, round_ticks in demo.round_chunks("ticks", rounds_df["round_num"].dropna().unique(),
+                                                            columns=["round_num", "steamid", "name"]):
+                round_ticks = with_ids(round_ticks, ["steamid"]).to_pandas().dropna(subset=["name"])
+                if not round_ticks.empty:
+                    add_names(partial["names"], round_ticks[["steamid", "name"]].drop_duplicates().itertuples(index=False))
+                    count_rounds(player_stats, round_ticks["steamid"].unique())
+
+        # ===== Process kills =====
+        if kills_df is None or kills_df.empty:
+            print(f"[info] {demo_path.name} has no kills data")
+            return partial
+
+        # Check for required columns
+        required_cols = ["attacker_steamid", "attacker_name", "attacker_side", "victim_steamid", "victim_name",
+                         "victim_side", "weapon", "attacker_active_weapon_name", "victim_active_weapon_name"]
+        missing = [c for c in required_cols if c not in kills_df.columns]
+
+        if missing:
+            print(f"[warn] {demo_path.name} kills missing columns: {missing}")
+            return partial
+
+        # Clean kills data - remove suicides and world deaths
+        kills_df = kills_df.dropna(subset=["attacker_name", "victim_name", "attacker_side", "victim_side"])
+
+        # Exclude world/environmental deaths AND utility kills
+        # Only keep valid weapons (guns + knife + zeus)
+        if "weapon" in kills_df.columns:
+            # Exclude world damage
+            kills_df = kills_df[~kills_df["weapon"].astype(str).str.lower().isin(
+                ["world", "worldspawn", "trigger_hurt", "entityflame"]
+            )]
+
+            # Exclude utility/grenade kills (HE grenade, molotov/incendiary burn kills)
+            # Keep only: guns, knife, zeus
+            kills_df = kills_df[~kills_df["weapon"].astype(str).str.lower().str.contains(
+                "grenade|molotov|incendiary|inferno|flashbang|smoke|decoy", 
+                case=False, 
+                na=False
+            )]
+
+        # Exclude suicides (attacker == victim)
+        kills_df = kills_df[kills_df["attacker_steamid"] != kills_df["victim_steamid"]]
+
+        # Exclude teamkills
+        kills_df = kills_df[kills_df["attacker_side"] != kills_df["victim_side"]]
+
+        # Names seen for each steamid
+        add_names(partial["names"], zip(kills_df["attacker_steamid"], kills_df["attacker_name"]))
+        add_names(partial["names"], zip(kills_df["victim_steamid"], kills_df["victim_name"]))
+
+        # Unique weapons seen
+        partial["unique_attacker_weapons"].update(str(w).strip() for w in kills_df["attacker_active_weapon_name"].dropna().unique())
+        partial["unique_victim_weapons"].update(str(w).strip() for w in kills_df["victim_active_weapon_name"].dropna().unique())
+        partial["unique_kill_weapons"].update(str(w).strip() for w in kills_df["weapon"].dropna().unique())
+
+        # Weapon values and AWP duels of all kills at once (once per distinct weapon)
+        attacker_value = map_distinct(kills_df["attacker_active_weapon_name"], get_weapon_value, 0)
+        victim_value = map_distinct(kills_df["victim_active_weapon_name"], get_weapon_value, 0)
+        is_awp_duel = (map_distinct(kills_df["attacker_active_weapon_name"], is_awp, False)
+                       | map_distinct(kills_df["victim_active_weapon_name"], is_awp, False))
+
+        count_duels(player_stats, kills_df["attacker_steamid"].to_numpy(), kills_df["victim_steamid"].to_numpy(),
+                    attacker_value - victim_value, is_awp_duel)
+
+        return partial
+
+    def process_lazy(self, demo_path, demo):
+        """process() on polars LazyFrames: one query plan per demo, same partial"""
+        partial = {
+            "player_stats": new_player_stats(),
+            "names": {},
+            "unique_attacker_weapons": set(),
+            "unique_victim_weapons": set(),
+            "unique_kill_weapons": set(),
+            "countknife": 0,
+        }
+        player_stats = partial["player_stats"]
+
+        try:
+            rounds = round_facts(demo).lazy()
+            ticks = demo.scan("ticks")
+            kills = demo.scan("kills")
+            knife = knife_round(demo)
+        except Exception as e:
+            print(f"[warn] failed on {demo_path.name}: {e}")
+            return partial
+
+        if knife["first_round"] is None:
+            print(f"[warn] {demo_path.name} has empty rounds data")
+            return partial
+
+        # ===== Remove knife/warmup round =====
+        rounds = drop_knife_round(rounds, knife)
+        kills = drop_knife_round(kills, knife)
+
+        # ===== Round participation from ticks =====
+        participants = round_participants(ticks, rounds)
+
+        # ===== Duels: gun/knife/zeus kills between opponents =====
+        required_cols = ["attacker_steamid", "attacker_name", "attacker_side", "victim_steamid", "victim_name",
+                         "victim_side", "weapon", "attacker_active_weapon_name", "victim_active_weapon_name"]
+        missing = [c for c in required_cols if c not in kills.collect_schema().names()]
+        duels = pl.LazyFrame(schema={"attacker_steamid": pl.Int64, "attacker_name": pl.String,
+                                     "victim_steamid": pl.Int64, "victim_name": pl.String,
+                                     "value_diff": pl.Int64, "is_awp_duel": pl.Boolean})
+        weapons = pl.LazyFrame(schema={"attacker": pl.List(pl.String), "victim": pl.List(pl.String),
+                                       "kill": pl.List(pl.String)})
+        if not missing:
+            weapon = pl.col("weapon").cast(pl.String).str.to_lowercase()
+            clean = (
+                with_ids(kills, ["attacker_steamid", "victim_steamid"])
+                .drop_nulls(["attacker_name", "victim_name", "attacker_side", "victim_side"])
+                .filter(
+                    ~weapon.is_in(["world", "worldspawn", "trigger_hurt", "entityflame"]).fill_null(False)
+                    & ~weapon.str.contains("grenade|molotov|incendiary|inferno|flashbang|smoke|decoy").fill_null(False)
+                )
+                .filter(pl.col("attacker_steamid") != pl.col("victim_steamid"))
+                .filter(pl.col("attacker_side") != pl.col("victim_side"))
+            )
+            attacker_weapon = pl.col("attacker_active_weapon_name").str.strip_chars()
+            victim_weapon = pl.col("victim_active_weapon_name").str.strip_chars()
+            duels = clean.select(
+                "attacker_steamid",
+                "attacker_name",
+                "victim_steamid",
+                "victim_name",
+                (weapon_value_expr("attacker_active_weapon_name") - weapon_value_expr("victim_active_weapon_name"))
+                .alias("value_diff"),
+                ((attacker_weapon == "AWP").fill_null(False) | (victim_weapon == "AWP").fill_null(False))
+                .alias("is_awp_duel"),
+            )
+            weapons = clean.select(
+                attacker_weapon.drop_nulls().unique().implode().alias("attacker"),
+                victim_weapon.drop_nulls().unique().implode().alias("victim"),
+                pl.col("weapon").cast(pl.String).str.strip_chars().drop_nulls().unique().implode().alias("kill"),
+            )
+
+        participants, n_kills, duels, weapons = pl.collect_all(
+            [participants, kills.select(pl.len()), duels, weapons], engine=demo.collect_engine()
+        )
+        if knife["is_knife"]:
+            print(f"[INFO] Removing knife round {knife['first_round']} from {demo_path.name}")
+            partial["countknife"] += 1
+
+        add_names(partial["names"], participants.select("steamid", "name").iter_rows())
+        count_rounds(player_stats, participants["steamid"].to_numpy())
+
+        if n_kills.item() == 0:
+            print(f"[info] {demo_path.name} has no kills data")
+            return partial
+        if missing:
+            print(f"[warn] {demo_path.name} kills missing columns: {missing}")
+            return partial
+
+        if not weapons.is_empty():
+            partial["unique_attacker_weapons"].update(weapons["attacker"][0])
+            partial["unique_victim_weapons"].update(weapons["victim"][0])
+            partial["unique_kill_weapons"].update(weapons["kill"][0])
+
+        add_names(partial["names"], duels.select("attacker_steamid", "attacker_name").iter_rows())
+        add_names(partial["names"], duels.select("victim_steamid", "victim_name").iter_rows())
+        count_duels(player_stats, duels["attacker_steamid"].to_numpy(), duels["victim_steamid"].to_numpy(),
+                    duels["value_diff"].to_numpy(), duels["is_awp_duel"].to_numpy())
+
+        return partial
+
+    def merge(self, partial):
+        self.player_stats.merge(partial["player_stats"])
+        merge_names(self.names, partial["names"])
+        self.unique_attacker_weapons |= partial["unique_attacker_weapons"]
+        self.unique_victim_weapons |= partial["unique_victim_weapons"]
+        self.unique_kill_weapons |= partial["unique_kill_weapons"]
+        self.countknife += partial["countknife"]
+
+    def write_output(self):
+        print(f"\n{'='*70}")
+        print("GENERATING OUTPUT CSV")
+        print(f"{'='*70}")
+
+        # ===== Print unique weapons seen =====
+        print("\n" + "="*70)
+        print("UNIQUE WEAPONS SEEN IN PROCESSED KILLS")
+        print("="*70)
+
+        print(f"\nKill weapons (from 'weapon' column) ({len(self.unique_kill_weapons)}):")
+        for weapon in sorted(self.unique_kill_weapons):
+            value = get_weapon_value(weapon)
+            print(f"  {weapon:<30} ")
+
+        print(f"\nAttacker active weapons ({len(self.unique_attacker_weapons)}):")
+        for weapon in sorted(self.unique_attacker_weapons):
+            value = get_weapon_value(weapon)
+            print(f"  {weapon:<30} ${value}")
+
+        print(f"\nVictim active weapons ({len(self.unique_victim_weapons)}):")
+        for weapon in sorted(self.unique_victim_weapons):
+            value = get_weapon_value(weapon)
+            print(f"  {weapon:<30} ${value}")
+
+        # Find weapons in data but not in price dict
+        all_weapons = self.unique_attacker_weapons.union(self.unique_victim_weapons)
+        missing_from_dict = []
+        for weapon in all_weapons:
+            if get_weapon_value(weapon) == 0 and "knife" not in weapon.lower():
+                missing_from_dict.append(weapon)
+
+        if missing_from_dict:
+            print(f"\nWeapons NOT in price dictionary (counted as $0):")
+            for weapon in sorted(missing_from_dict):
+                print(f"  {weapon}")
+
+        miss_from_valid_gun = []
+        for weapon in self.unique_kill_weapons:
+            if weapon.lower() not in VALID_GUNS:
+                miss_from_valid_gun.append(weapon)
+
+        if miss_from_valid_gun:
+            print(f"\nKill weapons NOT in valid_guns set:")
+            for weapon in sorted(miss_from_valid_gun):
+                print(f"  {weapon}")
+
+        print("\n" + "="*70)
+
+        # ===== Generate output CSV =====
+        # Two rows per player: include_awp and exclude_awp
+        player_stats = resolve_names(self.player_stats, self.names)
+        stats = player_stats.frame("Player", axis=0, label="AWP_Filter")
+        df = pd.DataFrame({
+            "Player": stats["Player"],
+            "AWP_Filter": stats["AWP_Filter"],
             "Total_Kills": stats["total_kills"],
             "Higher_Econ_Kills": stats["higher_econ_kills"],
             "Equal_Econ_Kills": stats["equal_econ_kills"],
@@ -345,65 +408,69 @@ for player, data in player_stats.items():
             "Higher_Econ_Deaths": stats["higher_econ_deaths"],
             "Equal_Econ_Deaths": stats["equal_econ_deaths"],
             "Lower_Econ_Deaths": stats["lower_econ_deaths"],
-            "Total_Rounds": rounds_participated
+            "Total_Rounds": stats["rounds_participated"],
         })
 
-# Create DataFrame and save
-df = pd.DataFrame(results)
-df = df.sort_values(["Player", "AWP_Filter"])
-df.to_csv(output_csv, index=False)
+        # Save
+        df = df.sort_values(["Player", "AWP_Filter"])
+        df.to_csv(self.output_csv, index=False)
 
-print(f"\nDone! Results saved to {output_csv}")
-print(f"Knife rounds removed: {countknife}")
-print(f"Total players tracked: {len(player_stats)}")
+        print(f"\nDone! Results saved to {self.output_csv}")
+        print(f"Knife rounds removed: {self.countknife}")
+        print(f"Total players tracked: {len(player_stats)}")
 
-# ===== Print summary statistics =====
-print("\n" + "="*70)
-print("SUMMARY STATISTICS")
-print("="*70)
+        # ===== Print summary statistics =====
+        print("\n" + "="*70)
+        print("SUMMARY STATISTICS")
+        print("="*70)
 
-if not df.empty:
-    # Stats for include_awp
-    include_df = df[df["AWP_Filter"] == "include_awp"]
-    exclude_df = df[df["AWP_Filter"] == "exclude_awp"]
-    
-    print("\n--- INCLUDING AWP DUELS ---")
-    total_kills_inc = include_df["Total_Kills"].sum()
-    higher_kills_inc = include_df["Higher_Econ_Kills"].sum()
-    equal_kills_inc = include_df["Equal_Econ_Kills"].sum()
-    lower_kills_inc = include_df["Lower_Econ_Kills"].sum()
-    
-    print(f"Total kills: {total_kills_inc}")
-    print(f"  Higher economy kills: {higher_kills_inc} ({higher_kills_inc/total_kills_inc*100:.1f}%)")
-    print(f"  Equal economy kills: {equal_kills_inc} ({equal_kills_inc/total_kills_inc*100:.1f}%)")
-    print(f"  Lower economy kills: {lower_kills_inc} ({lower_kills_inc/total_kills_inc*100:.1f}%)")
-    
-    print("\n--- EXCLUDING AWP DUELS ---")
-    total_kills_exc = exclude_df["Total_Kills"].sum()
-    higher_kills_exc = exclude_df["Higher_Econ_Kills"].sum()
-    equal_kills_exc = exclude_df["Equal_Econ_Kills"].sum()
-    lower_kills_exc = exclude_df["Lower_Econ_Kills"].sum()
-    
-    print(f"Total kills: {total_kills_exc}")
-    print(f"  Higher economy kills: {higher_kills_exc} ({higher_kills_exc/total_kills_exc*100:.1f}%)")
-    print(f"  Equal economy kills: {equal_kills_exc} ({equal_kills_exc/total_kills_exc*100:.1f}%)")
-    print(f"  Lower economy kills: {lower_kills_exc} ({lower_kills_exc/total_kills_exc*100:.1f}%)")
-    
-    print(f"\nAWP duels removed: {total_kills_inc - total_kills_exc} ({(total_kills_inc-total_kills_exc)/total_kills_inc*100:.1f}%)")
-    
-    # Top performers in lower economy kills (exclude_awp version)
-    print("\n" + "="*70)
-    print("TOP 10 LOWER ECONOMY KILLERS (EXCLUDING AWP, 50+ ROUNDS)")
-    print("="*70)
-    
-    significant = exclude_df[exclude_df["Total_Rounds"] >= 50].copy()
-    if not significant.empty:
-        significant["Lower_Econ_Kill_Rate"] = (
-            significant["Lower_Econ_Kills"] / significant["Total_Kills"] * 100
-        )
-        top_lower = significant.nlargest(10, "Lower_Econ_Kill_Rate")
-        
-        for _, row in top_lower.iterrows():
-            print(f"{row['Player']:.<25} {row['Lower_Econ_Kill_Rate']:>5.1f}% "
-                  f"({row['Lower_Econ_Kills']}/{row['Total_Kills']} kills, "
-                  f"{row['Total_Rounds']} rounds)")
\ No newline at end of file
+        if not df.empty:
+            # Stats for include_awp
+            include_df = df[df["AWP_Filter"] == "include_awp"]
+            exclude_df = df[df["AWP_Filter"] == "exclude_awp"]
+
+            print("\n--- INCLUDING AWP DUELS ---")
+            total_kills_inc = include_df["Total_Kills"].sum()
+            higher_kills_inc = include_df["Higher_Econ_Kills"].sum()
+            equal_kills_inc = include_df["Equal_Econ_Kills"].sum()
+            lower_kills_inc = include_df["Lower_Econ_Kills"].sum()
+
+            print(f"Total kills: {total_kills_inc}")
+            print(f"  Higher economy kills: {higher_kills_inc} ({higher_kills_inc/total_kills_inc*100:.1f}%)")
+            print(f"  Equal economy kills: {equal_kills_inc} ({equal_kills_inc/total_kills_inc*100:.1f}%)")
+            print(f"  Lower economy kills: {lower_kills_inc} ({lower_kills_inc/total_kills_inc*100:.1f}%)")
+
+            print("\n--- EXCLUDING AWP DUELS ---")
+            total_kills_exc = exclude_df["Total_Kills"].sum()
+            higher_kills_exc = exclude_df["Higher_Econ_Kills"].sum()
+            equal_kills_exc = exclude_df["Equal_Econ_Kills"].sum()
+            lower_kills_exc = exclude_df["Lower_Econ_Kills"].sum()
+
+            print(f"Total kills: {total_kills_exc}")
+            print(f"  Higher economy kills: {higher_kills_exc} ({higher_kills_exc/total_kills_exc*100:.1f}%)")
+            print(f"  Equal economy kills: {equal_kills_exc} ({equal_kills_exc/total_kills_exc*100:.1f}%)")
+            print(f"  Lower economy kills: {lower_kills_exc} ({lower_kills_exc/total_kills_exc*100:.1f}%)")
+
+            print(f"\nAWP duels removed: {total_kills_inc - total_kills_exc} ({(total_kills_inc-total_kills_exc)/total_kills_inc*100:.1f}%)")
+
+            # Top performers in lower economy kills (exclude_awp version)
+            print("\n" + "="*70)
+            print("TOP 10 LOWER ECONOMY KILLERS (EXCLUDING AWP, 50+ ROUNDS)")
+            print("="*70)
+
+            significant = exclude_df[exclude_df["Total_Rounds"] >= 50].copy()
+            if not significant.empty:
+                significant["Lower_Econ_Kill_Rate"] = (
+                    significant["Lower_Econ_Kills"] / significant["Total_Kills"] * 100
+                )
+                top_lower = significant.nlargest(10, "Lower_Econ_Kill_Rate")
+
+                for _, row in top_lower.iterrows():
+                    print(f"{row['Player']:.<25} {row['Lower_Econ_Kill_Rate']:>5.1f}% "
+                          f"({row['Lower_Econ_Kills']}/{row['Total_Kills']} kills, "
+                          f"{row['Total_Rounds']} rounds)")
+
+
+if __name__ == "__main__":
+    args = parse_args(demo_root)
+    run_from_args([WeaponDuelAnalyzer()], args)
@@ -4,6 +4,10 @@ from matplotlib.offsetbox import OffsetImage, AnnotationBbox
 from PIL import Image, ImageDraw
 import numpy as np
 from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.teams import player_teams
 
 # ===== Configuration =====
 csv_file = "weapon_duel_economy_analysis.csv"
@@ -138,6 +142,7 @@ PLAYER_TEAMS = {
     "MAJ3R": "Aurora",
     "cadiaN": "Astralis",
 }
+PLAYER_TEAMS = player_teams(PLAYER_TEAMS)  # plus the teams first_kill.py stored for everyone else
 
 # ===== ABSOLUTE POSITION CONTROLS =====
 FIGURE_WIDTH_INCHES = 11